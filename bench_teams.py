@@ -0,0 +1,289 @@
+"""
+조 편성 엔진 벤치마크 (Streamlit 없이 실행).
+
+가상 명단(20 ~ 1000명, 조 3 ~ 60개, 이력 1 ~ 10일, 제약 밀도)을 만들어
+단계별로 잰다.
+- history : get_history_stats — 이력 표 전체를 처음 셀 때(cold)와 다시 부를 때(warm)
+- build   : TeamProblem 구성 + 첫 배치 (tracemalloc으로 최대 메모리도 잰다)
+- solve   : solve_teams 전체 (시간 제한 안에서). 성공 여부와 최종 벌점
+- warnings: 결과 표의 get_warnings
+
+    python bench_teams.py                        # quick 묶음
+    python bench_teams.py --suite full --save bench_baseline.json
+    python bench_teams.py --compare bench_baseline.json   # 기준보다 나빠지면 종료 코드 1
+
+시간은 머신마다 다르므로 기준 파일은 같은 머신에서 만든 것과 비교한다.
+벌점/성공률은 seed가 고정이라 머신과 무관하게 비교할 수 있다 (시간 제한 안에서 도는 탐색 횟수만 다름).
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+from team_history import format_teams_for_editor, get_history_stats
+from team_parallel import solve_teams_parallel
+from team_solver import InfeasibleError, TeamProblem, solve_teams
+from team_warnings import get_warnings
+
+SUITES = {
+    # (인원, 조 개수, 이력 일수, 제약 밀도)
+    "quick": [
+        (20, 3, 1, 0.0),
+        (60, 6, 3, 0.05),
+        (200, 20, 5, 0.05),
+        (500, 30, 5, 0.02),
+    ],
+    "full": [
+        (n, k, days, density)
+        for n in (20, 100, 300, 1000)
+        for k in (3, 10, 30, 60)
+        if n >= 4 * k
+        for days in (1, 5, 10)
+        for density in (0.0, 0.02, 0.1)
+    ],
+}
+
+# 비교할 때 이 배수(그리고 최소 차이)를 넘게 느려지면 회귀로 본다
+TIME_REGRESSION_RATIO = 1.5
+TIME_REGRESSION_MIN_S = 0.005
+PENALTY_REGRESSION_RATIO = 1.1
+
+
+def case_key(n, k, days, density):
+    return f"n{n}-k{k}-d{days}-c{density:g}"
+
+
+def make_roster(n, k, density, rng):
+    """
+    가상 명단 -> solve_teams 인자 dict.
+    조사자/섹장 후보는 각각 k명 이상(일부는 둘 다), 카메라는 약 20%.
+    같이 팀은 밀도 x n / 2 쌍(서로 겹치지 않게), 다른 팀은 밀도 x n 쌍.
+    """
+    names = [f"p{i:04d}" for i in range(n)]
+    rng.shuffle(names)
+    n_role = max(k, n // 5)
+    investigators = names[:n_role]
+    leaders = names[n_role:2 * n_role]
+    # 조사자 후보 중 일부는 섹장도 할 수 있다
+    leaders += investigators[: n_role // 10]
+    extras = names[2 * n_role:]
+    cameras = rng.sample(names, n // 5)
+
+    free = list(extras)
+    rng.shuffle(free)
+    n_together = min(int(density * n / 2), len(free) // 2)
+    must_together = [(free[2 * i], free[2 * i + 1]) for i in range(n_together)]
+    partner = {a: b for a, b in must_together} | {b: a for a, b in must_together}
+    must_apart = []
+    for _ in range(int(density * n)):
+        a, b = rng.sample(names, 2)
+        if partner.get(a) != b:
+            must_apart.append((a, b))
+    return {
+        "k": k, "investigators": investigators, "leaders": leaders, "cameras": cameras,
+        "extras": extras, "must_together": must_together, "must_apart": must_apart,
+    }
+
+
+def make_history(spec, days, rng):
+    """days일치 무작위 편성 표 -> session_state 흉내 dict ({"df_day_1": df, ...})."""
+    k = spec["k"]
+    invs, leads = list(spec["investigators"]), list(spec["leaders"])
+    people = list(dict.fromkeys(invs + leads + spec["extras"]))
+    state = {}
+    for d in range(1, days + 1):
+        rng.shuffle(invs)
+        chosen_inv = invs[:k]
+        chosen_lead = [p for p in rng.sample(leads, len(leads)) if p not in chosen_inv][:k]
+        rest = [p for p in people if p not in chosen_inv and p not in chosen_lead]
+        rng.shuffle(rest)
+        teams = [
+            {"조사자": chosen_inv[t], "섹장": chosen_lead[t], "쩌리": rest[t::k]}
+            for t in range(k)
+        ]
+        state[f"df_day_{d}"] = format_teams_for_editor(teams, set(spec["cameras"]))
+    return state
+
+
+def _timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - t0
+
+
+def _penalty(problem, teams):
+    index = problem.roster.index
+    team_of = np.empty(len(problem.roster), dtype=np.int64)
+    for t, team in enumerate(teams):
+        for name in [team["조사자"], team["섹장"]] + team["쩌리"]:
+            team_of[index[name]] = t
+    return problem.total_cost(team_of)
+
+
+def run_case(n, k, days, density, seed, time_budget, parallel=False):
+    rng = random.Random(seed)
+    spec = make_roster(n, k, density, rng)
+    state = make_history(spec, days, rng)
+    day = days + 1
+    result = {"seed": seed}
+
+    # 1. 이력 통계: 처음(모든 날짜를 셈) / 다시(바뀐 날짜 없음)
+    history, result["history_cold_s"] = _timed(get_history_stats, day, state)
+    _, result["history_warm_s"] = _timed(get_history_stats, day, state)
+
+    # 2. 문제 구성 + 첫 배치. tracemalloc은 할당마다 느려지므로 메모리는 한 번 더 돌려 잰다
+    def build():
+        problem = TeamProblem(history_stats=history, **spec)
+        problem.initial_assignment(random.Random(seed))
+        return problem
+
+    try:
+        problem, result["build_s"] = _timed(build)
+        infeasible = None
+        tracemalloc.start()
+        build()
+        result["peak_mb"] = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+    except InfeasibleError as e:
+        problem, infeasible = None, str(e)
+        result["build_s"], result["peak_mb"] = None, None
+
+    # 3. 편성 전체
+    solve = solve_teams_parallel if parallel else solve_teams
+    (teams, cam_set, err), result["solve_s"] = _timed(
+        solve, history_stats=history, time_budget=time_budget, seed=seed, **spec
+    )
+    result["success"] = err is None
+    result["error"] = err or infeasible
+    result["penalty"] = _penalty(problem, teams) if teams is not None else None
+
+    # 4. 결과 표의 중복 알림
+    if teams is not None:
+        df = format_teams_for_editor(teams, cam_set)
+        warnings, result["warnings_s"] = _timed(get_warnings, df, day, state)
+        result["warnings"] = len(warnings)
+    return result
+
+
+def summarize(n, k, days, density, runs):
+    ok = [r for r in runs if r["success"]]
+    summary = {
+        "key": case_key(n, k, days, density),
+        "n": n, "k": k, "days": days, "density": density,
+        "runs": len(runs),
+        "success_rate": len(ok) / len(runs),
+        "peak_mb": max((r["peak_mb"] for r in runs if r["peak_mb"] is not None), default=None),
+        "errors": sorted({r["error"] for r in runs if r["error"]}),
+    }
+    for field in ("history_cold_s", "history_warm_s", "build_s", "solve_s", "warnings_s"):
+        values = [r[field] for r in runs if r.get(field) is not None]
+        summary[field] = float(np.median(values)) if values else None
+    penalties = [r["penalty"] for r in ok]
+    summary["penalty"] = float(np.mean(penalties)) if penalties else None
+    return summary
+
+
+def run_suite(cases, repeats, time_budget, parallel=False, log=print):
+    results = []
+    for n, k, days, density in cases:
+        runs = [run_case(n, k, days, density, seed, time_budget, parallel) for seed in range(repeats)]
+        summary = summarize(n, k, days, density, runs)
+        results.append(summary)
+        log(format_row(summary))
+    return results
+
+
+def _fmt(value, scale=1000, digits=1):
+    return "-" if value is None else f"{value * scale:.{digits}f}"
+
+
+HEADER = (f"{'case':<22}{'ok':>5}{'hist cold':>11}{'warm':>8}{'build':>9}"
+          f"{'solve':>9}{'warn':>8}{'peak MB':>9}{'penalty':>10}   (ms)")
+
+
+def format_row(s):
+    return (
+        f"{s['key']:<22}{s['success_rate']:>5.0%}{_fmt(s['history_cold_s']):>11}{_fmt(s['history_warm_s'], digits=2):>8}"
+        f"{_fmt(s['build_s']):>9}{_fmt(s['solve_s'], digits=0):>9}{_fmt(s['warnings_s']):>8}"
+        f"{_fmt(s['peak_mb'], scale=1):>9}{_fmt(s['penalty'], scale=1):>10}"
+    )
+
+
+def compare(results, baseline):
+    """기준보다 나빠진 항목 목록 [(case, 설명)]."""
+    base = {c["key"]: c for c in baseline["cases"]}
+    regressions = []
+    for s in results:
+        b = base.get(s["key"])
+        if b is None:
+            continue
+        if s["success_rate"] < b["success_rate"]:
+            regressions.append((s["key"], f"성공률 {b['success_rate']:.0%} -> {s['success_rate']:.0%}"))
+        if s["penalty"] is not None and b["penalty"] is not None:
+            if s["penalty"] > b["penalty"] * PENALTY_REGRESSION_RATIO + 1:
+                regressions.append((s["key"], f"벌점 {b['penalty']:.1f} -> {s['penalty']:.1f}"))
+        # solve는 시간 제한만큼 도는 것이 정상이라 시간 비교에서 뺀다
+        for field in ("history_cold_s", "history_warm_s", "build_s", "warnings_s"):
+            new, old = s.get(field), b.get(field)
+            if new is None or old is None:
+                continue
+            if new > old * TIME_REGRESSION_RATIO and new - old > TIME_REGRESSION_MIN_S:
+                regressions.append((s["key"], f"{field} {old * 1000:.1f}ms -> {new * 1000:.1f}ms"))
+    return regressions
+
+
+def environment(args):
+    return {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "suite": args.suite,
+        "repeats": args.repeats,
+        "time_budget": args.time_budget,
+        "parallel": args.parallel,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="조 편성 엔진 벤치마크")
+    parser.add_argument("--suite", choices=sorted(SUITES), default="quick")
+    parser.add_argument("--repeats", type=int, default=3, help="경우마다 seed를 바꿔 반복할 횟수")
+    parser.add_argument("--time-budget", type=float, default=1.0, help="편성 한 번의 탐색 시간(초)")
+    parser.add_argument("--parallel", action="store_true", help="solve_teams 대신 병렬 탐색")
+    parser.add_argument("--save", metavar="PATH", help="결과를 기준 파일(JSON)로 저장")
+    parser.add_argument("--compare", metavar="PATH", help="기준 파일과 비교해 나빠진 항목을 보고")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    print(HEADER)
+    results = run_suite(SUITES[args.suite], args.repeats, args.time_budget, args.parallel)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"meta": environment(args), "cases": results}, f, ensure_ascii=False, indent=1)
+        print(f"기준 저장 -> {args.save}")
+
+    if baseline is not None:
+        regressions = compare(results, baseline)
+        for key, message in regressions:
+            print(f"회귀 {key}: {message}")
+        if regressions:
+            sys.exit(1)
+        print(f"기준({args.compare}) 대비 회귀 없음")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Streamlit 없이 쓰는 명령줄 도구 (야간 배치, 테스트용).
+
+    python cli.py map 하천 -o out/                       # 지역 지도 HTML (out/하천.html)
+    python cli.py map --vworld-key KEY                    # 모든 지역
+    python cli.py teams 명단.xlsx -k 6 -o 3일차.xlsx \\
+        --history 1일차.xlsx 2일차.xlsx                    # 이전 날짜 결과를 이력으로 보고 편성
+    python cli.py batch 전체명단.xlsx -k 6 -o 결과.xlsx     # 조사지 열로 나눠 조사지마다 편성 (team_batch.py)
+
+명단 파일 형식은 team_input.py 참고. 브이월드 키는 --vworld-key 또는 환경 변수 VWORLD_API_KEY.
+--trace PATH를 주면 단계별 시간 기록(perf_trace)을 그 JSONL 파일에 덧붙인다.
+"""
+import argparse
+import os
+import sys
+import time
+
+from perf_trace import begin_run, configure_log, end_run, stage
+
+
+def cmd_map(args):
+    from map_render import region_map_html, vworld_tile_url
+    from sectors import TAB_CONFIGS
+
+    key = args.vworld_key or os.environ.get("VWORLD_API_KEY")
+    if not key:
+        sys.exit("브이월드 키가 없습니다: --vworld-key 또는 VWORLD_API_KEY")
+    configs = [c for c in TAB_CONFIGS if not args.regions or c["name"] in args.regions]
+    if not configs:
+        sys.exit(f"알 수 없는 지역: {', '.join(args.regions)} (가능: {', '.join(c['name'] for c in TAB_CONFIGS)})")
+
+    focus = None
+    if args.focus:
+        lat, lon = (float(v) for v in args.focus.split(","))
+        focus = (lat, lon)
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    for tab_config in configs:
+        t0 = time.perf_counter()
+        html = region_map_html(
+            tab_config, not args.no_polygon, vworld_tile_url(key),
+            focus=focus, vector_tile_base_url=args.vector_tile_url,
+        )
+        out = os.path.join(args.out_dir, f"{tab_config['name']}.html")
+        with open(out, "w", encoding="utf-8") as f:
+            f.write(html)
+        print(f"[{tab_config['name']}] {out} ({len(html.encode('utf-8')):,} bytes, {time.perf_counter() - t0:.2f}s)")
+
+
+def cmd_teams(args):
+    from team_export import day_workbook
+    from team_history import format_teams_for_editor, get_history_stats
+    from team_input import read_history, read_roster
+    from team_parallel import solve_teams_parallel
+    from team_solver import solve_teams
+    from team_warnings import get_warnings
+
+    spec = read_roster(args.roster, args.k, sheet=args.sheet)
+    state = read_history(args.history)
+    day = len(args.history) + 1
+    history = get_history_stats(day, state)
+
+    people = set(spec["investigators"]) | set(spec["leaders"]) | set(spec["extras"])
+    solve = solve_teams_parallel if args.parallel else solve_teams
+    t0 = time.perf_counter()
+    with stage("solve_teams", k=args.k, people=len(people), parallel=args.parallel):
+        teams, cam_set, err = solve(history_stats=history, time_budget=args.time_budget, seed=args.seed, **spec)
+    if err:
+        sys.exit(f"편성 실패: {err}")
+    df = format_teams_for_editor(teams, cam_set)
+    print(df.to_string(index=False))
+    print(f"\n{len(people)}명 -> {len(teams)}개 조 ({time.perf_counter() - t0:.2f}s)")
+
+    for w in get_warnings(df, day, state):
+        print(w.replace("**", ""))
+
+    if args.output:
+        if args.output.lower().endswith(".csv"):
+            df.to_csv(args.output, index=False, encoding="utf-8-sig")
+        else:
+            with open(args.output, "wb") as f:
+                f.write(day_workbook(df))
+        print(f"저장 -> {args.output}")
+
+
+def cmd_batch(args):
+    from team_batch import batch_workbook, iter_batch, read_batch, read_batch_history, summary_row, SUMMARY_HEADER
+    from team_parallel import default_workers
+
+    specs = read_batch(args.roster, args.k, cohort_column=args.cohort_column, sheet=args.sheet)
+    history = read_batch_history(args.history, list(specs))
+    workers = min(args.workers or default_workers(), max(1, len(specs)))
+    print(f"조사지 {len(specs)}곳, 작업자 {workers}개")
+
+    def report(results):
+        print("\t".join(SUMMARY_HEADER))
+        for result in results:
+            print("\t".join("" if v is None else str(v) for v in summary_row(result)))
+            yield result
+
+    t0 = time.perf_counter()
+    results = iter_batch(specs, history, time_budget=args.time_budget, workers=workers, seed=args.seed)
+    with stage("batch", cohorts=len(specs), workers=workers):
+        data = batch_workbook(report(results))
+    print(f"\n{len(specs)}곳 ({time.perf_counter() - t0:.2f}s)")
+    with open(args.output, "wb") as f:
+        f.write(data)
+    print(f"저장 -> {args.output}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="조사 경로 지도 / 조 편성 명령줄 도구")
+    parser.add_argument("--trace", metavar="PATH", help="단계별 시간 기록을 덧붙일 JSONL 파일")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_map = sub.add_parser("map", help="지역 지도 HTML 만들기")
+    p_map.add_argument("regions", nargs="*", help="지역 이름 (예: 하천 하구). 생략하면 전체")
+    p_map.add_argument("-o", "--out-dir", default=".", help="HTML을 쓸 폴더 (파일 이름은 지역 이름.html)")
+    p_map.add_argument("--no-polygon", action="store_true", help="폴리곤 레이어 빼기")
+    p_map.add_argument("--vworld-key", help="브이월드 API 키 (기본: 환경 변수 VWORLD_API_KEY)")
+    p_map.add_argument("--focus", metavar="LAT,LON", help="이 위치를 확대해서 시작")
+    p_map.add_argument("--vector-tile-url", help="도형을 이 벡터 타일 서버에서 받기 (tiles.py)")
+    p_map.set_defaults(func=cmd_map)
+
+    p_teams = sub.add_parser("teams", help="명단 파일로 조 편성")
+    p_teams.add_argument("roster", help="명단 xlsx/CSV (열: 이름, 조사자, 섹장, 카메라, 같은 팀, 다른 팀)")
+    p_teams.add_argument("-k", type=int, required=True, help="조 개수")
+    p_teams.add_argument("--sheet", default=0, help="명단 xlsx의 시트 이름 (기본: 첫 시트)")
+    p_teams.add_argument("--history", nargs="*", default=[], metavar="PATH",
+                         help="이전 날짜 결과 xlsx/CSV (날짜 순서대로)")
+    p_teams.add_argument("--time-budget", type=float, default=3.0, help="탐색 시간(초)")
+    p_teams.add_argument("--parallel", action="store_true", help="여러 프로세스로 병렬 탐색")
+    p_teams.add_argument("--seed", type=int, help="난수 seed (같으면 같은 결과)")
+    p_teams.add_argument("-o", "--output", help="결과 파일 (.xlsx 또는 .csv)")
+    p_teams.set_defaults(func=cmd_teams)
+
+    p_batch = sub.add_parser("batch", help="조사지 여러 곳의 명단 파일 하나로 조사지마다 조 편성")
+    p_batch.add_argument("roster", help="명단 xlsx/CSV (teams 명단 열 + 조사지, 조 개수)")
+    p_batch.add_argument("-k", type=int, help="조 개수 열이 비어 있는 조사지의 조 개수")
+    p_batch.add_argument("--cohort-column", default="조사지", help="조사지를 나누는 열 이름")
+    p_batch.add_argument("--sheet", default=0, help="명단 xlsx의 시트 이름 (기본: 첫 시트)")
+    p_batch.add_argument("--history", nargs="*", default=[], metavar="PATH",
+                         help="이전 날짜 일괄 결과 xlsx (날짜 순서대로, 조사지 이름 시트를 이력으로)")
+    p_batch.add_argument("--time-budget", type=float, default=3.0, help="조사지마다 탐색 시간(초)")
+    p_batch.add_argument("--workers", type=int, help="동시에 푸는 조사지 수 (기본: CPU 수)")
+    p_batch.add_argument("--seed", type=int, help="난수 seed (같으면 같은 결과)")
+    p_batch.add_argument("-o", "--output", required=True, help="결과 xlsx (요약 + 조사지마다 시트)")
+    p_batch.set_defaults(func=cmd_batch)
+
+    args = parser.parse_args(argv)
+    trace = None
+    if args.trace:
+        configure_log(args.trace)
+        trace = begin_run(f"cli {args.command}")
+    try:
+        args.func(args)
+    finally:
+        if trace is not None:
+            end_run(trace, status="ok" if sys.exc_info()[0] is None else "error")
+
+
+if __name__ == "__main__":
+    main()
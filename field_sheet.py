@@ -0,0 +1,179 @@
+"""
+야장정리기 결과 -> 관찰종 한 줄 변환기.
+
+엑셀에서 복사한 "국명<TAB>관찰수" 행들을 위에서부터 {국명} <{관찰수}> 조각으로 바꿔 ", "로 잇는다.
+    참새	12          ->  참새 <12>, 까치 <3>
+    까치	3
+- 형식이 맞는 행은 이 프로세스에서 한 줄씩 바로 바꾼다 (수천 행도 밀리초).
+- 형식이 맞지 않는 행(관찰수가 숫자가 아님, 열이 더 있음 등)만 LLM(Groq)에 보낸다.
+  연달아 있는 이런 행들은 한 번에 보내고, 돌아온 한 줄을 그 자리에 끼운다 (순서 유지).
+- LLM 응답은 (모델, 프롬프트, 보낸 텍스트)의 해시로 프로세스 공용 캐시에 두어 같은 내용은 두 번 보내지 않는다.
+"""
+import hashlib
+import re
+import textwrap
+
+from lru_cache import LRUCache
+
+MODEL_NAME = "openai/gpt-oss-120b"
+SEPARATOR = ", "
+
+SYSTEM_PROMPT = textwrap.dedent("""
+    당신은 “조류상 조사 결과 포맷터”이다.
+
+    입력은 엑셀에서 복사-붙여넣기한 텍스트이며, 각 행은 2열로 구성된다:
+    - 1열: 조류 국명(한글)
+    - 2열: 관찰 수(숫자 형태의 문자열)
+    열 구분은 탭(Tab)일 수 있고, 행 구분은 줄바꿈이다.
+
+    작업:
+    - 입력의 각 행을 위에서 아래 순서대로 처리한다.
+    - 각 행을 다음 형식의 조각으로 변환한다: {국명} <{관찰수}>
+    - 모든 조각을 ", " (콤마+공백)으로 연결하여 한 줄의 텍스트로 출력한다.
+
+    절대 규칙(매우 중요):
+    - 출력은 오직 최종 결과 한 줄만 출력한다.
+    - 설명, 인사, 머리말/꼬리말, 코드블록, 따옴표, 불릿, 추가 문장, 줄바꿈을 절대 포함하지 않는다.
+    - 입력값의 진위/타당성 검증(국명 확인, 개체 수 검증 등)을 하지 않는다. 입력에 있는 문자열을 그대로 사용한다.
+    - 순서를 절대 바꾸지 않는다.
+    - 괄호/기호는 다음만 사용한다: 각 항목의 수를 감싸는 "<"와 ">".
+""").strip()
+
+# 관찰수로 보는 값: 숫자 (천 단위 콤마 허용). 입력 문자열을 그대로 쓴다
+_COUNT = re.compile(r"\d+(?:,\d{3})*")
+# 탭 없이 붙여넣은 행: "국명 12" (마지막 공백 뒤가 관찰수)
+_SPACED_ROW = re.compile(r"(\S.*?)\s+(\d+(?:,\d{3})*)")
+# 머리글 행의 첫 열 (이 행은 건너뛴다)
+HEADER_NAMES = {"국명", "종명", "종", "종 이름", "species"}
+
+_cache = LRUCache(max_entries=256, max_bytes=4 * 1024 * 1024)
+
+
+def get_response_cache():
+    """LLM 응답 캐시 (디버그 패널용)."""
+    return _cache
+
+
+def parse_row(line):
+    """
+    한 행 -> "국명 <관찰수>" 조각, 머리글이면 "", 형식이 맞지 않으면 None.
+    """
+    if "\t" in line:
+        cells = [c.strip() for c in line.split("\t")]
+        while cells and not cells[-1]:
+            cells.pop()
+        if len(cells) != 2:
+            return None
+        name, count = cells
+    else:
+        match = _SPACED_ROW.fullmatch(line.strip())
+        if match is None:
+            return "" if line.split()[0].lower() in HEADER_NAMES else None
+        name, count = match.groups()
+    if name and _COUNT.fullmatch(count):
+        return f"{name} <{count}>"
+    if name.lower() in HEADER_NAMES:
+        return ""
+    return None
+
+
+def parse_rows(lines):
+    """행들을 차례로 읽어 (조각 또는 None, 원래 행)을 내보낸다. 빈 행과 머리글은 건너뛴다."""
+    for line in lines:
+        if not line.strip():
+            continue
+        fragment = parse_row(line)
+        if fragment != "":
+            yield fragment, line
+
+
+def response_key(text, model=MODEL_NAME):
+    """보낸 텍스트의 캐시 키 (모델/프롬프트가 바뀌면 다른 키)."""
+    return hashlib.sha256("\0".join((model, SYSTEM_PROMPT, text)).encode("utf-8")).hexdigest()
+
+
+def groq_completer(api_key, model=MODEL_NAME):
+    """텍스트 -> 변환 결과 한 줄 (Groq). groq는 처음 보낼 때 읽는다."""
+    client = None
+
+    def complete(text):
+        nonlocal client
+        if client is None:
+            from groq import Groq
+
+            client = Groq(api_key=api_key)
+        chat_completion = client.chat.completions.create(
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": text},
+            ],
+            model=model,
+            temperature=0.1,
+        )
+        # 한 줄만 달라고 했지만 줄바꿈이 섞여 오면 구분자로 잇는다
+        lines = (chat_completion.choices[0].message.content or "").splitlines()
+        return SEPARATOR.join(line.strip() for line in lines if line.strip())
+
+    complete.model = model
+    return complete
+
+
+class Conversion:
+    """변환 결과. text는 변환한 조각을 입력 순서대로 이은 한 줄 (못 바꾼 행은 빠진다)."""
+
+    def __init__(self, pieces, local_rows, llm_rows, llm_calls, cache_hits, unresolved, errors):
+        self.text = SEPARATOR.join(p for p in pieces if p)
+        self.local_rows = local_rows
+        self.llm_rows = llm_rows
+        self.llm_calls = llm_calls
+        self.cache_hits = cache_hits
+        self.unresolved = unresolved
+        self.errors = errors
+
+
+def convert(text, complete=None):
+    """
+    붙여넣은 텍스트 -> Conversion.
+    complete(텍스트) -> 한 줄: 형식이 맞지 않는 행 묶음을 보낼 함수 (groq_completer). None이면 그런 행은 unresolved로 남긴다.
+    """
+    pieces, runs = [], []
+    pending = []
+    local_rows = 0
+    for fragment, line in parse_rows(text.splitlines()):
+        if fragment is None:
+            pending.append(line)
+            continue
+        if pending:
+            runs.append((len(pieces), pending))
+            pieces.append(None)
+            pending = []
+        pieces.append(fragment)
+        local_rows += 1
+    if pending:
+        runs.append((len(pieces), pending))
+        pieces.append(None)
+
+    llm_rows = llm_calls = cache_hits = 0
+    unresolved, errors = [], []
+    model = getattr(complete, "model", MODEL_NAME)
+    for index, lines in runs:
+        if complete is None:
+            unresolved += lines
+            continue
+        run_text = "\n".join(lines)
+        key = response_key(run_text, model)
+        response = _cache.get(key)
+        if response is None:
+            try:
+                response = complete(run_text)
+            except Exception as e:
+                errors.append(str(e))
+                unresolved += lines
+                continue
+            _cache.put(key, response)
+            llm_calls += 1
+        else:
+            cache_hits += 1
+        pieces[index] = response
+        llm_rows += len(lines)
+    return Conversion(pieces, local_rows, llm_rows, llm_calls, cache_hits, unresolved, errors)
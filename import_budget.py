@@ -0,0 +1,131 @@
+"""
+새 작업자 프로세스의 import / 첫 실행 시간 예산 보고 (배포·오토스케일 직후의 첫 화면).
+
+1. 모듈별: 새 파이썬 프로세스에서 `python -X importtime -c "import 모듈"`의 누적 시간 (여러 번 중 최솟값)
+2. 탭별 첫 실행: 새 프로세스에서 AppTest로 web.py를 그 탭이 열린 채 한 번 실행한 시간,
+   그 실행 동안 새로 읽힌 무거운 모듈
+
+    python import_budget.py             # 보고만
+    python import_budget.py --check     # 예산을 넘거나 읽으면 안 되는 모듈을 읽으면 종료 코드 1
+
+시간은 머신마다 다르므로 예산은 --scale로 늘리거나 줄인다. 읽으면 안 되는 모듈은 머신과 무관하다
+(예: 조 편성 탭만 연 세션이 geopandas/folium을 읽으면 실패).
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+MODULES = [
+    "streamlit", "pandas", "numpy", "openpyxl", "geopandas", "shapely", "pyproj", "folium",
+    "streamlit_geolocation", "perf_trace", "lru_cache", "map_cache", "field_sheet",
+    "team_solver", "team_parallel", "team_batch", "team_history", "team_export", "team_schedule", "team_store", "team_warnings",
+    "layer_store", "sectors", "map_render", "spatial_index", "track", "tiles",
+]
+# 탭별 보고에서 따로 적는 무거운 모듈
+HEAVY = ("pandas", "numpy", "openpyxl", "geopandas", "shapely", "pyproj", "folium", "groq")
+
+MAIN_TABS = {"map": "🗺️ 조사 경로 지도", "teams": "👥 조 편성", "field": "📋 야장 변환"}
+# 탭 첫 실행(새 프로세스, streamlit import 제외) 시간 예산(ms)과 그 탭에서 읽으면 안 되는 모듈
+BUDGETS = {
+    "map": {"ms": 6000, "forbidden": ("openpyxl", "groq")},
+    "teams": {"ms": 2500, "forbidden": ("geopandas", "shapely", "pyproj", "folium", "openpyxl", "groq")},
+    # 형식이 맞는 붙여넣기는 groq 없이 끝난다
+    "field": {"ms": 1500, "forbidden": ("pandas", "geopandas", "shapely", "pyproj", "folium", "openpyxl", "groq")},
+}
+
+CHILD = r"""
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+before = set(sys.modules)
+at = AppTest.from_file(sys.argv[1], default_timeout=300)
+at.secrets["VWORLD_API_KEY"] = "budget"
+at.secrets["TEAM_DB_PATH"] = ""
+at.session_state["main_tab"] = sys.argv[2]
+t0 = time.perf_counter()
+at.run()
+ms = (time.perf_counter() - t0) * 1000
+print(json.dumps({
+    "ms": ms,
+    "exceptions": [str(e.value) for e in at.exception],
+    "loaded": sorted(m for m in set(sys.modules) - before if "." not in m),
+}))
+"""
+
+
+def import_time_ms(module, repeats=3):
+    """새 프로세스에서 module을 import하는 누적 시간(ms). 실패하면 None."""
+    best = None
+    for _ in range(repeats):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=HERE, capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            return None
+        # 마지막 줄이 module 자신: "import time: self [us] | cumulative | imported package"
+        cumulative = int(proc.stderr.strip().splitlines()[-1].split("|")[1])
+        best = cumulative if best is None else min(best, cumulative)
+    return best / 1000
+
+
+def tab_first_run(tab):
+    """새 프로세스에서 tab이 열린 채 web.py를 한 번 실행 -> {"ms", "exceptions", "loaded"}."""
+    proc = subprocess.run(
+        [sys.executable, "-c", CHILD, os.path.join(HERE, "web.py"), MAIN_TABS[tab]],
+        cwd=HERE, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        return {"ms": None, "exceptions": [proc.stderr.strip().splitlines()[-1]], "loaded": []}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def check_tab(tab, result, scale=1.0):
+    """예산 위반 목록."""
+    budget = BUDGETS[tab]
+    problems = []
+    if result["exceptions"]:
+        problems.append(f"예외: {'; '.join(result['exceptions'])}")
+    if result["ms"] is not None and result["ms"] > budget["ms"] * scale:
+        problems.append(f"첫 실행 {result['ms']:,.0f}ms > 예산 {budget['ms'] * scale:,.0f}ms")
+    loaded = [m for m in budget["forbidden"] if m in result["loaded"]]
+    if loaded:
+        problems.append(f"읽으면 안 되는 모듈: {', '.join(loaded)}")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="import / 탭 첫 실행 시간 예산 보고")
+    parser.add_argument("--check", action="store_true", help="예산 위반이 있으면 종료 코드 1")
+    parser.add_argument("--scale", type=float, default=1.0, help="시간 예산 배수 (느린 머신이면 키운다)")
+    parser.add_argument("--repeats", type=int, default=3, help="모듈 import 시간을 잴 횟수")
+    parser.add_argument("--skip-modules", action="store_true", help="모듈별 import 시간은 건너뛴다")
+    args = parser.parse_args(argv)
+
+    if not args.skip_modules:
+        print(f"{'모듈':<24}{'import (ms)':>12}")
+        for module in MODULES:
+            ms = import_time_ms(module, args.repeats)
+            print(f"{module:<24}{'실패' if ms is None else f'{ms:,.0f}':>12}")
+        print()
+
+    failed = False
+    print(f"{'탭':<8}{'첫 실행 (ms)':>13}{'예산':>8}   무거운 모듈")
+    for tab in MAIN_TABS:
+        result = tab_first_run(tab)
+        heavy = [m for m in HEAVY if m in result["loaded"]]
+        ms = "-" if result["ms"] is None else f"{result['ms']:,.0f}"
+        print(f"{tab:<8}{ms:>13}{BUDGETS[tab]['ms'] * args.scale:>8,.0f}   {', '.join(heavy) or '-'}")
+        for problem in check_tab(tab, result, args.scale):
+            print(f"  예산 위반 ({tab}): {problem}")
+            failed = True
+
+    if args.check and failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
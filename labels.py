@@ -0,0 +1,244 @@
+"""
+지도 라벨 배치 엔진.
+
+레이어 전체의 라벨 위치를 한 번에(벡터화) 계산하고, 줌 단계마다 라벨끼리 겹치지 않도록
+우선순위 순으로 솎아낸 뒤, 지도 전체 라벨을 캔버스 레이어 하나로 그린다.
+- 라인: 선 위의 중간 지점 (line_interpolate_point 0.5) — 중심점처럼 선 밖으로 떨어지지 않음
+- 폴리곤: representative point (point_on_surface) — 항상 폴리곤 안쪽
+- 포인트: 점 자체 (MultiPoint는 점마다)
+라벨 하나당 DOM 노드를 만들지 않으므로 라벨 수가 많아도 브라우저 부담이 거의 같다.
+"""
+import json
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+from branca.element import MacroElement
+from folium.template import Template
+
+# 라벨 겹침을 따지는 줌 단계 (이 범위 밖의 줌은 가장 가까운 단계를 따른다)
+LABEL_MIN_ZOOM = 10
+LABEL_MAX_ZOOM = 18
+
+# 겹칠 때 남기는 순서: 라인 구역명 > 하구 폴리곤 코드 > 시작/종료 지점
+LABEL_PRIORITY = {"line": 3, "polygon": 2, "point": 1}
+
+# 기존 make_label_html 라벨과 같은 모양. anchor: 라벨 상자를 기준점의 어디에 둘지
+LABEL_STYLES = {
+    "line": {"fontSizePt": 12, "bold": True, "anchor": "center"},
+    "polygon": {"fontSizePt": 12, "bold": True, "anchor": "center"},
+    "point": {"fontSizePt": 9, "bold": False, "anchor": "left"},
+}
+STYLE_ORDER = ["line", "polygon", "point"]
+
+PADDING_X = 6
+PADDING_Y = 2
+POINT_LABEL_OFFSET = 8
+MERCATOR_HALF = 20037508.342789244
+
+
+def label_anchors(frame, layer_type):
+    """
+    layer_frame 결과(geometry, color, label)에서 라벨 기준점을 한 번에 계산.
+    반환: GeoDataFrame(geometry=Point, text, color, layer_type, priority)
+    """
+    labeled = frame[frame["label"].notna()]
+    if labeled.empty:
+        return _empty_anchors(frame.crs)
+
+    geoms = np.asarray(labeled.geometry.values)
+    if layer_type == "point":
+        exploded = labeled[["geometry", "color", "label"]].explode(index_parts=False)
+        anchors = np.asarray(exploded.geometry.values)
+        texts, colors = exploded["label"].to_numpy(), exploded["color"].to_numpy()
+        size = np.zeros(len(exploded))
+    else:
+        if layer_type == "line":
+            anchors = shapely.line_interpolate_point(shapely.line_merge(geoms), 0.5, normalized=True)
+            size = shapely.length(geoms)
+        else:
+            anchors = shapely.point_on_surface(geoms)
+            size = shapely.area(geoms)
+        texts, colors = labeled["label"].to_numpy(), labeled["color"].to_numpy()
+
+    # 같은 종류 안에서는 긴 선 / 넓은 폴리곤의 라벨을 먼저 남긴다
+    rank = pd.Series(size).rank(pct=True).to_numpy() if len(size) else size
+    out = gpd.GeoDataFrame(
+        {
+            "text": texts.astype(object),
+            "color": colors.astype(object),
+            "layer_type": layer_type,
+            "priority": LABEL_PRIORITY[layer_type] + rank * 0.5,
+        },
+        geometry=anchors,
+        crs=frame.crs,
+    )
+    return out[out.geometry.notna() & ~out.geometry.is_empty]
+
+
+def _empty_anchors(crs):
+    return gpd.GeoDataFrame(
+        {"text": [], "color": [], "layer_type": [], "priority": []},
+        geometry=gpd.GeoSeries([], crs=crs),
+    )
+
+
+def label_box_sizes(texts, layer_types):
+    """라벨 상자 크기(px) 추정. 한글 등 전각 문자는 글자 크기만큼, 나머지는 0.6배."""
+    widths = np.empty(len(texts))
+    heights = np.empty(len(texts))
+    for i, (t, lt) in enumerate(zip(texts, layer_types)):
+        font_px = LABEL_STYLES[lt]["fontSizePt"] * 4 / 3
+        units = sum(1.0 if ord(c) >= 0x1100 else 0.6 for c in str(t))
+        widths[i] = units * font_px + 2 * PADDING_X + 2
+        heights[i] = font_px * 1.3 + 2 * PADDING_Y + 2
+    return widths, heights
+
+
+def declutter(anchors, min_zoom=LABEL_MIN_ZOOM, max_zoom=LABEL_MAX_ZOOM):
+    """
+    줌 단계마다 우선순위가 높은 라벨부터 놓고, 이미 놓인 라벨과 겹치는 라벨은 숨긴다.
+    반환: 라벨별 비트마스크 (bit i = 줌 min_zoom + i 에서 표시)
+    """
+    n = len(anchors)
+    masks = np.zeros(n, dtype=np.int64)
+    if n == 0:
+        return masks
+
+    merc = anchors.geometry.to_crs("EPSG:3857")
+    mx, my = merc.x.to_numpy(), merc.y.to_numpy()
+    widths, heights = label_box_sizes(anchors["text"].tolist(), anchors["layer_type"].tolist())
+    centered = (anchors["layer_type"] != "point").to_numpy()
+
+    order = np.argsort(-anchors["priority"].to_numpy(), kind="stable")
+
+    for bit, z in enumerate(range(min_zoom, max_zoom + 1)):
+        res = 2 * MERCATOR_HALF / (256 * 2 ** z)
+        px = (mx + MERCATOR_HALF) / res
+        py = (MERCATOR_HALF - my) / res
+        x0 = np.where(centered, px - widths / 2, px + POINT_LABEL_OFFSET)
+        y0 = py - heights / 2
+        boxes = shapely.box(x0, y0, x0 + widths, y0 + heights)
+
+        # 겹치는 모든 쌍을 한 번에 구한 뒤, 우선순위 순으로 놓을지 결정
+        tree = shapely.STRtree(boxes)
+        left, right = tree.query(boxes, predicate="intersects")
+        neighbors = [[] for _ in range(n)]
+        for a, b in zip(left.tolist(), right.tolist()):
+            if a != b:
+                neighbors[a].append(b)
+
+        placed = np.zeros(n, dtype=bool)
+        for i in order:
+            if not any(placed[j] for j in neighbors[i]):
+                placed[i] = True
+        masks[placed] |= 1 << bit
+
+    return masks
+
+
+class LabelLayer(MacroElement):
+    """지도 전체 라벨을 그리는 캔버스 레이어 하나 (줌이 바뀌면 그 줌 단계의 라벨만 다시 그림)."""
+
+    _template = Template(
+        """
+        {% macro script(this, kwargs) %}
+        var {{ this.get_name() }} = (function() {
+            var data = {{ this.data_json }};
+            var Layer = L.Layer.extend({
+                onAdd: function(map) {
+                    this._map = map;
+                    this._canvas = L.DomUtil.create('canvas', 'leaflet-zoom-hide');
+                    this._canvas.style.pointerEvents = 'none';
+                    map.getPanes().markerPane.appendChild(this._canvas);
+                    map.on('moveend zoomend resize', this._redraw, this);
+                    this._redraw();
+                },
+                onRemove: function(map) {
+                    map.off('moveend zoomend resize', this._redraw, this);
+                    L.DomUtil.remove(this._canvas);
+                },
+                _redraw: function() {
+                    var map = this._map, size = map.getSize(), ratio = window.devicePixelRatio || 1;
+                    var canvas = this._canvas, ctx = canvas.getContext('2d');
+                    L.DomUtil.setPosition(canvas, map.containerPointToLayerPoint([0, 0]));
+                    canvas.width = size.x * ratio; canvas.height = size.y * ratio;
+                    canvas.style.width = size.x + 'px'; canvas.style.height = size.y + 'px';
+                    ctx.setTransform(ratio, 0, 0, ratio, 0, 0);
+                    ctx.clearRect(0, 0, size.x, size.y);
+
+                    var z = Math.round(map.getZoom());
+                    var bit = Math.min(Math.max(z, data.minZoom), data.maxZoom) - data.minZoom;
+                    ctx.textBaseline = 'middle';
+                    for (var i = 0; i < data.labels.length; i++) {
+                        var l = data.labels[i];
+                        if (!((l[4] >> bit) & 1)) continue;
+                        var p = map.latLngToContainerPoint([l[0], l[1]]);
+                        if (p.x < -400 || p.y < -50 || p.x > size.x + 400 || p.y > size.y + 50) continue;
+                        var s = data.styles[l[5]];
+                        var fontPx = s.fontSizePt * 4 / 3;
+                        ctx.font = (s.bold ? '700 ' : '500 ') + fontPx + 'px sans-serif';
+                        var w = ctx.measureText(l[2]).width + 2 * {{ this.padding_x }};
+                        var h = fontPx * 1.3 + 2 * {{ this.padding_y }};
+                        var x = s.anchor === 'center' ? p.x - w / 2 : p.x + {{ this.point_offset }};
+                        var y = p.y - h / 2;
+                        ctx.fillStyle = 'rgba(255,255,255,0.75)';
+                        ctx.strokeStyle = 'rgba(0,0,0,0.25)';
+                        ctx.lineWidth = 1;
+                        ctx.beginPath();
+                        if (ctx.roundRect) { ctx.roundRect(x, y, w, h, 6); } else { ctx.rect(x, y, w, h); }
+                        ctx.fill(); ctx.stroke();
+                        ctx.lineWidth = 2; ctx.strokeStyle = 'white';
+                        ctx.strokeText(l[2], x + {{ this.padding_x }}, p.y);
+                        ctx.fillStyle = l[3];
+                        ctx.fillText(l[2], x + {{ this.padding_x }}, p.y);
+                    }
+                }
+            });
+            return new Layer();
+        })().addTo({{ this._parent.get_name() }});
+        {% endmacro %}
+        """
+    )
+
+    def __init__(self, anchors, masks, min_zoom=LABEL_MIN_ZOOM, max_zoom=LABEL_MAX_ZOOM):
+        super().__init__()
+        self._name = "LabelLayer"
+        style_idx = {lt: i for i, lt in enumerate(STYLE_ORDER)}
+        labels = [
+            [round(g.y, 7), round(g.x, 7), str(t), str(c), int(mask), style_idx[lt]]
+            for g, t, c, lt, mask in zip(
+                anchors.geometry, anchors["text"], anchors["color"], anchors["layer_type"], masks
+            )
+            if mask
+        ]
+        data = {
+            "minZoom": min_zoom,
+            "maxZoom": max_zoom,
+            "styles": [LABEL_STYLES[lt] for lt in STYLE_ORDER],
+            "labels": labels,
+        }
+        # </script> 등이 라벨 텍스트에 섞여도 스크립트가 끊기지 않게 이스케이프
+        self.data_json = json.dumps(data, ensure_ascii=False).replace("</", "<\\/")
+        self.padding_x = PADDING_X
+        self.padding_y = PADDING_Y
+        self.point_offset = POINT_LABEL_OFFSET
+        self.count = len(labels)
+
+
+def add_labels(m, frames):
+    """
+    frames: [(layer_frame 결과, layer_type), ...] — 지도에 올라가는 모든 레이어.
+    라벨 기준점 계산 -> 겹침 정리 -> 캔버스 라벨 레이어 하나로 추가.
+    """
+    parts = [label_anchors(frame, lt) for frame, lt in frames]
+    parts = [p for p in parts if not p.empty]
+    if not parts:
+        return None
+    anchors = pd.concat(parts, ignore_index=True)
+    anchors = gpd.GeoDataFrame(anchors, geometry="geometry", crs=parts[0].crs)
+    masks = declutter(anchors)
+    layer = LabelLayer(anchors, masks)
+    layer.add_to(m)
+    return layer
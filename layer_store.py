@@ -0,0 +1,170 @@
+"""
+조사 경로 지도용 레이어 저장소.
+
+Streamlit은 위젯을 누를 때마다 web.py 전체를 다시 실행하지만, import 된 모듈은
+프로세스에 한 번만 올라간다. 그래서 이 모듈의 저장소 인스턴스는 모든 세션/재실행이
+함께 쓰며, 각 Shapefile을 한 번만 읽고 EPSG:4326으로 변환해 둔다.
+원본 파일(.shp/.dbf/.shx/.prj/.cpg)의 수정 시각이나 크기가 바뀌면 그때만 다시 읽는다.
+
+preprocess.py가 만든 GeoParquet 사이드카(data/*.parquet)가 원본보다 새로우면
+Shapefile 대신 사이드카를 읽는다 (이미 EPSG:4326 + sector_key/color/중심점 포함).
+"""
+import os
+import threading
+
+import geopandas as gpd
+
+from perf_trace import stage
+
+# Shapefile 한 세트를 이루는 파일 확장자 (하나라도 바뀌면 다시 읽는다)
+SHAPEFILE_PARTS = (".shp", ".dbf", ".shx", ".prj", ".cpg")
+SIDECAR_EXT = ".parquet"
+
+
+def sidecar_path(path):
+    return os.path.splitext(path)[0] + SIDECAR_EXT
+
+
+def file_signature(path):
+    """레이어 원본 파일들(+사이드카)의 (확장자, mtime_ns, size) 튜플. 없는 파일은 제외."""
+    base, _ = os.path.splitext(path)
+    sig = []
+    for ext in SHAPEFILE_PARTS + (SIDECAR_EXT,):
+        p = base + ext
+        try:
+            s = os.stat(p)
+        except FileNotFoundError:
+            continue
+        sig.append((ext, s.st_mtime_ns, s.st_size))
+    if not sig:
+        raise FileNotFoundError(path)
+    return tuple(sig)
+
+
+def data_version(paths):
+    """여러 레이어 파일의 시그니처 묶음. 지도 캐시 키 등에 쓴다."""
+    return tuple(file_signature(p) for p in paths)
+
+
+def sidecar_is_fresh(path):
+    """사이드카가 있고 원본 Shapefile 파일들보다 새로우면 True."""
+    try:
+        sidecar_mtime = os.stat(sidecar_path(path)).st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+    base, _ = os.path.splitext(path)
+    for ext in SHAPEFILE_PARTS:
+        try:
+            if os.stat(base + ext).st_mtime_ns > sidecar_mtime:
+                return False
+        except FileNotFoundError:
+            continue
+    return True
+
+
+def load_layer(path):
+    """레이어를 읽어 EPSG:4326으로 돌려준다 (캐시 없이). 최신 사이드카가 있으면 사이드카 우선."""
+    if sidecar_is_fresh(path):
+        try:
+            with stage("read_parquet", path=os.path.basename(path)) as span:
+                gdf = gpd.read_parquet(sidecar_path(path))
+                span.geometry(gdf)
+            return gdf
+        except ImportError:
+            # pyarrow가 없는 환경이면 원본 Shapefile 경로로
+            pass
+    return load_shapefile(path)
+
+
+def load_shapefile(path):
+    """Shapefile을 읽어 EPSG:4326으로 변환한다."""
+    with stage("read_file", path=os.path.basename(path)) as span:
+        gdf = gpd.read_file(path)
+        span.geometry(gdf)
+    if gdf.crs != "EPSG:4326":
+        with stage("to_crs", path=os.path.basename(path), crs=str(gdf.crs)):
+            gdf = gdf.to_crs(epsg=4326)
+    return gdf
+
+
+def _key_locks():
+    """키별 Lock을 만들어 주는 함수 (키마다 하나씩 재사용)."""
+    locks = {}
+    guard = threading.Lock()
+
+    def get(key):
+        with guard:
+            if key not in locks:
+                locks[key] = threading.Lock()
+            return locks[key]
+
+    return get
+
+
+class LayerStore:
+    """
+    path -> (파일 시그니처, GeoDataFrame) 캐시.
+
+    get()이 돌려주는 GeoDataFrame은 모든 세션이 공유하는 원본의 얕은 복사본이다.
+    컬럼 추가/교체는 캐시에 영향을 주지 않지만, 값을 제자리에서 바꾸려면
+    반드시 copy() 후에 수정할 것.
+    """
+
+    def __init__(self, loader=load_layer):
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._path_locks = _key_locks()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path):
+        sig = file_signature(path)
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == sig:
+                self.hits += 1
+                return entry[1].copy(deep=False)
+
+        # 같은 파일을 여러 세션이 동시에 읽지 않도록 파일 단위로 잠금
+        with self._path_locks(path):
+            with self._lock:
+                entry = self._entries.get(path)
+                if entry is not None and entry[0] == sig:
+                    self.hits += 1
+                    return entry[1].copy(deep=False)
+
+            gdf = self._loader(path)
+
+            with self._lock:
+                self._entries[path] = (sig, gdf)
+                self.misses += 1
+            return gdf.copy(deep=False)
+
+    def version(self, path):
+        """현재 캐시된 레이어의 시그니처 (캐시에 없으면 None)."""
+        with self._lock:
+            entry = self._entries.get(path)
+            return entry[0] if entry is not None else None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "layers": len(self._entries),
+            }
+
+
+_store = LayerStore()
+
+
+def get_layer_store():
+    """프로세스 공용 LayerStore."""
+    return _store
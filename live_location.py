@@ -0,0 +1,75 @@
+"""
+실시간 위치 추적 레이어.
+
+이전에는 위치가 바뀔 때마다 st.rerun()으로 스크립트 전체를 다시 돌려 지도와 레이어를
+모두 새로 만들었다. 이 레이어는 이미 그려진 지도 페이지 안에서 브라우저의
+navigator.geolocation.watchPosition으로 위치를 받아 마커와 오차 원만 옮긴다.
+서버는 위치가 바뀌어도 아무 일도 하지 않으므로, 추적하는 사용자 수와 지도 크기에
+상관없이 서버 CPU가 늘지 않는다.
+
+너무 잦은 갱신을 막기 위해 최소 갱신 간격(ms)과 최소 이동 거리(m)를 둔다.
+"""
+from branca.element import MacroElement
+from folium.template import Template
+
+DEFAULT_MIN_INTERVAL_MS = 2000
+DEFAULT_MIN_MOVE_M = 5.0
+FOLLOW_ZOOM = 16
+
+
+class LiveLocation(MacroElement):
+    """
+    지도에 붙이는 위치 추적 요소.
+    follow=True이면 첫 위치를 받았을 때 그 위치로 이동/확대한다.
+    마커 아이콘(AwesomeMarkers)은 folium.Map이 기본으로 불러오는 스크립트를 쓴다.
+    """
+
+    _template = Template(
+        """
+        {% macro script(this, kwargs) %}
+        (function(map) {
+            if (!navigator.geolocation) { return; }
+            var minIntervalMs = {{ this.min_interval_ms }};
+            var minMoveM = {{ this.min_move_m }};
+            var marker = null, circle = null, last = null, lastTime = 0;
+
+            function update(pos) {
+                var now = Date.now();
+                var ll = L.latLng(pos.coords.latitude, pos.coords.longitude);
+                var acc = pos.coords.accuracy || 0;
+                if (last && (now - lastTime < minIntervalMs || map.distance(last, ll) < minMoveM)) {
+                    return;
+                }
+                last = ll;
+                lastTime = now;
+
+                if (!marker) {
+                    marker = L.marker(ll, {
+                        icon: L.AwesomeMarkers.icon({icon: 'user', prefix: 'fa', markerColor: 'red'})
+                    }).bindTooltip('내 위치').bindPopup('').addTo(map);
+                    circle = L.circle(ll, {radius: acc, color: 'red', fill: true, fillOpacity: 0.1}).addTo(map);
+                    {% if this.follow %}map.setView(ll, {{ this.follow_zoom }});{% endif %}
+                } else {
+                    marker.setLatLng(ll);
+                    circle.setLatLng(ll).setRadius(acc);
+                }
+                marker.setPopupContent('📍 현재 위치<br>오차범위: ' + Math.round(acc) + 'm');
+            }
+
+            navigator.geolocation.watchPosition(update, function() {}, {
+                enableHighAccuracy: true,
+                maximumAge: minIntervalMs
+            });
+        })({{ this._parent.get_name() }});
+        {% endmacro %}
+        """
+    )
+
+    def __init__(self, min_interval_ms=DEFAULT_MIN_INTERVAL_MS, min_move_m=DEFAULT_MIN_MOVE_M,
+                 follow=True, follow_zoom=FOLLOW_ZOOM):
+        super().__init__()
+        self._name = "LiveLocation"
+        self.min_interval_ms = int(min_interval_ms)
+        self.min_move_m = float(min_move_m)
+        self.follow = follow
+        self.follow_zoom = follow_zoom
@@ -0,0 +1,149 @@
+"""
+라인/폴리곤 레이어의 줌 단계별 단순화(LOD) 피라미드.
+
+웹 메르카토르(EPSG:3857)에서 줌 z의 1픽셀은 156543.03 / 2**z 미터이므로,
+각 단계는 "그 줌에서 반 픽셀" 이하의 오차로 정점을 줄인다.
+- 폴리곤: 구역끼리 맞닿은 경계가 같은 모양으로 줄어들도록 shapely.coverage_simplify 사용
+  (폴리곤끼리 겹쳐서 유효한 커버리지가 아니면 도형별 simplify로 대체)
+- 라인: Douglas-Peucker(preserve_topology) — 양 끝점은 유지되므로 구간 연결은 그대로
+- 포인트: 단순화하지 않음
+
+지도는 처음 열리는 줌에 맞는 단계를 골라 보낸다 (tier_for_zoom).
+
+    python lod.py        # 레이어/단계별 정점 수와 GeoJSON 크기 보고서
+"""
+import json
+import threading
+
+import geopandas as gpd
+import numpy as np
+import shapely
+
+from layer_store import file_signature
+
+# 단계 = 이 줌까지는 반 픽셀 이내로 보이는 단순화. None은 원본.
+LOD_ZOOMS = (10, 12, 14)
+FULL_DETAIL = None
+
+# 처음 줌보다 이만큼 더 확대해도 티가 나지 않는 단계를 고른다
+ZOOM_HEADROOM = 1
+
+METERS_PER_PIXEL_Z0 = 156543.03392804097
+
+SIMPLIFY_CRS = "EPSG:3857"
+
+
+def tolerance_for_zoom(zoom):
+    """줌 zoom에서 반 픽셀에 해당하는 거리(EPSG:3857 미터)."""
+    return METERS_PER_PIXEL_Z0 / (2 ** zoom) / 2
+
+
+def tier_for_zoom(zoom, headroom=ZOOM_HEADROOM):
+    """지도 줌에 맞는 LOD 단계. 가장 세밀한 단계보다 확대하면 원본(None)."""
+    target = zoom + headroom
+    for z in LOD_ZOOMS:
+        if z >= target:
+            return z
+    return FULL_DETAIL
+
+
+def simplify_geometries(geoms, layer_type, tolerance):
+    """EPSG:3857 도형 배열을 단순화한다."""
+    if layer_type == "polygon":
+        if shapely.coverage_is_valid(geoms):
+            return shapely.coverage_simplify(geoms, tolerance)
+        return shapely.simplify(geoms, tolerance, preserve_topology=True)
+    if layer_type == "line":
+        return shapely.simplify(geoms, tolerance, preserve_topology=True)
+    return geoms
+
+
+def build_pyramid(gdf, layer_type):
+    """
+    {단계: GeoSeries(EPSG:4326)}. gdf와 같은 인덱스라 set_geometry로 바로 바꿔 쓸 수 있다.
+    원본 단계(None)는 gdf.geometry 그대로.
+    """
+    pyramid = {FULL_DETAIL: gdf.geometry}
+    if layer_type not in ("line", "polygon") or gdf.empty:
+        return pyramid
+
+    projected = gdf.geometry.to_crs(SIMPLIFY_CRS)
+    geoms = np.asarray(projected.values)
+    for z in LOD_ZOOMS:
+        simplified = simplify_geometries(geoms, layer_type, tolerance_for_zoom(z))
+        pyramid[z] = gpd.GeoSeries(simplified, index=projected.index, crs=SIMPLIFY_CRS).to_crs(gdf.crs)
+    return pyramid
+
+
+class PyramidStore:
+    """레이어 파일별 LOD 피라미드 캐시 (원본 파일이 바뀌면 다시 계산)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def get(self, path, gdf, layer_type):
+        sig = file_signature(path)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == sig and entry[1].index.equals(gdf.index):
+                return entry[2]
+
+        pyramid = build_pyramid(gdf, layer_type)
+        with self._lock:
+            self._entries[path] = (sig, gdf.geometry, pyramid)
+        return pyramid
+
+
+_store = PyramidStore()
+
+
+def get_pyramid_store():
+    return _store
+
+
+def layer_at_zoom(gdf, path, layer_type, zoom):
+    """지도 줌에 맞는 단계의 도형으로 바꾼 GeoDataFrame (다른 컬럼은 그대로)."""
+    tier = tier_for_zoom(zoom)
+    if tier is FULL_DETAIL or layer_type not in ("line", "polygon"):
+        return gdf
+    pyramid = _store.get(path, gdf, layer_type)
+    return gdf.set_geometry(pyramid[tier].values)
+
+
+def vertex_count(geoms):
+    return int(shapely.get_num_coordinates(np.asarray(geoms.values)).sum())
+
+
+def pyramid_report(tab_configs):
+    """레이어/단계별 정점 수와 GeoJSON 크기(bytes) 목록."""
+    from map_render import load_region_layers
+
+    rows = []
+    for tab_config in tab_configs:
+        gdfs = load_region_layers(tab_config)
+        for layer_type, item in gdfs.items():
+            pyramid = _store.get(item["config"]["path"], item["gdf"], layer_type)
+            for tier, geoms in pyramid.items():
+                payload = json.dumps(geoms.__geo_interface__, ensure_ascii=False)
+                rows.append({
+                    "layer": item["config"]["layer_name"],
+                    "tier": "원본" if tier is FULL_DETAIL else f"z{tier}",
+                    "tolerance_m": 0.0 if tier is FULL_DETAIL else round(tolerance_for_zoom(tier), 2),
+                    "vertices": vertex_count(geoms),
+                    "geojson_bytes": len(payload.encode("utf-8")),
+                })
+    return rows
+
+
+def main():
+    from sectors import TAB_CONFIGS
+
+    rows = pyramid_report(TAB_CONFIGS)
+    print(f"{'레이어':<12}{'단계':>6}{'허용오차(m)':>12}{'정점':>8}{'GeoJSON(bytes)':>16}")
+    for r in rows:
+        print(f"{r['layer']:<12}{r['tier']:>6}{r['tolerance_m']:>12}{r['vertices']:>8}{r['geojson_bytes']:>16}")
+
+
+if __name__ == "__main__":
+    main()
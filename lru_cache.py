@@ -0,0 +1,83 @@
+"""
+프로세스 공용 LRU 캐시 (항목 수 + 전체 바이트 수 제한, 스레드 안전).
+
+지도 HTML(map_cache), 내려받기 xlsx(team_export), LLM 응답(field_sheet), 벡터 타일(tiles)이 같이 쓴다.
+항목 크기는 size_of(값)으로 센다 (기본: 문자열은 UTF-8 바이트, bytes는 길이).
+"""
+import threading
+from collections import OrderedDict
+
+
+def byte_size(value):
+    """캐시 항목 크기(바이트). 문자열은 UTF-8로 센다 (한글 HTML/JSON은 글자당 3바이트)."""
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    return len(value)
+
+
+class LRUCache:
+    """키 -> 값 LRU 캐시. max_entries 개, max_bytes 바이트를 넘으면 오래된 것부터 제거."""
+
+    def __init__(self, max_entries=32, max_bytes=64 * 1024 * 1024, size_of=byte_size):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._size_of = size_of
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key][0]
+
+    def put(self, key, value):
+        size = self._size_of(value)
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            self._evict()
+
+    def get_or_build(self, key, build):
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        # 같은 키를 동시에 만드는 경우는 드물어 잠그지 않는다 (먼저 끝난 쪽이 덮어씀)
+        value = build()
+        with self._lock:
+            self.misses += 1
+        self.put(key, value)
+        return value
+
+    def _evict(self):
+        # 방금 넣은 항목 하나는 크기가 커도 남겨 둔다
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            _, (_, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
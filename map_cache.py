@@ -0,0 +1,26 @@
+"""
+완성된 지도 HTML 캐시.
+
+지도는 (지역, 폴리곤 표시 여부, 데이터 버전, GPS 위치 버킷)이 같으면 결과 HTML도 같다.
+프로세스 공용 LRU에 HTML을 보관해 두고, 키가 같으면 folium 지도를 다시 만들거나
+직렬화하지 않고 그대로 돌려준다. 항목 수와 전체 바이트 수 두 가지로 크기를 제한한다 (lru_cache.LRUCache).
+"""
+from lru_cache import LRUCache
+
+# GPS 좌표를 소수점 4자리(약 10m)로 묶는다. 같은 버킷 안의 이동은 같은 지도를 쓴다.
+LOCATION_BUCKET_DIGITS = 4
+
+
+def location_bucket(location, digits=LOCATION_BUCKET_DIGITS):
+    """streamlit_geolocation 결과를 (lat, lon) 버킷으로. 위치가 없으면 None."""
+    if not location or not location.get("latitude"):
+        return None
+    return (round(location["latitude"], digits), round(location["longitude"], digits))
+
+
+_cache = LRUCache(max_entries=32, max_bytes=64 * 1024 * 1024)
+
+
+def get_map_cache():
+    """프로세스 공용 지도 HTML 캐시."""
+    return _cache
@@ -0,0 +1,329 @@
+"""
+레이어 단위 지도 렌더러.
+
+피처마다 folium.GeoJson / folium.Marker를 만들지 않고, 레이어 하나를
+GeoJSON FeatureCollection 하나로 보낸다. 색상/툴팁/라벨 텍스트는 미리 컬럼으로
+계산해 properties에 넣고, 스타일은 브라우저에서 properties를 읽어 입힌다.
+라벨은 지도 전체를 캔버스 레이어 하나로 그린다 (labels.py).
+피처 수가 늘어도 Python 쪽 folium 객체 수와 JS 객체 정의 수는 레이어당 1개로 고정.
+"""
+import json
+
+import folium
+import geopandas as gpd
+import pandas as pd
+from folium.elements import EventHandler
+from folium.plugins import VectorGridProtobuf
+from folium.utilities import JsCode
+
+from labels import add_labels
+from layer_store import get_layer_store
+from live_location import LiveLocation
+from lod import layer_at_zoom
+from perf_trace import stage
+from tiles import tile_url_template
+from track import TrackLine
+from sectors import LAYER_ORDER, annotate_tab_layers
+
+NO_SECTOR_TEXT = "구역 정보 없음"
+
+# 레이어 종류별 기본 스타일 (color/fillColor는 feature.properties.color로 채움)
+LAYER_STYLES = {
+    "line": {"weight": 4, "opacity": 0.8},
+    "polygon": {"weight": 2, "fillOpacity": 0.3, "opacity": 0.8},
+    "polygon_outline": {"weight": 2, "opacity": 0.9, "fillColor": "transparent", "fillOpacity": 0.0},
+    "point": {"radius": 7, "weight": 3, "fill": True, "fillOpacity": 0.9},
+}
+
+# 하구 폴리곤은 sector와 상관없이 파란 외곽선만 표시
+HAGU_POLYGON_COLOR = "blue"
+
+DEFAULT_CENTER = (37.5, 127.0)
+DEFAULT_ZOOM = 13
+FOCUS_ZOOM = 16
+
+
+def _style_js(base_style):
+    return JsCode(
+        "function(feature) {"
+        f" var s = Object.assign({{}}, {json.dumps(base_style)});"
+        " s.color = feature.properties.color;"
+        " if (!('fillColor' in s)) { s.fillColor = feature.properties.color; }"
+        " return s; }"
+    )
+
+
+def _point_to_layer_js(base_style):
+    return JsCode(
+        "function(feature, latlng) {"
+        f" return L.circleMarker(latlng, {json.dumps(base_style)}); }}"
+    )
+
+
+def _text_or_none(series):
+    """strip 한 문자열 Series. 결측/빈 문자열은 None."""
+    s = series.astype("string").str.strip()
+    return s.where(s.notna() & (s != ""), None)
+
+
+def _drop_empty_geometries(gdf):
+    return gdf[gdf.geometry.notna() & ~gdf.geometry.is_empty]
+
+
+def layer_frame(gdf, layer_type, tab_name, layer_name):
+    """
+    렌더링용 GeoDataFrame (geometry, color, tooltip, label).
+    gdf에는 sectors.annotate_tab_layers가 붙인 sector_key/color 컬럼이 있어야 한다.
+    """
+    gdf = _drop_empty_geometries(gdf)
+    sector_text = _text_or_none(gdf["sector_key"]).fillna(NO_SECTOR_TEXT)
+
+    frame = gdf[["geometry"]].copy()
+    frame["color"] = gdf["color"].astype(object).where(gdf["color"].notna(), "blue")
+
+    if layer_type == "line":
+        # 표시용 이름(하구 라인은 name, 하천 라인은 sector_key)
+        display = sector_text
+        if tab_name == "하구" and "name" in gdf.columns:
+            display = _text_or_none(gdf["name"]).fillna(sector_text)
+        frame["tooltip"] = f"{layer_name} - " + display
+        frame["label"] = display
+
+    elif layer_type == "polygon":
+        frame["tooltip"] = f"{layer_name} - " + sector_text
+        if tab_name == "하구":
+            frame["color"] = HAGU_POLYGON_COLOR
+            frame["label"] = sector_text
+        else:
+            frame["label"] = None
+
+    elif layer_type == "point":
+        frame["tooltip"] = f"{layer_name} - " + sector_text
+        # 시작/종료 + 지점명 라벨
+        se = _text_or_none(gdf["startend"]) if "startend" in gdf.columns else pd.Series(None, index=gdf.index, dtype="string")
+        loc = _text_or_none(gdf["location"]) if "location" in gdf.columns else pd.Series(None, index=gdf.index, dtype="string")
+        label = (se + ": " + loc).where(se.notna() & loc.notna(), loc)
+        frame["label"] = label.astype(object).where(label.notna(), None)
+
+    else:
+        raise ValueError(f"알 수 없는 레이어 종류: {layer_type}")
+
+    frame["tooltip"] = frame["tooltip"].astype(object)
+    frame["label"] = frame["label"].astype(object)
+    return frame
+
+
+def _feature_collection(frame, columns):
+    return frame[columns + ["geometry"]].to_geo_dict(drop_id=True)
+
+
+def _base_style(layer_type, tab_name):
+    if layer_type == "polygon" and tab_name == "하구":
+        return LAYER_STYLES["polygon_outline"]
+    return LAYER_STYLES[layer_type]
+
+
+def frame_with_geometry(frame, gdf):
+    """layer_frame(원본) 결과의 도형만 같은 행의 gdf 도형(LOD 단계 등)으로 바꾼다. 비게 된 도형은 뺀다."""
+    return _drop_empty_geometries(frame.set_geometry(gdf.geometry.loc[frame.index].values))
+
+
+def add_layer_to_map(m, frame, layer_type, tab_name, layer_name):
+    """레이어 하나(layer_frame 결과)를 FeatureCollection 하나로 지도에 추가. (라벨은 labels.add_labels)"""
+    if frame.empty:
+        return frame
+
+    base_style = _base_style(layer_type, tab_name)
+    geojson_kwargs = {
+        "name": layer_name,
+        "style": _style_js(base_style),
+        "tooltip": folium.GeoJsonTooltip(fields=["tooltip"], labels=False),
+    }
+    if layer_type == "point":
+        geojson_kwargs["point_to_layer"] = _point_to_layer_js(base_style)
+        geojson_kwargs["popup"] = folium.GeoJsonPopup(fields=["tooltip"], labels=False)
+
+    with stage("folium_geojson", layer=layer_name):
+        folium.GeoJson(_feature_collection(frame, ["color", "tooltip"]), **geojson_kwargs).add_to(m)
+    return frame
+
+
+def _vector_style_js(base_style, layer_type):
+    fill = "true" if layer_type in ("polygon", "point") else "false"
+    return JsCode(
+        "function(properties, zoom) {"
+        f" var s = Object.assign({{fill: {fill}}}, {json.dumps(base_style)});"
+        " s.color = properties.color;"
+        " if (!('fillColor' in s)) { s.fillColor = properties.color; }"
+        " return s; }"
+    )
+
+
+def add_vector_tile_layer(m, url, layer_type, tab_name, layer_name):
+    """
+    도형을 벡터 타일(url)로 받아 오는 레이어 추가.
+    타일 속성의 color로 스타일을 입히고, 클릭하면 tooltip 속성을 팝업으로 보여준다.
+    """
+    grid = VectorGridProtobuf(
+        url,
+        name=layer_name,
+        options={
+            "interactive": True,
+            "vectorTileLayerStyles": {layer_type: _vector_style_js(_base_style(layer_type, tab_name), layer_type)},
+        },
+    )
+    grid.add_child(EventHandler("click", JsCode(
+        "function(e) {"
+        " var div = document.createElement('div');"
+        " div.textContent = e.layer.properties.tooltip || '';"
+        " L.popup().setLatLng(e.latlng).setContent(div).openOn(this._map); }"
+    )))
+    grid.add_to(m)
+
+
+def load_region_layers(tab_config, layer_store=None):
+    """탭의 레이어를 캐시에서 읽어 sector_key/color/중심점 컬럼까지 붙여 돌려준다."""
+    layer_store = layer_store or get_layer_store()
+    gdfs = {}
+    with stage("load_layers", region=tab_config["name"]):
+        for file_config in tab_config["files"]:
+            gdfs[file_config["type"]] = {"gdf": layer_store.get(file_config["path"]), "config": file_config}
+    with stage("annotate_layers", region=tab_config["name"]):
+        annotate_tab_layers(tab_config["name"], gdfs)
+    return gdfs
+
+
+def region_center(gdfs):
+    """모든 레이어를 합친 영역의 중심 (lat, lon)."""
+    all_bounds = [item["gdf"].total_bounds for item in gdfs.values() if not item["gdf"].empty]
+    if not all_bounds:
+        return DEFAULT_CENTER
+    min_x = min(b[0] for b in all_bounds)
+    min_y = min(b[1] for b in all_bounds)
+    max_x = max(b[2] for b in all_bounds)
+    max_y = max(b[3] for b in all_bounds)
+    return ((min_y + max_y) / 2, (min_x + max_x) / 2)
+
+
+def build_region_map(tab_config, gdfs, show_polygon, tile_url, focus=None, current_location=None,
+                     vector_tile_base_url=None, live_tracking=None, track=False):
+    """
+    탭 하나의 folium 지도를 만든다.
+    focus가 (lat, lon)이면 그 위치를 확대해서 보여주고, 아니면 전체 영역 중심에서 시작.
+    vector_tile_base_url이 있으면 도형은 그 타일 서버에서 받아 온다 (tiles.py).
+    live_tracking이 있으면(LiveLocation 인자 dict) 내 위치는 브라우저에서 직접 갱신하고
+    current_location 마커는 그리지 않는다.
+    track=True이면 기록된 이동 경로 polyline 자리를 만든다 (좌표는 track.inject_track으로 채움).
+    """
+    if focus:
+        center, zoom = focus, FOCUS_ZOOM
+    else:
+        center, zoom = region_center(gdfs), DEFAULT_ZOOM
+
+    m = folium.Map(location=list(center), zoom_start=zoom, tiles=None)
+
+    # 브이월드 배경지도
+    folium.TileLayer(
+        tiles=tile_url,
+        attr='VWorld',
+        name='배경지도',
+        overlay=False,
+        control=True
+    ).add_to(m)
+
+    # 각 레이어 추가 (라인 -> 폴리곤 -> 포인트 순서)
+    label_frames = []
+    for layer_type in LAYER_ORDER:
+        if layer_type not in gdfs:
+            continue
+
+        # 폴리곤이고 토글이 꺼져있으면 스킵
+        if layer_type == "polygon" and not show_polygon:
+            continue
+
+        layer_config = gdfs[layer_type]["config"]
+
+        # 색/툴팁/라벨 컬럼은 레이어마다 한 번만 만든다. 라벨 위치는 단순화하기 전 원본 도형 기준
+        with stage("layer_frame", layer=layer_config["layer_name"]) as span:
+            frame = layer_frame(gdfs[layer_type]["gdf"], layer_type, tab_config["name"], layer_config["layer_name"])
+            span.geometry(frame)
+        label_frames.append((frame, layer_type))
+
+        if vector_tile_base_url:
+            add_vector_tile_layer(
+                m,
+                tile_url_template(vector_tile_base_url, tab_config["name"], layer_type),
+                layer_type,
+                tab_config["name"],
+                layer_config["layer_name"],
+            )
+            continue
+
+        # 처음 줌에 맞는 LOD 단계의 도형만 보낸다
+        with stage("layer_at_zoom", layer=layer_config["layer_name"], zoom=zoom):
+            gdf = layer_at_zoom(gdfs[layer_type]["gdf"], layer_config["path"], layer_type, zoom)
+            if gdf is not gdfs[layer_type]["gdf"]:
+                frame = frame_with_geometry(frame, gdf)
+
+        add_layer_to_map(
+            m,
+            frame,
+            layer_type,
+            tab_config["name"],
+            layer_config["layer_name"],
+        )
+
+    # 모든 레이어의 라벨을 겹치지 않게 정리해서 한 레이어로
+    with stage("labels") as span:
+        layer = add_labels(m, label_frames)
+        span.set(labels=layer.count if layer is not None else 0)
+
+    if track:
+        TrackLine().add_to(m)
+
+    # 내 위치 마커
+    if live_tracking is not None:
+        LiveLocation(**live_tracking).add_to(m)
+    elif current_location and current_location.get("latitude"):
+        folium.Marker(
+            location=[current_location["latitude"], current_location["longitude"]],
+            popup="📍 현재 위치",
+            tooltip="내 위치",
+            icon=folium.Icon(color='red', icon='user', prefix='fa')
+        ).add_to(m)
+
+        if current_location.get("accuracy"):
+            folium.Circle(
+                location=[current_location["latitude"], current_location["longitude"]],
+                radius=current_location["accuracy"],
+                color='red', fill=True, fillOpacity=0.1,
+                popup=f"오차범위: {current_location['accuracy']:.0f}m"
+            ).add_to(m)
+
+    folium.LayerControl().add_to(m)
+    return m
+
+
+def render_map_html(m):
+    """지도를 완성된 HTML 문서 문자열로. (folium 지도는 한 번만 렌더링할 것)"""
+    with stage("render_html") as span:
+        html = m.get_root().render()
+        if span:
+            span.set(html_bytes=len(html.encode("utf-8")))
+    return html
+
+
+def vworld_tile_url(api_key):
+    """브이월드 배경지도 WMTS 타일 주소."""
+    return f'https://api.vworld.kr/req/wmts/1.0.0/{api_key}/Base/{{z}}/{{y}}/{{x}}.png'
+
+
+def region_map_html(tab_config, show_polygon, tile_url, layer_store=None, **map_options):
+    """
+    탭 하나의 지도 HTML 문서 (레이어 읽기 -> 지도 구성 -> 직렬화).
+    map_options는 build_region_map 인자 (focus, current_location, vector_tile_base_url, live_tracking, track).
+    """
+    gdfs = load_region_layers(tab_config, layer_store)
+    with stage("build_region_map", region=tab_config["name"]):
+        m = build_region_map(tab_config, gdfs, show_polygon, tile_url, **map_options)
+    return render_map_html(m)
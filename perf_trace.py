@@ -0,0 +1,234 @@
+"""
+재실행(rerun) 단계별 시간 측정 (켤 때만 동작).
+
+어느 단계가 느린지(레이어 읽기, 좌표 변환, folium 레이어 추가, HTML 직렬화, 조 편성 탐색,
+xlsx 내보내기 ...) 보려고 코드 곳곳을 stage("이름")으로 감싸 둔다.
+- 꺼져 있으면 stage()는 아무것도 하지 않는다 (ContextVar 하나 읽고 끝).
+- web.py가 재실행마다 begin_run()으로 기록을 열면, 그 스레드 안의 stage()가 단계를 쌓는다.
+  단계마다 걸린 시간, 프로세스 최대 RSS 증가분, 붙인 값(도형/정점 수, HTML 바이트 등).
+- end_run()은 기록 한 줄을 JSONL 파일(크기 기준으로 돌려 쓰는 로그)에 덧붙인다.
+- 다운로드 콜백처럼 재실행 밖에서 불리는 단계는, 로그 파일이 설정돼 있으면 단계 하나짜리 기록으로 남긴다.
+
+tracemalloc이 켜져 있으면(PYTHONTRACEMALLOC=1 등) 단계별 파이썬 힙 최대치도 적는다.
+"""
+import json
+import logging
+import os
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+DEFAULT_TRACE_PATH = os.path.join("logs", "perf_trace.jsonl")
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_BACKUPS = 3
+
+_current = ContextVar("perf_trace", default=None)
+_logger = None
+_logger_lock = threading.Lock()
+
+
+def _maxrss_mb():
+    """프로세스 최대 RSS(MB). 리눅스는 KB, macOS는 바이트 단위로 준다."""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (2**20 if sys.platform == "darwin" else 2**10)
+
+
+def configure_log(path=DEFAULT_TRACE_PATH, max_bytes=DEFAULT_MAX_BYTES, backups=DEFAULT_BACKUPS):
+    """JSONL 기록 파일 설정 (프로세스에 한 번. 경로가 같으면 그대로)."""
+    global _logger
+    with _logger_lock:
+        if _logger is not None and _logger.name == f"perf_trace:{path}":
+            return _logger
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        logger = logging.getLogger(f"perf_trace:{path}")
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        if not logger.handlers:
+            handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger.addHandler(handler)
+        _logger = logger
+        return logger
+
+
+def write_record(record):
+    if _logger is not None:
+        _logger.info(json.dumps(record, ensure_ascii=False, default=str))
+
+
+class Span:
+    """단계 하나: 이름(바깥 단계/안쪽 단계), 걸린 시간, 붙인 값."""
+
+    def __init__(self, name, depth, fields):
+        self.name = name
+        self.depth = depth
+        self.fields = dict(fields)
+        self.seconds = None
+
+    def set(self, **fields):
+        self.fields.update(fields)
+
+    def geometry(self, gdf):
+        """GeoDataFrame의 도형 수와 정점 수를 붙인다 (기록 중일 때만 센다)."""
+        import numpy as np
+        import shapely
+
+        geoms = np.asarray(gdf.geometry.values)
+        self.fields["features"] = len(geoms)
+        self.fields["vertices"] = int(shapely.get_num_coordinates(geoms).sum())
+
+    def as_dict(self):
+        return {"stage": self.name, "depth": self.depth, "ms": round(self.seconds * 1000, 2), **self.fields}
+
+
+class _NullSpan:
+    """꺼져 있을 때 stage()가 돌려주는 빈 단계. 거짓이라 `if span:`으로 비싼 값 계산을 건너뛸 수 있다."""
+
+    def __bool__(self):
+        return False
+
+    def set(self, **fields):
+        pass
+
+    def geometry(self, gdf):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class RunTrace:
+    """재실행 한 번의 단계 기록."""
+
+    def __init__(self, label, **fields):
+        self.id = uuid.uuid4().hex[:12]
+        self.label = label
+        self.fields = fields
+        self.spans = []
+        self._stack = []
+        self.started = time.perf_counter()
+        self.started_at = datetime.now().isoformat(timespec="milliseconds")
+        self.rss_start_mb = _maxrss_mb()
+        self.seconds = None
+        self.status = None
+
+    @contextmanager
+    def stage(self, name, **fields):
+        span = Span(name, len(self._stack), fields)
+        self.spans.append(span)
+        self._stack.append(span)
+        rss = _maxrss_mb()
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+        t0 = time.perf_counter()
+        try:
+            yield span
+        finally:
+            span.seconds = time.perf_counter() - t0
+            grown = _maxrss_mb() - rss
+            if grown > 0:
+                span.fields["rss_peak_grow_mb"] = round(grown, 1)
+            if tracing:
+                # 안쪽 단계가 reset_peak를 부르면 바깥 단계는 그 뒤의 최대치만 본다
+                span.fields["py_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+            self._stack.pop()
+
+    def finish(self, status="ok"):
+        if self.seconds is None:
+            self.seconds = time.perf_counter() - self.started
+            self.status = status
+        return self
+
+    def elapsed(self):
+        return self.seconds if self.seconds is not None else time.perf_counter() - self.started
+
+    def summary(self):
+        """재실행 한 줄 요약 (디버그 패널의 지난 재실행 표)."""
+        top = [s for s in self.spans if s.seconds is not None and s.depth == 0]
+        slowest = max(top, key=lambda s: s.seconds, default=None)
+        return {
+            "시각": self.started_at[11:],
+            "상태": self.status,
+            "ms": round(self.elapsed() * 1000, 1),
+            "단계 수": len(self.spans),
+            "가장 느린 단계": f"{slowest.name} ({slowest.seconds * 1000:,.0f}ms)" if slowest else None,
+        }
+
+    def record(self):
+        return {
+            "run": self.id,
+            "label": self.label,
+            "at": self.started_at,
+            "status": self.status,
+            "ms": round((self.seconds or 0) * 1000, 2),
+            "rss_peak_mb": round(_maxrss_mb(), 1),
+            "rss_peak_grow_mb": round(_maxrss_mb() - self.rss_start_mb, 1),
+            **self.fields,
+            "stages": [s.as_dict() for s in self.spans if s.seconds is not None],
+        }
+
+    def rows(self):
+        """단계 표 (디버그 패널용). 안쪽 단계는 이름 앞을 들여 쓴다."""
+        return [
+            {"단계": "  " * s.depth + s.name, "ms": round(s.seconds * 1000, 2),
+             "값": ", ".join(f"{k}={v}" for k, v in s.fields.items())}
+            for s in self.spans if s.seconds is not None
+        ]
+
+
+@contextmanager
+def stage(name, **fields):
+    """
+    단계 하나를 잰다. 기록 중이 아니면 빈 단계를 돌려준다.
+        with stage("read_file", path=path) as span:
+            gdf = gpd.read_file(path)
+            span.geometry(gdf)
+    """
+    trace = _current.get()
+    if trace is not None:
+        with trace.stage(name, **fields) as span:
+            yield span
+    elif _logger is not None:
+        # 재실행 밖(다운로드 콜백 등): 단계 하나짜리 기록
+        trace = RunTrace(name)
+        with trace.stage(name, **fields) as span:
+            yield span
+        write_record(trace.finish().record())
+    else:
+        yield _NULL_SPAN
+
+
+def current_trace():
+    return _current.get()
+
+
+def begin_run(label, previous=None, **fields):
+    """
+    이 스레드에서 재실행 기록을 연다.
+    previous(지난 재실행의 기록)가 닫히지 않았으면(st.rerun, 예외 등) "interrupted"로 닫아 남긴다.
+    """
+    for trace in (previous, _current.get()):
+        if trace is not None and trace.seconds is None:
+            end_run(trace, status="interrupted")
+    trace = RunTrace(label, **fields)
+    _current.set(trace)
+    return trace
+
+
+def end_run(trace, status="ok"):
+    """기록을 닫고 JSONL에 한 줄 쓴다. 이 스레드의 현재 기록이면 해제한다."""
+    if trace.seconds is None:
+        trace.finish(status)
+        write_record(trace.record())
+    if _current.get() is trace:
+        _current.set(None)
+    return trace
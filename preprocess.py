@@ -0,0 +1,54 @@
+"""
+지도 레이어 전처리 (1회 실행).
+
+Shapefile을 읽어 EPSG:4326으로 변환하고, sector 컬럼 정규화(sector_key),
+sector->color 매핑, 중심점(centroid_lon/lat)을 미리 계산해
+원본 옆에 GeoParquet 사이드카(data/*.parquet)로 저장한다.
+
+    python preprocess.py            # 모든 탭
+    python preprocess.py 하천       # 특정 탭만
+
+앱은 사이드카가 원본 .shp보다 새로울 때만 사이드카를 쓰므로,
+데이터를 바꾼 뒤에는 이 스크립트를 다시 실행하면 된다.
+"""
+import argparse
+import time
+
+from layer_store import load_shapefile, sidecar_path
+from sectors import TAB_CONFIGS, annotate_tab_layers
+
+
+def preprocess_tab(tab_config):
+    gdfs = {}
+    for file_config in tab_config["files"]:
+        gdfs[file_config["type"]] = {"gdf": load_shapefile(file_config["path"]), "config": file_config}
+
+    annotate_tab_layers(tab_config["name"], gdfs)
+
+    written = []
+    for item in gdfs.values():
+        out = sidecar_path(item["config"]["path"])
+        item["gdf"].to_parquet(out, index=False)
+        written.append((out, len(item["gdf"])))
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="조사 경로 레이어를 GeoParquet 사이드카로 전처리합니다.")
+    parser.add_argument("tabs", nargs="*", help="처리할 탭 이름 (예: 하천 하구). 생략하면 전체")
+    args = parser.parse_args(argv)
+
+    configs = [c for c in TAB_CONFIGS if not args.tabs or c["name"] in args.tabs]
+    if not configs:
+        parser.error(f"알 수 없는 탭: {', '.join(args.tabs)}")
+
+    for tab_config in configs:
+        t0 = time.perf_counter()
+        written = preprocess_tab(tab_config)
+        for out, n in written:
+            print(f"[{tab_config['name']}] {out} ({n}개 피처)")
+        print(f"[{tab_config['name']}] 완료 {time.perf_counter() - t0:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+정수 ID 명단과 NumPy 이력 행렬.
+
+이름 문자열을 한 번만 정리해 0..n-1 정수 ID로 바꾸고(역할/카메라 여부는 bool 배열),
+이력은 조밀한 행렬로 둔다.
+- pair[i, j]  : i와 j가 같은 조였던 횟수 (대칭, 대각 0)
+- group[i, g] : i가 g+1조였던 횟수
+- role[i, r]  : i가 조사자(r=0) / 섹장(r=1)을 한 횟수
+편성 벌점은 team_solver.TeamProblem이 이 행렬(pair, group, role)을 직접 읽어 계산한다
+(전체 편성 채점은 0이 아닌 쌍만 모은 COO 배열(upper_pairs)과 bincount로 조 전체를 한 번에).
+"""
+import numpy as np
+
+from team_history import ROLES
+
+ROLE_INVESTIGATOR = 0
+ROLE_LEADER = 1
+
+
+class Roster:
+    """이름 <-> 정수 ID. 등장 순서(조사자, 섹장, 쩌리 순)를 ID 순서로 쓴다."""
+
+    def __init__(self, names, investigators=(), leaders=(), cameras=()):
+        self.names = list(dict.fromkeys(n for n in names if n))
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.is_inv = self.mask(investigators)
+        self.is_lead = self.mask(leaders)
+        self.is_cam = self.mask(cameras)
+
+    @classmethod
+    def from_lists(cls, investigators, leaders, cameras, extras):
+        """parse_names_auto로 정리된 후보 목록들로. 카메라만 있는 사람은 명단에 넣지 않는다."""
+        return cls(list(investigators) + list(leaders) + list(extras), investigators, leaders, cameras)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def id(self, name):
+        return self.index[name]
+
+    def ids(self, names):
+        """명단에 있는 이름만 ID 배열로."""
+        return np.array([self.index[n] for n in names if n in self.index], dtype=np.int64)
+
+    def mask(self, names):
+        m = np.zeros(len(self.names), dtype=bool)
+        m[self.ids(names)] = True
+        return m
+
+
+class HistoryMatrices:
+    """team_history.get_history_stats 결과를 명단 순서의 행렬로."""
+
+    def __init__(self, roster, history_stats, k):
+        role_counts, pair_counts, group_counts = history_stats
+        n = len(roster)
+        index = roster.index
+
+        self._upper_pairs = None
+
+        groups = max([k] + [g for counts in group_counts.values() for g, c in counts.items() if c])
+        self.pair = np.zeros((n, n), dtype=np.int32)
+        self.group = np.zeros((n, groups), dtype=np.int32)
+        self.role = np.zeros((n, len(ROLES)), dtype=np.int32)
+
+        for (a, b), c in pair_counts.items():
+            i, j = index.get(a), index.get(b)
+            if c and i is not None and j is not None and i != j:
+                self.pair[i, j] += c
+                self.pair[j, i] += c
+        for name, counts in group_counts.items():
+            i = index.get(name)
+            if i is None:
+                continue
+            for g, c in counts.items():
+                if c:
+                    self.group[i, g - 1] += c
+        for name, counts in role_counts.items():
+            i = index.get(name)
+            if i is None:
+                continue
+            for r, role in enumerate(ROLES):
+                self.role[i, r] += counts.get(role, 0)
+
+    def upper_pairs(self):
+        """
+        같은 조였던 적이 있는 쌍(i < j)의 COO 배열 (i, j, 횟수). 전체 편성을 한 번에 채점할 때 쓰며,
+        처음 부를 때 한 번 만든다 (담금질의 증분 계산은 조밀 행렬을 그대로 쓴다).
+        """
+        if self._upper_pairs is None:
+            i, j = np.nonzero(np.triu(self.pair, 1))
+            self._upper_pairs = (i, j, self.pair[i, j].astype(np.int64))
+        return self._upper_pairs
@@ -0,0 +1,136 @@
+"""
+조사 경로 지도의 레이어 설정과 sector(구역) 정규화/색상 규칙.
+
+web.py와 전처리 스크립트(preprocess.py)가 같은 규칙을 쓰도록 여기에 모아 둔다.
+"""
+import shapely
+
+# 각 탭별 Shapefile 설정
+TAB_CONFIGS = [
+    {
+        "name": "하천",
+        "files": [
+            {"path": "data/HacheonLine.shp", "type": "line", "layer_name": "하천 라인", "sector_col": "sector"},
+            {"path": "data/HacheonPolygon.shp", "type": "polygon", "layer_name": "하천 폴리곤", "sector_col": "sector"},
+            {"path": "data/HacheonPoint.shp", "type": "point", "layer_name": "하천 포인트", "sector_col": "sector"}
+        ]
+    },
+    {
+        "name": "하구",
+        "files": [
+            {"path": "data/HaguLine.shp", "type": "line", "layer_name": "하구 라인", "sector_col": "sector"},
+            {"path": "data/HaguPolygon.shp", "type": "polygon", "layer_name": "하구 폴리곤", "sector_col": "code"},
+            {"path": "data/HaguPoint.shp", "type": "point", "layer_name": "하구 포인트", "sector_col": "sector"}
+        ]
+    }
+]
+
+LAYER_ORDER = ["line", "polygon", "point"]
+
+# 전처리/캐시 단계에서 붙이는 컬럼
+DERIVED_COLUMNS = ["sector_key", "color", "centroid_lon", "centroid_lat"]
+
+
+# 구역별 색상 할당
+def get_color_for_sector(sector_value, all_sectors):
+    colors = ['red', 'blue', 'green', 'purple', 'orange','darkblue', 'darkgreen', '#301934', 'pink']
+    try:
+        idx = list(all_sectors).index(sector_value)
+        return colors[idx % len(colors)]
+    except:
+        return 'blue'
+
+
+def normalize_sector_value(tab_name: str, sector_value: str):
+    """색상/표시 통일을 위한 sector 정규화."""
+    if sector_value is None:
+        return None
+    s = str(sector_value).strip()
+
+    # 하천 라인의 하천6-1, 하천6-2를 하천6으로 통일
+    if tab_name == "하천" and s.startswith("하천6-"):
+        return "하천6"
+
+    return s
+
+
+def find_sector_col(gdf, sector_col):
+    """설정된 sector 컬럼을 대소문자 구분 없이 찾는다. 못 찾으면 None."""
+    if not sector_col:
+        return None
+    if sector_col in gdf.columns:
+        return sector_col
+    for c in gdf.columns:
+        if c.lower() == sector_col.lower():
+            return c
+    return None
+
+
+def build_sector_color_map(tab_name: str, gdfs: dict):
+    """
+    탭(하천/하구) 단위로 sector->color 매핑을 1회 생성.
+    - 하구 polygon은 색 고정이므로, 매핑에는 굳이 포함하지 않아도 됨(포함해도 무방).
+    """
+    seen = set()
+    ordered = []
+
+    # line -> polygon -> point 순서로 “처음 등장한 sector”를 수집
+    for lt in LAYER_ORDER:
+        if lt not in gdfs:
+            continue
+        gdf = gdfs[lt]["gdf"]
+
+        if "sector" not in gdf.columns:
+            continue
+
+        for v in gdf["sector"].tolist():
+            key = normalize_sector_value(tab_name, v)
+            if key is None:
+                continue
+            if key not in seen:
+                seen.add(key)
+                ordered.append(key)
+
+    # colors는 기존 그대로 사용
+    sector_color_map = {}
+    for i, key in enumerate(ordered):
+        sector_color_map[key] = get_color_for_sector(key, ordered)  # 기존 함수 그대로 사용
+
+    return sector_color_map
+
+
+def has_derived_columns(gdf):
+    return all(c in gdf.columns for c in DERIVED_COLUMNS)
+
+
+def annotate_tab_layers(tab_name: str, gdfs: dict):
+    """
+    탭의 모든 레이어에 sector_key / color / 중심점 컬럼을 붙인다.
+    전처리된 사이드카에서 읽어 이미 컬럼이 있으면 그대로 둔다.
+    gdfs: {layer_type: {"gdf": GeoDataFrame, "config": file_config}} (제자리에서 gdf를 교체)
+    """
+    if all(has_derived_columns(v["gdf"]) for v in gdfs.values()):
+        return gdfs
+
+    sector_color_map = build_sector_color_map(tab_name, gdfs)
+
+    for lt, item in gdfs.items():
+        gdf = item["gdf"].copy()
+        sector_col = find_sector_col(gdf, item["config"].get("sector_col", "sector"))
+
+        if sector_col:
+            # build_sector_color_map과 같은 정규화 (NaN은 원래대로 "nan" 키가 되어 그 색을 받는다)
+            keys = [normalize_sector_value(tab_name, v) for v in gdf[sector_col].tolist()]
+        else:
+            keys = [None] * len(gdf)
+
+        gdf["sector_key"] = keys
+        gdf["color"] = [sector_color_map.get(k, "blue") for k in keys]
+
+        centroids = shapely.centroid(gdf.geometry.values)
+        gdf["centroid_lon"] = shapely.get_x(centroids)
+        gdf["centroid_lat"] = shapely.get_y(centroids)
+
+        item["gdf"] = gdf
+
+    return gdfs
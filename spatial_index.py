@@ -0,0 +1,174 @@
+"""
+현재 위치 공간 질의: "지금 어느 구역 안인가 / 가장 가까운 라인은 / 시작·종료 지점까지 몇 m인가".
+
+지역(탭)마다 레이어를 미터 단위 좌표계(EPSG:5179, 한국 통합좌표계)로 바꿔 STRtree를
+한 번만 만들어 두고(데이터 버전이 바뀌면 다시 만듦), GPS 좌표 하나마다
+- 그 점을 포함하는 폴리곤
+- 가장 가까운 라인과 거리(m)
+- 가장 가까운 시작/종료 지점과 거리(m)
+를 돌려준다. 질의 하나는 좌표 변환 1회 + 트리 질의 3회라 1ms보다 훨씬 짧다.
+
+    python spatial_index.py      # 지역별 질의 시간 측정
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+import shapely
+from pyproj import Transformer
+
+from layer_store import data_version
+from sectors import TAB_CONFIGS
+
+METRIC_CRS = "EPSG:5179"
+START_END_VALUES = ("시작", "종료")
+
+_to_metric = Transformer.from_crs("EPSG:4326", METRIC_CRS, always_xy=True)
+
+
+def _records(frame, columns):
+    """frame의 columns만 골라 결측은 None인 dict 목록으로."""
+    present = [c for c in columns if c in frame.columns]
+    values = frame[present].astype(object)
+    values = values.where(values.notna(), None)
+    return values.to_dict("records")
+
+
+class RegionIndex:
+    """지역(탭) 하나의 폴리곤/라인/시작·종료 지점 STRtree."""
+
+    def __init__(self, tab_config, gdfs):
+        from map_render import layer_frame
+
+        self.name = tab_config["name"]
+        self.polygons = self.lines = self.points = None
+
+        for layer_type, item in gdfs.items():
+            layer_name = item["config"]["layer_name"]
+            frame = layer_frame(item["gdf"], layer_type, self.name, layer_name)
+            frame["sector"] = item["gdf"].loc[frame.index, "sector_key"]
+            frame["layer_name"] = layer_name
+
+            if layer_type == "point":
+                for col in ("startend", "location"):
+                    if col in item["gdf"].columns:
+                        frame[col] = item["gdf"].loc[frame.index, col].astype("string").str.strip()
+                if "startend" not in frame.columns:
+                    continue
+                frame = frame[frame["startend"].isin(START_END_VALUES)].explode(index_parts=False)
+                columns = ["layer_name", "sector", "startend", "location"]
+            elif layer_type == "line":
+                columns = ["layer_name", "sector", "label"]
+            else:
+                columns = ["layer_name", "sector"]
+
+            if frame.empty:
+                continue
+            geoms = np.asarray(frame.geometry.to_crs(METRIC_CRS).values)
+            entry = {"geoms": geoms, "tree": shapely.STRtree(geoms), "attrs": _records(frame, columns)}
+            if layer_type == "polygon":
+                # 폴리곤이 겹치면 더 작은(구체적인) 쪽을 고른다
+                entry["area"] = shapely.area(geoms)
+            setattr(self, {"polygon": "polygons", "line": "lines", "point": "points"}[layer_type], entry)
+
+    def query(self, lat, lon):
+        """
+        GPS 좌표(WGS84) 하나에 대한 질의 결과.
+        {"polygon": 속성 또는 None,
+         "line": 속성 + distance_m 또는 None,
+         "point": 속성 + distance_m 또는 None}
+        """
+        pt = shapely.Point(*_to_metric.transform(lon, lat))
+        return {
+            "polygon": self._containing_polygon(pt),
+            "line": self._nearest(self.lines, pt),
+            "point": self._nearest(self.points, pt),
+        }
+
+    def _containing_polygon(self, pt):
+        if self.polygons is None:
+            return None
+        idx = self.polygons["tree"].query(pt, predicate="within")
+        if len(idx) == 0:
+            return None
+        best = idx[np.argmin(self.polygons["area"][idx])]
+        return dict(self.polygons["attrs"][best])
+
+    @staticmethod
+    def _nearest(layer, pt):
+        if layer is None:
+            return None
+        idx, dist = layer["tree"].query_nearest(pt, return_distance=True)
+        if len(idx) == 0:
+            return None
+        # 거리가 같은 후보가 여럿이면 첫 번째
+        result = dict(layer["attrs"][idx[0]])
+        result["distance_m"] = float(dist[0])
+        return result
+
+
+class SpatialIndexStore:
+    """지역별 RegionIndex 캐시 (원본 데이터 버전이 바뀌면 다시 만든다)."""
+
+    def __init__(self, tab_configs=TAB_CONFIGS):
+        self.tab_configs = {c["name"]: c for c in tab_configs}
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def get(self, name):
+        from map_render import load_region_layers
+
+        tab_config = self.tab_configs[name]
+        version = data_version([f["path"] for f in tab_config["files"]])
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and entry[0] == version:
+                return entry[1]
+
+        index = RegionIndex(tab_config, load_region_layers(tab_config))
+        with self._lock:
+            self._entries[name] = (version, index)
+        return index
+
+    def query(self, name, lat, lon):
+        return self.get(name).query(lat, lon)
+
+
+_store = SpatialIndexStore()
+
+
+def get_spatial_index_store():
+    """프로세스 공용 공간 질의 인덱스."""
+    return _store
+
+
+def locate(name, location):
+    """streamlit_geolocation 결과로 지역 name을 질의. 위치가 없으면 None."""
+    if not location or not location.get("latitude"):
+        return None
+    return _store.query(name, location["latitude"], location["longitude"])
+
+
+def main(n=2000):
+    import time
+
+    rng = np.random.default_rng(0)
+    for name in _store.tab_configs:
+        index = _store.get(name)
+        all_geoms = [l["geoms"] for l in (index.polygons, index.lines, index.points) if l is not None]
+        minx, miny, maxx, maxy = shapely.total_bounds(np.concatenate(all_geoms))
+        xs = rng.uniform(minx, maxx, n)
+        ys = rng.uniform(miny, maxy, n)
+        lons, lats = Transformer.from_crs(METRIC_CRS, "EPSG:4326", always_xy=True).transform(xs, ys)
+
+        times = []
+        for lat, lon in zip(lats, lons):
+            t = time.perf_counter()
+            index.query(lat, lon)
+            times.append(time.perf_counter() - t)
+        times = pd.Series(times) * 1000
+        print(f"{name}: {n}회 질의, 중앙값 {times.median():.3f}ms, p99 {times.quantile(0.99):.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
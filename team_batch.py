@@ -0,0 +1,232 @@
+"""
+여러 조사지(코호트) 조 편성을 한 번에.
+
+명단 파일 하나(xlsx/CSV)에 조사지 열을 더해 여러 조사지를 한꺼번에 받는다.
+    조사지 | 이름 | 조사자 | 섹장 | 카메라 | 같은 팀 | 다른 팀 | 조 개수
+(조사지 열 말고는 team_input의 명단 형식과 같다. 조 개수는 조사지의 첫 값을 쓰고, 없으면 기본값)
+
+- 조사지마다 독립 문제라 프로세스 풀에 나눠 동시에 돌린다 (조사지 하나 = 작업 하나).
+  풀은 새로 띄우지 않고 병렬 탐색(team_parallel)의 공용 풀을 같이 쓴다 (없을 때만 workers개로 띄운다).
+  작업자가 하나뿐이거나 조사지가 하나면 이 프로세스에서 차례로 푼다.
+- 결과는 입력 순서대로 끝나는 대로 내보낸다(iter_batch). batch_workbook은 그것을 받아
+  요약 시트(벌점, 중복 알림 수, 걸린 시간, 오류) + 조사지마다 시트 하나 + 중복 알림 시트로 쓴다.
+- 이력: 조사지마다 이전 날짜 표들을 주면 그 조사지의 이력으로 본다 (이전 일괄 결과 파일의 같은 이름 시트).
+"""
+import io
+import random
+import re
+import time
+from concurrent.futures import CancelledError
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from perf_trace import stage
+from team_history import format_teams_for_editor, get_history_stats
+from team_input import read_table, roster_from_table
+from team_solver import DEFAULT_TIME_BUDGET, InfeasibleError, TeamProblem
+from team_warnings import get_warnings
+
+COL_COHORT = "조사지"
+COL_K = "조 개수"
+SUMMARY_SHEET_NAME = "요약"
+WARNINGS_SHEET_NAME = "중복 알림"
+# 엑셀 시트 이름 제한: 31자, []:*?/\ 불가
+SHEET_NAME_MAX = 31
+_SHEET_BAD_CHARS = re.compile(r"[\[\]:*?/\\]")
+
+
+class CohortResult:
+    """조사지 하나의 편성 결과."""
+
+    def __init__(self, cohort, spec, teams=None, cam_set=None, penalty=None, error=None, seconds=0.0):
+        self.cohort = cohort
+        self.spec = spec
+        self.teams = teams
+        self.cam_set = cam_set
+        self.penalty = penalty
+        self.error = error
+        self.seconds = seconds
+        self.table = format_teams_for_editor(teams, cam_set) if teams is not None else None
+        self.warnings = []
+
+    @property
+    def people(self):
+        spec = self.spec
+        return len(set(spec["investigators"]) | set(spec["leaders"]) | set(spec["extras"]))
+
+
+def split_cohorts(df, default_k=None, cohort_column=COL_COHORT):
+    """
+    명단 표 -> {조사지: solve_teams 인자 dict} (조사지는 처음 나온 순서).
+    조 개수가 표에도 없고 default_k도 없으면 ValueError.
+    """
+    if cohort_column not in df.columns:
+        raise ValueError(f"명단 파일에 '{cohort_column}' 열이 없습니다. (열: {', '.join(map(str, df.columns))})")
+    cohorts = df[cohort_column].fillna("").astype(str).str.strip()
+    specs = {}
+    for cohort in dict.fromkeys(c for c in cohorts if c):
+        part = df[cohorts == cohort]
+        ks = [v for v in part[COL_K].tolist() if str(v).strip() not in ("", "nan", "None")] if COL_K in df.columns else []
+        k = ks[0] if ks else default_k
+        if k is None:
+            raise ValueError(f"{cohort}: 조 개수가 없습니다 ('{COL_K}' 열 또는 기본 조 개수)")
+        specs[cohort] = roster_from_table(part, int(float(k)))
+    return specs
+
+
+def _solve_cohort(spec, history, time_budget, seed):
+    """조사지 하나 (작업자 프로세스에서도 부른다) -> (teams, camera_set, 벌점, 오류, 걸린 시간)."""
+    t0 = time.perf_counter()
+    rng = random.Random(seed)
+    deadline = t0 + time_budget
+    try:
+        problem = TeamProblem(history_stats=history, **spec)
+        unit_team = problem.initial_assignment(rng)
+    except InfeasibleError as e:
+        return None, None, None, str(e), time.perf_counter() - t0
+    unit_team, cost = problem.anneal(unit_team, deadline, rng)
+    teams = problem.format(unit_team)
+    if teams is None:
+        return None, None, None, "제한 시간 안에 모든 조에 조사자/섹장을 배치하는 조합을 찾지 못했습니다.", time.perf_counter() - t0
+    return teams, problem.cam_set, cost, None, time.perf_counter() - t0
+
+
+def next_day(state):
+    """이력 dict 다음 날짜. 중간에 빠진 날짜(그 조사지 시트가 없던 파일)가 있어도 가장 큰 날짜 다음이다."""
+    days = [int(key[len("df_day_"):]) for key in state if key.startswith("df_day_")]
+    return max(days, default=0) + 1
+
+
+def iter_batch(specs, history=None, time_budget=DEFAULT_TIME_BUDGET, workers=1, seed=None):
+    """
+    specs: {조사지: solve_teams 인자 dict}
+    history: {조사지: get_history_stats가 읽는 dict ({"df_day_1": 표, ...})} — 없는 조사지는 이력 없음
+    workers: 공용 풀이 아직 없을 때 띄울 작업자 수 (서버 전체 설정, team_parallel.default_workers).
+      동시에 도는 조사지는 풀 크기와 조사지 수 중 작은 쪽이다.
+    조사지마다 CohortResult를 입력 순서대로, 끝나는 대로 내보낸다.
+    """
+    history = history or {}
+    cohorts = list(specs)
+    seeds = [int(s.generate_state(1)[0]) for s in np.random.SeedSequence(seed).spawn(len(cohorts))]
+    states, jobs = {}, []
+    for cohort, cohort_seed in zip(cohorts, seeds):
+        state = dict(history.get(cohort, {}))
+        day = next_day(state)
+        states[cohort] = (state, day)
+        jobs.append((specs[cohort], get_history_stats(day, state), time_budget, cohort_seed))
+
+    def finish(cohort, outcome):
+        teams, cam_set, penalty, error, seconds = outcome
+        result = CohortResult(cohort, specs[cohort], teams, cam_set, penalty, error, seconds)
+        if result.table is not None:
+            state, day = states[cohort]
+            result.warnings = get_warnings(result.table, day, state)
+        return result
+
+    if min(workers or 1, len(cohorts)) <= 1:
+        for cohort, job in zip(cohorts, jobs):
+            with stage("batch_cohort", cohort=cohort):
+                yield finish(cohort, _solve_cohort(*job))
+        return
+
+    from team_parallel import discard_executor, submit_jobs
+
+    executor, futures = submit_jobs(_solve_cohort, jobs, workers)
+    try:
+        for cohort, future in zip(cohorts, futures):
+            try:
+                outcome = future.result()
+            except BrokenProcessPool:
+                discard_executor(executor)
+                outcome = None, None, None, "작업자 프로세스가 비정상 종료되었습니다. 다시 실행해 주세요.", 0.0
+            except CancelledError:
+                outcome = None, None, None, "작업이 취소되었습니다. 다시 실행해 주세요.", 0.0
+            yield finish(cohort, outcome)
+    finally:
+        # 공용 풀이라 닫지 않고, 중간에 그만두면 아직 시작하지 않은 조사지만 뺀다
+        for future in futures:
+            future.cancel()
+
+
+def _sheet_name(cohort, used):
+    """조사지 이름 -> used에 없는 엑셀 시트 이름 (used에 더한다)."""
+    base = _SHEET_BAD_CHARS.sub("_", cohort)[:SHEET_NAME_MAX] or "_"
+    name, n = base, 2
+    while name in used:
+        suffix = f" ({n})"
+        name, n = base[:SHEET_NAME_MAX - len(suffix)] + suffix, n + 1
+    used.add(name)
+    return name
+
+
+def sheet_names(cohorts):
+    """조사지 이름들 -> {조사지: 시트 이름} (batch_workbook과 같은 규칙)."""
+    used = {SUMMARY_SHEET_NAME, WARNINGS_SHEET_NAME}
+    return {cohort: _sheet_name(cohort, used) for cohort in cohorts}
+
+
+SUMMARY_HEADER = ["조사지", "인원", "조 개수", "벌점", "중복 알림", "시간(초)", "결과"]
+
+
+def summary_row(result):
+    return [
+        result.cohort, result.people, result.spec["k"], result.penalty, len(result.warnings),
+        round(result.seconds, 2), result.error or "성공",
+    ]
+
+
+def batch_workbook(results):
+    """
+    CohortResult들(iter_batch) -> xlsx 바이트. 요약 시트가 맨 앞, 조사지 시트, 중복 알림 시트 순서.
+    write-only 통합 문서라 결과를 받는 대로 조사지 시트를 쓴다.
+    """
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    summary = wb.create_sheet(SUMMARY_SHEET_NAME)
+    summary.append(SUMMARY_HEADER)
+    warning_rows = []
+    used = {SUMMARY_SHEET_NAME, WARNINGS_SHEET_NAME}
+    for result in results:
+        summary.append(summary_row(result))
+        warning_rows += [[result.cohort, w.replace("**", "")] for w in result.warnings]
+        # 실패한 조사지도 이름은 차지한다 (sheet_names와 같은 이름이 되도록)
+        name = _sheet_name(result.cohort, used)
+        if result.table is None:
+            continue
+        ws = wb.create_sheet(name)
+        ws.append([str(c) for c in result.table.columns])
+        for row in result.table.itertuples(index=False, name=None):
+            ws.append(list(row))
+    ws = wb.create_sheet(WARNINGS_SHEET_NAME)
+    ws.append(["조사지", "알림"])
+    for row in warning_rows:
+        ws.append(row)
+
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+def read_batch_history(paths, cohorts):
+    """
+    이전 일괄 결과 xlsx들(날짜 순서) -> {조사지: {"df_day_1": 표, ...}}.
+    파일마다 조사지와 이름이 같은 시트를 읽고, 없는 조사지는 그 날짜가 비어 있다 (날짜 번호는 파일 순서 그대로).
+    """
+    import pandas as pd
+
+    names = sheet_names(cohorts)
+    history = {cohort: {} for cohort in cohorts}
+    for day, path in enumerate(paths, start=1):
+        sheets = pd.read_excel(path, sheet_name=None, dtype=str)
+        for cohort in cohorts:
+            df = sheets.get(names[cohort])
+            if df is not None:
+                history[cohort][f"df_day_{day}"] = df.fillna("")
+    return history
+
+
+def read_batch(path, default_k=None, cohort_column=COL_COHORT, sheet=0):
+    """일괄 명단 파일 -> {조사지: solve_teams 인자 dict}."""
+    return split_cohorts(read_table(path, sheet), default_k, cohort_column)
@@ -0,0 +1,111 @@
+"""
+조 편성 표 xlsx 내보내기.
+
+예전에는 날짜 탭마다, rerun 때마다 openpyxl로 표를 직렬화해 download_button에 넘겼다.
+- 만든 xlsx 바이트는 표 내용 해시(frame_digest)를 키로 프로세스 공용 LRU에 둔다.
+- web.py는 download_button에 바이트 대신 이 모듈의 함수를 넘기므로, 실제로 내려받을 때만 만든다.
+- 전체 일정은 모든 날짜 표와 이력 요약 시트를 write-only 통합 문서 하나에 한 번에 쓴다.
+- openpyxl은 처음 파일을 만들 때 읽는다 (조 편성 탭을 여는 것만으로는 읽지 않음).
+"""
+import io
+from collections import defaultdict
+
+from lru_cache import LRUCache
+from perf_trace import stage
+from team_history import ROLES, day_contribution, frame_digest, sum_stats
+
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+DAY_SHEET_NAME = "조편성"
+SUMMARY_SHEET_NAME = "이력 요약"
+# 이력 요약에서 이 횟수 이상 같은 조였던 짝만 적는다
+SUMMARY_MIN_PAIR_COUNT = 2
+
+_cache = LRUCache(max_entries=64, max_bytes=16 * 1024 * 1024)
+
+
+def get_export_cache():
+    """프로세스 공용 xlsx 바이트 캐시."""
+    return _cache
+
+
+def _cell(value):
+    if value is None or (isinstance(value, float) and value != value):
+        return None
+    return value
+
+
+def _append_frame(wb, title, df):
+    ws = wb.create_sheet(title)
+    ws.append([str(c) for c in df.columns])
+    for row in df.itertuples(index=False, name=None):
+        ws.append([_cell(v) for v in row])
+
+
+def _save(wb):
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+def day_workbook(df):
+    """하루치 표 -> xlsx 바이트 (시트 하나)."""
+    def build():
+        from openpyxl import Workbook
+
+        with stage("xlsx_day", rows=len(df), cols=len(df.columns)) as span:
+            wb = Workbook(write_only=True)
+            _append_frame(wb, DAY_SHEET_NAME, df)
+            data = _save(wb)
+            span.set(xlsx_bytes=len(data))
+        return data
+
+    return _cache.get_or_build(("day", frame_digest(df)), build)
+
+
+def history_summary_rows(stats):
+    """
+    누적 통계 -> 사람별 요약 행 (헤더 포함).
+    참여 일수, 역할 횟수, 조 번호별 횟수, 여러 번 같은 조였던 사람.
+    """
+    role_counts, pair_counts, group_counts = stats
+    partners = defaultdict(list)
+    for (a, b), c in pair_counts.items():
+        if c >= SUMMARY_MIN_PAIR_COUNT:
+            partners[a].append((b, c))
+            partners[b].append((a, c))
+
+    rows = [["이름", "참여 일수", *ROLES, "쩌리", "조 번호", f"{SUMMARY_MIN_PAIR_COUNT}번 이상 같은 조"]]
+    for name in sorted(group_counts):
+        days = sum(group_counts[name].values())
+        if not days:
+            continue
+        roles = [role_counts[name][role] for role in ROLES] if name in role_counts else [0] * len(ROLES)
+        groups = ", ".join(f"{g}조×{c}" for g, c in sorted(group_counts[name].items()) if c)
+        repeated = ", ".join(f"{p}×{c}" for p, c in sorted(partners[name], key=lambda pc: (-pc[1], pc[0])))
+        rows.append([name, days, *roles, days - sum(roles), groups, repeated])
+    return rows
+
+
+def schedule_workbook(frames):
+    """
+    frames: {날짜: 표} -> xlsx 바이트. 날짜마다 시트 하나("N일차") + 이력 요약 시트.
+    모든 표의 내용 해시가 같으면 캐시된 바이트를 돌려준다.
+    """
+    days = sorted(d for d, df in frames.items() if df is not None)
+    key = ("schedule", tuple((d, frame_digest(frames[d])) for d in days))
+
+    def build():
+        from openpyxl import Workbook
+
+        with stage("xlsx_schedule", days=len(days)) as span:
+            wb = Workbook(write_only=True)
+            for d in days:
+                _append_frame(wb, f"{d}일차", frames[d])
+            ws = wb.create_sheet(SUMMARY_SHEET_NAME)
+            for row in history_summary_rows(sum_stats(day_contribution(frames[d]) for d in days)):
+                ws.append(row)
+            data = _save(wb)
+            span.set(xlsx_bytes=len(data))
+        return data
+
+    return _cache.get_or_build(key, build)
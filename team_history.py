@@ -0,0 +1,250 @@
+"""
+조 편성 이력 통계 (역할 / 같은 조였던 쌍 / 조 번호 횟수).
+
+예전에는 버튼을 누를 때와 rerun 때마다 이전 날짜 표를 모두 iterrows로 다시 훑었다.
+HistoryIndex는 날짜별 기여분(그날 하루의 카운트)을 표 내용 해시와 함께 보관하고,
+표 내용이 바뀐 날짜만 다시 센다. N일차 이전까지의 누적값은 날짜별 누적(prefix)으로
+캐시해 두고, 어떤 날짜가 바뀌면 그 날짜 이후의 누적만 버린다.
+"""
+import hashlib
+from collections import defaultdict
+
+import pandas as pd
+
+from perf_trace import stage
+
+CAMERA_MARK = " 📷"
+ROLES = ("조사자", "섹장")
+
+
+def clean_name(value):
+    """표 셀 값 -> 이름. 카메라 표시를 떼고, 빈 값/NaN은 None."""
+    if value is None or (isinstance(value, float) and value != value):
+        return None
+    name = str(value).replace(CAMERA_MARK, "").strip()
+    if not name or name == "nan":
+        return None
+    return name
+
+
+def team_columns(df):
+    return [c for c in df.columns if "조" in c]
+
+
+def format_teams_for_editor(teams, camera_set):
+    max_jjuri = max((len(t["쩌리"]) for t in teams), default=0)
+    def mark(name):
+        if not name: return ""
+        return f"{name} 📷" if name in camera_set else name
+
+    rows = []
+    rows.append(["조사자"] + [mark(t["조사자"]) for t in teams])
+    rows.append(["섹장"] + [mark(t["섹장"]) for t in teams])
+    for i in range(max_jjuri):
+        row = [f"쩌리{i+1}"]
+        for t in teams:
+            if i < len(t["쩌리"]): row.append(mark(t["쩌리"][i]))
+            else: row.append("")
+        rows.append(row)
+        
+    cols = ["역할"] + [f"{i+1}조" for i in range(len(teams))]
+    return pd.DataFrame(rows, columns=cols)
+
+
+def frame_digest(df):
+    """표 내용(열 이름 + 셀 값) 해시. None이면 None."""
+    if df is None:
+        return None
+    # 표가 작아(수십 x 수십 칸) hash_pandas_object보다 셀 값 repr을 바로 해시하는 편이 빠르다
+    payload = repr((list(map(str, df.columns)), df.to_numpy(dtype=object).tolist()))
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _empty_stats():
+    return (
+        defaultdict(lambda: {"조사자": 0, "섹장": 0}),
+        defaultdict(int),
+        defaultdict(lambda: defaultdict(int)),
+    )
+
+
+def day_contribution(df):
+    """하루치 표의 (role_counts, pair_counts, group_counts)."""
+    role_counts, pair_counts, group_counts = _empty_stats()
+    if df is None or df.empty:
+        return role_counts, pair_counts, group_counts
+
+    cols = team_columns(df)
+    roles = df["역할"].tolist() if "역할" in df.columns else [None] * len(df)
+    for group_num, col in enumerate(cols, start=1):
+        members = []
+        for role, value in zip(roles, df[col].tolist()):
+            name = clean_name(value)
+            if name is None:
+                continue
+            if role in ROLES:
+                role_counts[name][role] += 1
+            group_counts[name][group_num] += 1
+            members.append(name)
+        for i in range(len(members)):
+            for j in range(i + 1, len(members)):
+                pair_counts[tuple(sorted((members[i], members[j])))] += 1
+    return role_counts, pair_counts, group_counts
+
+
+def teams_contribution(teams):
+    """solve_teams 형식의 편성 [{"조사자", "섹장", "쩌리"}, ...]의 하루치 통계 (day_contribution과 같은 값)."""
+    role_counts, pair_counts, group_counts = _empty_stats()
+    for group_num, team in enumerate(teams, start=1):
+        members = []
+        for role in ROLES:
+            name = team.get(role)
+            if name:
+                role_counts[name][role] += 1
+                members.append(name)
+        members.extend(name for name in team.get("쩌리", []) if name)
+        for name in members:
+            group_counts[name][group_num] += 1
+        for i in range(len(members)):
+            for j in range(i + 1, len(members)):
+                pair_counts[tuple(sorted((members[i], members[j])))] += 1
+    return role_counts, pair_counts, group_counts
+
+
+def _add_stats(target, delta):
+    role_counts, pair_counts, group_counts = target
+    d_role, d_pair, d_group = delta
+    for name, counts in d_role.items():
+        for role, n in counts.items():
+            role_counts[name][role] += n
+    for pair, n in d_pair.items():
+        pair_counts[pair] += n
+    for name, counts in d_group.items():
+        for group_num, n in counts.items():
+            group_counts[name][group_num] += n
+
+
+def _copy_stats(stats):
+    copied = _empty_stats()
+    _add_stats(copied, stats)
+    return copied
+
+
+def sum_stats(parts):
+    """여러 날짜 통계를 더한 새 통계."""
+    total = _empty_stats()
+    for part in parts:
+        _add_stats(total, part)
+    return total
+
+
+def plain_stats(stats):
+    """
+    통계를 일반 dict로 복사 (defaultdict(lambda ...)는 pickle되지 않아 다른 프로세스로 보낼 때,
+    캐시된 누적값을 밖으로 내줄 때).
+    """
+    role_counts, pair_counts, group_counts = stats
+    return (
+        {p: dict(c) for p, c in role_counts.items()},
+        dict(pair_counts),
+        {p: dict(c) for p, c in group_counts.items()},
+    )
+
+
+class HistoryIndex:
+    """날짜별 기여분과 누적 통계 캐시 (세션마다 하나)."""
+
+    def __init__(self):
+        self._days = {}     # day -> (digest, contribution)
+        self._prefix = {}   # day -> day일차까지의 누적 통계
+        self.recounts = 0
+
+    def update_day(self, day, df):
+        """day일차 표를 반영. 내용이 바뀌었으면 True."""
+        digest = frame_digest(df)
+        entry = self._days.get(day)
+        if entry is not None and entry[0] == digest:
+            return False
+        self._days[day] = (digest, day_contribution(df))
+        self.recounts += 1
+        for d in [d for d in self._prefix if d >= day]:
+            del self._prefix[d]
+        return True
+
+    def prefix_key(self, day):
+        """1 ~ day일차 표 내용 해시 튜플. 같으면 cumulative(day)도 같다."""
+        return tuple(self._days[d][0] if d in self._days else None for d in range(1, day + 1))
+
+    def contribution(self, day):
+        entry = self._days.get(day)
+        return entry[1] if entry is not None else _empty_stats()
+
+    def cumulative(self, day):
+        """1일차부터 day일차까지의 누적 (role_counts, pair_counts, group_counts)."""
+        if day <= 0:
+            return _empty_stats()
+        if day not in self._prefix:
+            stats = _copy_stats(self.cumulative(day - 1))
+            _add_stats(stats, self.contribution(day))
+            self._prefix[day] = stats
+        return self._prefix[day]
+
+    def sync(self, session_state, last_day):
+        """session_state의 df_day_1 ~ df_day_{last_day}를 반영 (바뀐 날짜만 다시 셈)."""
+        for d in range(1, last_day + 1):
+            self.update_day(d, session_state.get(f"df_day_{d}"))
+
+
+def store_day_summary(session_state, day, df, n_warnings):
+    """날짜 탭을 열었을 때의 중복 알림 수를 표 해시와 함께 둔다 (day_summaries가 읽는다)."""
+    session_state.setdefault("day_summaries", {})[day] = (frame_digest(df), n_warnings)
+
+
+def day_summaries(session_state, num_days):
+    """
+    날짜별 요약 행. 중복 알림 수는 그 날짜 탭을 마지막으로 열었을 때 값이고,
+    그 뒤 표가 바뀌었으면(전체 일정 편성 등) 탭을 열 때까지 비워 둔다.
+    """
+    cached = session_state.get("day_summaries", {})
+    rows = []
+    for day in range(1, num_days + 1):
+        df = session_state.get(f"df_day_{day}")
+        names = set()
+        if df is not None:
+            for col in team_columns(df):
+                names.update(n for n in map(clean_name, df[col].tolist()) if n)
+        entry = cached.get(day)
+        n_warnings = entry[1] if entry is not None and entry[0] == frame_digest(df) else None
+        rows.append({
+            "날짜": f"{day}일차",
+            "조": len(team_columns(df)) if df is not None else None,
+            "인원": len(names),
+            "중복 알림": n_warnings,
+        })
+    return rows
+
+
+def get_history_index(session_state, last_day=0):
+    """
+    세션의 이력 원본 (없으면 HistoryIndex를 만든다). HistoryIndex면 df_day_1 ~ df_day_{last_day}를
+    먼저 반영한다. 저장소를 쓰는 세션의 team_store.StoreHistory는 저장소를 읽으므로 그대로 돌려준다.
+    """
+    if "history_index" not in session_state:
+        session_state["history_index"] = HistoryIndex()
+    index = session_state["history_index"]
+    if isinstance(index, HistoryIndex):
+        index.sync(session_state, last_day)
+    return index
+
+
+def get_history_stats(day_idx, session_state):
+    """
+    day_idx일차 이전(1 ~ day_idx-1일차)까지의 누적 이력.
+    Returns:
+        role_counts: {이름: {'조사자': 횟수, '섹장': 횟수}}
+        pair_counts: {(이름A, 이름B): 같이한 횟수}
+        group_counts: {이름: {1: 횟수, 2: 횟수, ...}}
+    캐시된 누적값(defaultdict)을 일반 dict로 옮겨 돌려준다. 없는 키를 읽거나 값을 고쳐도 캐시는 그대로다.
+    """
+    with stage("history_stats", day=day_idx):
+        return plain_stats(get_history_index(session_state, day_idx - 1).cumulative(day_idx - 1))
@@ -0,0 +1,168 @@
+"""
+조 편성 입력 읽기 (Streamlit 없이 쓸 수 있는 부분).
+
+- 후보 입력 칸 텍스트: 이름 목록 / "A-B" 제약 쌍
+- 명단 파일(xlsx/CSV): 한 행에 한 사람. 열 이름은 아래 COLUMNS (없는 열은 빈 값으로 본다)
+    이름 | 조사자 | 섹장 | 카메라 | 같은 팀 | 다른 팀
+  조사자/섹장/카메라는 표시 열(1, O, Y, 예, TRUE ...)이고, 둘 다 아니면 쩌리 후보다.
+  같은 팀/다른 팀은 그 사람과 꼭 같은(다른) 팀이어야 하는 이름들 (콤마/줄바꿈으로 구분).
+- 이전 날짜 결과 파일: 앱/CLI가 내려준 조 편성 xlsx (첫 시트가 날짜 표)
+- 앱의 날짜 탭 입력: Session State의 f"{이름}_{날짜}" 값 (DAY_INPUT_KEYS)
+
+파일을 읽을 때만 pandas를 읽는다 (조 편성 탭이 닫힌 세션도 keep_day_inputs를 부르므로).
+"""
+import os
+import re
+
+COL_NAME = "이름"
+COL_INVESTIGATOR = "조사자"
+COL_LEADER = "섹장"
+COL_CAMERA = "카메라"
+COL_TOGETHER = "같은 팀"
+COL_APART = "다른 팀"
+COLUMNS = (COL_NAME, COL_INVESTIGATOR, COL_LEADER, COL_CAMERA, COL_TOGETHER, COL_APART)
+
+# 표시 열에서 "그렇다"로 보는 값 (앞뒤 공백/대소문자 무시)
+TRUE_FLAGS = {"1", "o", "y", "yes", "true", "v", "✓", "✔", "예", "네", "ㅇ"}
+
+
+def parse_names_auto(raw: str):
+    if not raw: return []
+    parts = re.split(r'[,\n\t]+', raw)
+    return [p.strip() for p in parts if p.strip()]
+
+def parse_pairs_auto(raw: str):
+    if not raw: return []
+    pairs = []
+    chunks = re.split(r'[,\n]+', raw)
+    for chunk in chunks:
+        chunk = chunk.strip()
+        if not chunk or '-' not in chunk: continue
+        parts = chunk.split('-', 1)
+        if len(parts) == 2:
+            a, b = parts[0].strip(), parts[1].strip()
+            if a and b: pairs.append((a, b))
+    return pairs
+
+
+def _text(value):
+    if value is None or (isinstance(value, float) and value != value):
+        return ""
+    return str(value).strip()
+
+
+def is_flag(value):
+    return _text(value).lower() in TRUE_FLAGS
+
+
+def read_table(path, sheet=0):
+    """xlsx/xls/CSV 파일(경로 또는 이름이 있는 업로드 파일) -> 문자열 DataFrame (열 이름은 앞뒤 공백을 뗀다)."""
+    import pandas as pd
+
+    ext = os.path.splitext(getattr(path, "name", path))[1].lower()
+    if ext in (".xlsx", ".xlsm", ".xls"):
+        df = pd.read_excel(path, sheet_name=sheet, dtype=str)
+    else:
+        # 엑셀에서 저장한 CSV는 BOM이 붙는 경우가 많다
+        df = pd.read_csv(path, dtype=str, encoding="utf-8-sig")
+    df.columns = [str(c).strip() for c in df.columns]
+    return df
+
+
+def roster_from_table(df, k):
+    """
+    명단 표 -> solve_teams 인자 dict (k, investigators, leaders, cameras, extras, must_together, must_apart).
+    이름이 빈 행은 건너뛰고, 같은 이름이 여러 번 나오면 표시를 합친다.
+    """
+    if COL_NAME not in df.columns:
+        raise ValueError(f"명단 파일에 '{COL_NAME}' 열이 없습니다. (열: {', '.join(map(str, df.columns))})")
+
+    def column(name):
+        return df[name].tolist() if name in df.columns else [None] * len(df)
+
+    investigators, leaders, cameras, extras = [], [], [], []
+    must_together, must_apart = [], []
+    for name, inv, lead, cam, together, apart in zip(*(column(c) for c in COLUMNS)):
+        name = _text(name)
+        if not name:
+            continue
+        if is_flag(inv):
+            investigators.append(name)
+        if is_flag(lead):
+            leaders.append(name)
+        if not (is_flag(inv) or is_flag(lead)):
+            extras.append(name)
+        if is_flag(cam):
+            cameras.append(name)
+        must_together += [(name, other) for other in parse_names_auto(_text(together)) if other != name]
+        must_apart += [(name, other) for other in parse_names_auto(_text(apart)) if other != name]
+
+    def unique(items):
+        return list(dict.fromkeys(items))
+
+    leaders = unique(leaders)
+    return {
+        "k": int(k),
+        "investigators": unique(investigators),
+        "leaders": leaders,
+        "cameras": unique(cameras),
+        # 조사자/섹장 표시가 한 번이라도 있으면 쩌리 후보에서는 뺀다 (명단 순서로 합쳐진다)
+        "extras": [n for n in unique(extras) if n not in set(investigators) | set(leaders)],
+        "must_together": unique(tuple(sorted(p)) for p in must_together),
+        "must_apart": unique(tuple(sorted(p)) for p in must_apart),
+    }
+
+
+def read_roster(path, k, sheet=0):
+    """명단 파일 -> solve_teams 인자 dict."""
+    return roster_from_table(read_table(path, sheet), k)
+
+
+def read_history(paths):
+    """
+    이전 날짜 결과 xlsx/CSV들(날짜 순서) -> get_history_stats가 읽는 dict ({"df_day_1": 표, ...}).
+    반환한 dict로 get_history_stats(len(paths) + 1, state)를 부르면 모든 파일이 이력이 된다.
+    """
+    state = {}
+    for day, path in enumerate(paths, start=1):
+        df = read_table(path).fillna("")
+        state[f"df_day_{day}"] = df
+    return state
+
+
+# ----- 앱의 날짜 탭 입력 -----
+DEFAULT_NUM_DAYS = 5
+MAX_DAYS = 60
+# 날짜마다 있는 입력 위젯 key (f"{이름}_{날짜}")
+DAY_INPUT_KEYS = ("input_inv", "input_lead", "input_cam", "input_extra", "k", "time_limit", "parallel", "together", "apart")
+
+
+def init_day_inputs(session_state, day):
+    """날짜 탭을 처음 열 때 입력 기본값 (후보 목록은 전날 값을 그대로 가져온다)."""
+    from team_solver import DEFAULT_TIME_BUDGET
+
+    defaults = {"k": 3, "time_limit": float(DEFAULT_TIME_BUDGET), "parallel": False, "together": "", "apart": ""}
+    for name in ("input_inv", "input_lead", "input_cam", "input_extra"):
+        defaults[name] = session_state.get(f"{name}_{day - 1}", "")
+    for name, value in defaults.items():
+        session_state.setdefault(f"{name}_{day}", value)
+
+
+def keep_day_inputs(session_state, num_days):
+    """
+    닫힌 날짜 탭의 위젯은 그려지지 않아 Streamlit이 그 값을 지운다.
+    매번 Session State에 다시 써 두면 탭을 다시 열 때까지 값이 남는다.
+    """
+    for day in range(1, num_days + 1):
+        for name in DAY_INPUT_KEYS:
+            key = f"{name}_{day}"
+            if key in session_state:
+                session_state[key] = session_state[key]
+
+
+def day_record_inputs(session_state, day):
+    """저장소에 표와 함께 쓰는 날짜 입력과 제약 [(종류, 이름A, 이름B)]."""
+    inputs = {name: session_state[f"{name}_{day}"] for name in DAY_INPUT_KEYS if f"{name}_{day}" in session_state}
+    constraints = [("together", a, b) for a, b in parse_pairs_auto(inputs.get("together", ""))]
+    constraints += [("apart", a, b) for a, b in parse_pairs_auto(inputs.get("apart", ""))]
+    return inputs, constraints
@@ -0,0 +1,247 @@
+"""
+병렬 다중 시작 조 편성 탐색.
+
+서로 독립인 재시작(첫 배치 + 담금질)을 프로세스 풀에 나눠 돌린다.
+- 작업자마다 SeedSequence에서 갈라낸 독립 난수열을 쓴다 (seed가 같으면 결과 재현 가능).
+- 작업자마다 남은 시간 전체로 담금질하되, 작업자끼리 지금까지 가장 좋은 벌점을 공유해
+  절반쯤 돌았는데 그보다 한참 나쁜 탐색은 버리고 남은 시간으로 새로 시작한다.
+- 어느 작업자든 벌점 0을 찾으면 모두 멈춘다.
+- 전체 시간 제한(초)을 넘기지 않는다 (처음 풀을 띄우는 시간도 여기에 든다).
+- 작업자가 죽어 풀이 깨지면 (BrokenProcessPool) 풀을 버리고 새로 띄운다.
+
+프로세스 풀과 공유 값(공유 메모리 Value/Event)은 처음 쓸 때 한 번 만들어 재사용한다.
+공유 값이 하나뿐이라 탐색은 프로세스 전체에서 한 번에 하나씩 돌린다 (_lock). 다른 세션의 탐색이
+돌고 있으면 끝날 때까지 기다리고, 기다린 시간도 그 호출의 제한 시간에 든다 (시간이 다 지났으면
+작업자마다 재시작 한 번만 하고 돌려준다). 동시에 돌려도 코어를 나눠 쓸 뿐이라 따로 두지 않는다.
+
+Streamlit 서버 프로세스를 fork하지 않도록 spawn 방식으로 띄운다. Streamlit은 실행 중인 스크립트(web.py)를
+__main__으로 두므로, 이 풀의 작업자는 __main__ 정보를 빼고 띄워 web.py를 다시 실행하지 않는다
+(_PlainMainContext — sys.modules["__main__"]는 건드리지 않는다).
+"""
+import math
+import multiprocessing.context
+import multiprocessing.spawn
+import os
+import random
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from team_history import plain_stats
+from team_solver import InfeasibleError, TeamProblem
+
+# 재시작 하나는 남은 시간을 모두 쓰며 식히고, 그 절반(PRUNE_AT)쯤 돌았을 때
+# 공유 최선보다 PRUNE_RATIO배 넘게 나쁘면 버리고 남은 시간으로 새로 시작한다
+PRUNE_AT = 0.5
+PRUNE_RATIO = 1.2
+# 공유 값은 잠금이 걸린 공유 메모리라 이 간격(초)보다 자주 읽지 않는다
+SHARED_POLL_INTERVAL = 0.05
+
+_lock = threading.Lock()
+_executor = None
+_executor_workers = 0
+# 작업자와 공유하는 값 (풀을 만들 때 initializer로 넘긴다). 탐색은 한 번에 하나씩 (_lock)
+_shared_best = None
+_stop_event = None
+
+
+def default_workers():
+    return max(1, os.cpu_count() or 1)
+
+
+# 이 스레드에서 지금 _PlainMainProcess를 띄우는 중인지
+_spawning = threading.local()
+
+
+def _preparation_data(name, _original=multiprocessing.spawn.get_preparation_data):
+    """spawn 준비 데이터. _PlainMainProcess를 띄울 때는 __main__을 다시 읽는 항목을 뺀다."""
+    data = _original(name)
+    if getattr(_spawning, "plain_main", False):
+        data.pop("init_main_from_path", None)
+        data.pop("init_main_from_name", None)
+    return data
+
+
+if not getattr(multiprocessing.spawn.get_preparation_data, "plain_main_aware", False):
+    _preparation_data.plain_main_aware = True
+    multiprocessing.spawn.get_preparation_data = _preparation_data
+
+
+class _PlainMainProcess(multiprocessing.context.SpawnProcess):
+    """__main__을 다시 실행하지 않는 spawn 프로세스 (작업 함수는 모듈 이름으로 읽는다)."""
+
+    @staticmethod
+    def _Popen(process_obj):
+        _spawning.plain_main = True
+        try:
+            return multiprocessing.context.SpawnProcess._Popen(process_obj)
+        finally:
+            _spawning.plain_main = False
+
+
+class _PlainMainContext(multiprocessing.context.SpawnContext):
+    Process = _PlainMainProcess
+
+
+def spawn_context():
+    """작업자 프로세스와 공유 값을 만들 multiprocessing 컨텍스트."""
+    return _PlainMainContext()
+
+
+def _init_worker(shared_best, stop_event):
+    global _shared_best, _stop_event
+    _shared_best, _stop_event = shared_best, stop_event
+
+
+def spawn_executor(workers, initializer=None, initargs=()):
+    """spawn 방식 프로세스 풀 (_PlainMainContext). 첫 탐색이 띄우는 시간을 쓰지 않도록 작업자를 미리 띄워 둔다."""
+    executor = ProcessPoolExecutor(
+        max_workers=workers, mp_context=spawn_context(), initializer=initializer, initargs=initargs,
+    )
+    for f in [executor.submit(os.getpid) for _ in range(workers)]:
+        f.result()
+    return executor
+
+
+def _get_executor(workers):
+    """(_lock을 잡은 상태에서) 작업자 수에 맞는 풀."""
+    global _executor, _executor_workers, _shared_best, _stop_event
+    if _executor is not None and _executor_workers == workers:
+        return _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+
+    ctx = spawn_context()
+    _shared_best = ctx.Value("d", math.inf)
+    _stop_event = ctx.Event()
+    _executor = spawn_executor(workers, _init_worker, (_shared_best, _stop_event))
+    _executor_workers = workers
+    return _executor
+
+
+def _reset_executor():
+    """(_lock을 잡은 상태에서) 깨진 풀(작업자가 죽음 등)을 버린다. 다음 _get_executor가 새로 만든다."""
+    global _executor, _executor_workers
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+    _executor, _executor_workers = None, 0
+
+
+def submit_jobs(fn, jobs, workers=None):
+    """
+    공용 풀(탐색과 같은 풀)에 fn(*job)들을 넣는다 -> (풀, futures). 풀이 없을 때만 workers개로 띄우고,
+    있으면 크기를 바꾸지 않는다 (바꾸면 다른 세션이 넣어 둔 작업이 취소되므로).
+    작업은 넣은 순서대로 돌고, 그동안 들어온 탐색은 그 뒤에서 기다린다 (기다린 시간도 탐색의 제한 시간에 든다).
+    """
+    with _lock:
+        for attempt in range(2):
+            executor = _executor or _get_executor(workers or default_workers())
+            try:
+                return executor, [executor.submit(fn, *job) for job in jobs]
+            except BrokenProcessPool:
+                _reset_executor()
+                if attempt:
+                    raise
+
+
+def discard_executor(executor):
+    """작업 중에 깨진 풀을 버린다 (그사이 다른 호출이 이미 새 풀로 바꿨으면 그대로 둔다)."""
+    with _lock:
+        if executor is _executor:
+            _reset_executor()
+
+
+def _search_worker(problem_args, seed, wall_deadline):
+    """
+    작업자 하나: 시간이 다 되거나 누군가 0을 찾을 때까지 재시작을 반복.
+    시간이 이미 지났어도 재시작 한 번은 한다 (풀을 띄우느라 시간을 다 쓴 경우).
+    """
+    shared_best, stop_event = _shared_best, _stop_event
+    rng = random.Random(seed)
+    problem = TeamProblem(*problem_args)
+    best, best_total, restarts = None, math.inf, 0
+    last_poll, global_best = 0.0, math.inf
+
+    def should_stop(run_best, frac):
+        nonlocal last_poll, global_best
+        now = time.perf_counter()
+        if now - last_poll >= SHARED_POLL_INTERVAL:
+            last_poll = now
+            if stop_event.is_set():
+                return True
+            global_best = shared_best.value
+        return frac >= PRUNE_AT and run_best > global_best * PRUNE_RATIO
+
+    attempts = 0
+    while not stop_event.is_set():
+        remaining = wall_deadline - time.time()
+        if remaining <= 0 and attempts:
+            break
+        attempts += 1
+        local_deadline = time.perf_counter() + max(remaining, 0)
+        try:
+            unit_team = problem.initial_assignment(rng)
+        except InfeasibleError:
+            # 부모 프로세스에서는 풀렸어도 이 난수열의 백트래킹은 노드 한도에 걸릴 수 있다. 이 재시작만 건너뛴다
+            continue
+        unit_team, total = problem.anneal(unit_team, local_deadline, rng, should_stop=should_stop)
+        restarts += 1
+
+        if total < best_total:
+            best, best_total = unit_team, total
+            with shared_best.get_lock():
+                if total < shared_best.value:
+                    shared_best.value = total
+        if best_total == 0:
+            stop_event.set()
+            break
+
+    return best_total, best, restarts
+
+
+def solve_teams_parallel(k, investigators, leaders, cameras, extras, must_together, must_apart, history_stats,
+                         time_budget, workers=None, seed=None):
+    """
+    solve_teams와 같은 반환값 (teams, camera_set, error).
+    제약 모순 등은 작업자를 띄우기 전에 이 프로세스에서 바로 확인한다.
+    time_budget은 처음 부를 때 풀을 띄우는 시간과 다른 세션의 탐색을 기다린 시간(_lock)까지 포함한 전체 시간이다.
+    """
+    start = time.time()
+    problem_args = (k, investigators, leaders, cameras, extras, must_together, must_apart, history_stats)
+    try:
+        problem = TeamProblem(*problem_args)
+        problem.initial_assignment(random.Random(seed))
+    except InfeasibleError as e:
+        return None, None, str(e)
+
+    workers = workers or default_workers()
+    problem_args = problem_args[:-1] + (plain_stats(history_stats),)
+
+    seeds = [int(s.generate_state(1)[0]) for s in np.random.SeedSequence(seed).spawn(workers)]
+    wall_deadline = start + time_budget
+    with _lock:
+        # 작업자가 죽어 풀이 깨졌으면 (메모리 부족 등) 새 풀로 한 번 더 돌린다
+        for attempt in range(2):
+            try:
+                executor = _get_executor(workers)
+                _shared_best.value = math.inf
+                _stop_event.clear()
+                futures = [executor.submit(_search_worker, problem_args, s, wall_deadline) for s in seeds]
+                results = [f.result() for f in futures]
+                break
+            except BrokenProcessPool:
+                _reset_executor()
+                if attempt:
+                    return None, None, "작업자 프로세스가 비정상 종료되었습니다. 다시 실행해 주세요."
+    results = [r for r in results if r[1] is not None]
+    if not results:
+        return None, None, "제한 시간 안에 편성을 찾지 못했습니다."
+
+    _, unit_team, _ = min(results, key=lambda r: r[0])
+    teams = problem.format(unit_team)
+    if teams is None:
+        return None, None, "제한 시간 안에 모든 조에 조사자/섹장을 배치하는 조합을 찾지 못했습니다."
+    return teams, problem.cam_set, None
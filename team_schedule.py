@@ -0,0 +1,171 @@
+"""
+여러 날짜 조 편성을 한꺼번에.
+
+날짜 탭마다 앞 날짜만 보고 차례로 편성하면, 4~5일차쯤에는 좋은 조합이 거의 남지 않는다.
+여기서는 모든 날짜의 명단/제약을 받아 일정 전체의 벌점을 줄인다 (social golfer 문제와 같은 꼴).
+일정 전체 벌점 = 날짜 두 개마다 (겹친 쌍 + 같은 조 번호 x2 + 역할 반복 x3) + 날짜별 인원/카메라 균형.
+
+1. 첫 편성: 날짜 순서대로, 앞 날짜(와 편성하지 않는 날짜)를 이력으로 보고 편성한다.
+2. 개선: 날짜를 하나씩 돌아가며, 나머지 모든 날짜를 이력으로 보고 그 날짜를 지금 편성에서
+   다시 담금질한다. 벌점 항목이 모두 날짜 두 개 사이의 겹침이라, 그 날짜의 벌점이 줄어든
+   만큼 일정 전체 벌점도 줄어든다. 한 바퀴 돌아도 줄지 않거나 시간이 다 되면 멈춘다.
+
+표에서 손으로 고친 칸은 고정 배정(이름 -> (조, 역할))으로 넘겨 그 조/역할에서 움직이지 않는다.
+앱에서는 collect_schedule_days가 날짜 탭 입력(Session State)을 solve_schedule 인자로 모은다.
+"""
+import random
+import time
+
+from team_history import ROLES, clean_name, day_contribution, sum_stats, team_columns, teams_contribution
+from team_input import init_day_inputs, parse_names_auto, parse_pairs_auto
+from team_solver import InfeasibleError, TeamProblem
+
+DEFAULT_SCHEDULE_TIME_BUDGET = 10.0
+# 전체 시간 중 첫 편성(날짜 순서대로)에 쓰는 몫
+INITIAL_SHARE = 0.3
+# 개선 단계에서 날짜 하나를 다시 담금질하는 최소 시간(초)
+MIN_DAY_BUDGET = 0.05
+
+
+def _cell_list(df):
+    """표의 이름 칸 -> [(이름, 조 번호(0부터), 역할 또는 None)] (칸 순서, 같은 이름이 여러 번 나올 수 있다)."""
+    if df is None or df.empty:
+        return []
+    roles = df["역할"].tolist() if "역할" in df.columns else [None] * len(df)
+    cells = []
+    for t, col in enumerate(team_columns(df)):
+        for role, value in zip(roles, df[col].tolist()):
+            name = clean_name(value)
+            if name is not None:
+                cells.append((name, t, role if role in ROLES else None))
+    return cells
+
+
+def _cells(df):
+    return set(_cell_list(df))
+
+
+def fixed_assignments(df, solved_df=None):
+    """
+    표에서 손으로 넣은 칸 -> {이름: (조 번호(0부터), 역할 또는 None(쩌리))}.
+    solved_df(솔버가 마지막으로 채운 표)가 있으면 그 표와 다른 칸만, 없으면 이름이 든 칸 모두.
+    같은 이름이 표의 여러 칸에 있으면 어느 칸을 고정할지 알 수 없어 InfeasibleError.
+    """
+    cell_list = _cell_list(df)
+    places = {}
+    for name, t, role in cell_list:
+        places.setdefault(name, []).append(f"{t + 1}조 {role or '쩌리'}")
+    duplicates = [f"{name} ({', '.join(where)})" for name, where in places.items() if len(where) > 1]
+    if duplicates:
+        raise InfeasibleError(f"같은 이름이 표의 여러 칸에 있습니다: {'; '.join(duplicates)}")
+
+    cells = set(cell_list)
+    if solved_df is not None:
+        cells -= _cells(solved_df)
+    return {name: (t, role) for name, t, role in sorted(cells, key=lambda c: (c[1], c[0]))}
+
+
+def _problem(spec, history):
+    return TeamProblem(
+        spec["k"], spec["investigators"], spec["leaders"], spec["cameras"], spec["extras"],
+        spec["must_together"], spec["must_apart"], history, fixed=spec.get("fixed"),
+    )
+
+
+def solve_schedule(days, frozen=(), time_budget=DEFAULT_SCHEDULE_TIME_BUDGET, seed=None):
+    """
+    days: {날짜: solve_teams 인자 dict (k, investigators, leaders, cameras, extras,
+           must_together, must_apart) + fixed}
+    frozen: 편성하지 않는 날짜들의 통계 (이력으로만 쓴다).
+    반환: (plans, total, error) — plans는 {날짜: (teams, camera_set)}, total은 일정 전체 벌점.
+    실패하면 plans/total은 None, error는 이유 (앞에 날짜를 붙인다).
+    """
+    rng = random.Random(seed)
+    deadline = time.perf_counter() + time_budget
+    order = sorted(days)
+    frozen_stats = sum_stats(frozen)
+    unit_teams, plans, contribs = {}, {}, {}
+    total = 0
+
+    # 1. 날짜 순서대로 첫 편성
+    initial_budget = time_budget * INITIAL_SHARE / max(1, len(order))
+    for d in order:
+        history = sum_stats([frozen_stats] + [contribs[e] for e in order if e < d])
+        try:
+            problem = _problem(days[d], history)
+            unit_team = problem.initial_assignment(rng)
+        except InfeasibleError as e:
+            return None, None, f"{d}일차: {e}"
+        unit_team, cost = problem.anneal(unit_team, time.perf_counter() + initial_budget, rng)
+        teams = problem.format(unit_team)
+        if teams is None:
+            return None, None, f"{d}일차: 제한 시간 안에 모든 조에 조사자/섹장을 배치하는 조합을 찾지 못했습니다."
+        unit_teams[d], plans[d], contribs[d] = unit_team, (teams, problem.cam_set), teams_contribution(teams)
+        total += cost
+
+    # 2. 나머지 날짜를 모두 이력으로 보고 한 날짜씩 다시 담금질
+    while total > 0 and len(order) > 1:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            break
+        # 남은 시간으로 적어도 두 바퀴는 돌도록
+        day_budget = max(MIN_DAY_BUDGET, remaining / (2 * len(order)))
+        improved = False
+        for d in order:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            history = sum_stats([frozen_stats] + [contribs[e] for e in order if e != d])
+            problem = _problem(days[d], history)
+            before = problem.total_cost(problem.team_of(unit_teams[d]))
+            unit_team, cost = problem.anneal(unit_teams[d], min(deadline, now + day_budget), rng)
+            if cost >= before:
+                continue
+            teams = problem.format(unit_team)
+            if teams is None:
+                continue
+            unit_teams[d], plans[d], contribs[d] = unit_team, (teams, problem.cam_set), teams_contribution(teams)
+            total -= before - cost
+            improved = True
+        if not improved:
+            break
+
+    return plans, total, None
+
+
+def collect_schedule_days(session_state, num_days):
+    """
+    전체 일정 편성 입력 -> (solve_schedule의 days, frozen).
+    후보를 적은 날짜는 편성하고 (표에서 손으로 고친 칸은 고정), 후보가 비어 있는 날짜는 지금 표를 이력으로만 쓴다.
+    아직 열어 보지 않은 날짜는 탭을 열 때처럼 전날 후보를 이어받는다.
+    표에 같은 이름이 여러 칸 있으면 InfeasibleError (메시지 앞에 날짜).
+    """
+    days, frozen = {}, []
+    for d in range(1, num_days + 1):
+        init_day_inputs(session_state, d)
+        df = session_state.get(f"df_day_{d}")
+        invs = parse_names_auto(session_state.get(f"input_inv_{d}", ""))
+        leads = parse_names_auto(session_state.get(f"input_lead_{d}", ""))
+        extras = parse_names_auto(session_state.get(f"input_extra_{d}", ""))
+        if not (invs or leads or extras):
+            if df is not None:
+                frozen.append(day_contribution(df))
+            continue
+        try:
+            fixed = fixed_assignments(df, session_state.get(f"solved_df_{d}"))
+        except InfeasibleError as e:
+            raise InfeasibleError(f"{d}일차: {e}") from e
+        # 후보 목록에 없는 이름을 표에 직접 넣었으면 그 칸의 역할 후보로 더한다
+        listed = set(invs) | set(leads) | set(extras)
+        for name, (_, role) in fixed.items():
+            if name not in listed:
+                {"조사자": invs, "섹장": leads}.get(role, extras).append(name)
+        days[d] = {
+            "k": int(session_state.get(f"k_{d}", 3)),
+            "investigators": invs, "leaders": leads, "extras": extras,
+            "cameras": parse_names_auto(session_state.get(f"input_cam_{d}", "")),
+            "must_together": parse_pairs_auto(session_state.get(f"together_{d}", "")),
+            "must_apart": parse_pairs_auto(session_state.get(f"apart_{d}", "")),
+            "fixed": fixed,
+        }
+    return days, frozen
@@ -0,0 +1,580 @@
+"""
+조 편성 솔버.
+
+무작위로 1000번 편성해 보고 제약을 나중에 확인하던 방식 대신:
+1. 꼭 같은 팀(must_together)인 사람들을 union-find로 묶어 한 단위(unit)로 움직인다.
+2. 꼭 다른 팀(must_apart)은 배치할 때부터 어길 수 없는 제약으로 본다
+   (충돌이 있는 단위부터 백트래킹으로 배치하고, 나머지는 인원이 적은 조부터 채움).
+3. 단위 이동 / 단위 교환 이웃으로 담금질(simulated annealing)하며 벌점을 줄인다.
+   시간 제한 안에서 돌고, 벌점이 0이 되면 바로 멈춘다.
+
+제약끼리 모순이거나(같이 팀인데 다른 팀, 조 개수보다 많은 서로 다른 팀 묶음 등)
+조사자/섹장 후보가 모자라면, 시간을 다 쓰지 않고 바로 이유를 돌려준다.
+
+고정 배정(fixed: 이름 -> (조, 역할))을 주면 그 사람의 단위는 그 조에서 움직이지 않고,
+역할 칸(조사자/섹장)에 고정된 사람은 그 역할을, 쩌리 칸이면 쩌리를 맡는다.
+
+사람은 정수 ID, 이력은 행렬(roster.py)로 다룬다. 탐색 중에는 "사람 i가 조 t 사람들과
+같은 조였던 횟수" 행렬(affinity, n x k)을 이동할 때마다 갱신해 두므로, 이동 하나의
+벌점 변화는 움직이는 사람 수에만 비례한다. 편성 전체의 벌점(total_cost)은 조마다 돌지 않고
+bincount로 모든 조를 한 번에 센다.
+
+벌점 = 같은 조였던 쌍 + 같은 조 번호 x2 + 역할 반복 x3 + 카메라 쏠림 x3 + 인원 불균형 x20
+"""
+import math
+import random
+import time
+
+import numpy as np
+
+from roster import HistoryMatrices, Roster, ROLE_INVESTIGATOR, ROLE_LEADER
+
+PAIR_WEIGHT = 1
+GROUP_WEIGHT = 2
+ROLE_WEIGHT = 3
+CAMERA_WEIGHT = 3
+SIZE_WEIGHT = 20
+# 조사자/섹장이 없는 조 (사실상 금지)
+ROLE_MISSING_WEIGHT = 10_000
+
+DEFAULT_TIME_BUDGET = 2.0
+BACKTRACK_NODE_LIMIT = 200_000
+
+
+class InfeasibleError(ValueError):
+    """제약을 만족하는 편성이 없다 (message에 이유)."""
+
+
+class UnionFind:
+    def __init__(self, n):
+        self.parent = list(range(n))
+
+    def find(self, x):
+        root = x
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[x] != root:
+            self.parent[x], x = root, self.parent[x]
+        return root
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[rb] = ra
+
+
+class TeamProblem:
+    """명단/단위/제약/이력 행렬을 한 번 정리해 둔 편성 문제."""
+
+    def __init__(self, k, investigators, leaders, cameras, extras, must_together, must_apart, history_stats,
+                 fixed=None):
+        self.k = k
+        self.roster = roster = Roster.from_lists(investigators, leaders, cameras, extras)
+        self.cam_set = set(cameras)
+        self.hist = HistoryMatrices(roster, history_stats, k)
+        n = len(roster)
+
+        for label, pairs in (("같이 팀", must_together), ("다른 팀", must_apart)):
+            for a, b in pairs:
+                if a not in roster or b not in roster:
+                    raise InfeasibleError(f"{label} 제약에 존재하지 않는 이름이 있습니다: {a}, {b}")
+
+        # 1. must_together -> 단위
+        uf = UnionFind(n)
+        for a, b in must_together:
+            uf.union(roster.id(a), roster.id(b))
+        roots = {}
+        for i in range(n):
+            roots.setdefault(uf.find(i), []).append(i)
+        self.units = [np.array(ids, dtype=np.int64) for ids in roots.values()]
+        self.unit_of = np.empty(n, dtype=np.int64)
+        for u, ids in enumerate(self.units):
+            self.unit_of[ids] = u
+
+        # 2. must_apart -> 단위 사이의 충돌
+        self.conflicts = [set() for _ in self.units]
+        for a, b in must_apart:
+            ua, ub = int(self.unit_of[roster.id(a)]), int(self.unit_of[roster.id(b)])
+            if ua == ub:
+                raise InfeasibleError(f"같이 팀 제약과 다른 팀 제약이 서로 충돌합니다: {a}, {b}")
+            self.conflicts[ua].add(ub)
+            self.conflicts[ub].add(ua)
+        self.constrained_units = [u for u, c in enumerate(self.conflicts) if c]
+
+        # 3. 고정 배정 -> 단위를 그 조에 묶고, 역할 후보를 고정된 역할로 바꾼다
+        self.unit_fixed = np.full(len(self.units), -1, dtype=np.int64)
+        self.fixed_inv = np.zeros(n, dtype=bool)
+        self.fixed_lead = np.zeros(n, dtype=bool)
+        for name, (t, role) in (fixed or {}).items():
+            if name not in roster:
+                raise InfeasibleError(f"고정 배정에 후보 목록에 없는 이름이 있습니다: {name}")
+            if not 0 <= t < k:
+                raise InfeasibleError(f"{name}: {t + 1}조에 고정돼 있지만 조 개수는 {k}개입니다")
+            i = roster.id(name)
+            u = self.unit_of[i]
+            if self.unit_fixed[u] not in (-1, t):
+                raise InfeasibleError(f"같이 팀 제약과 고정 배정이 서로 충돌합니다: {name}")
+            self.unit_fixed[u] = t
+            self.fixed_inv[i] = roster.is_inv[i] = role == "조사자"
+            self.fixed_lead[i] = roster.is_lead[i] = role == "섹장"
+        for u in self.constrained_units:
+            t = self.unit_fixed[u]
+            if t >= 0 and any(self.unit_fixed[v] == t for v in self.conflicts[u]):
+                raise InfeasibleError(f"다른 팀 제약과 고정 배정이 서로 충돌합니다 ({t + 1}조)")
+        self.movable = [u for u in range(len(self.units)) if self.unit_fixed[u] < 0]
+
+        # 단위별로 미리 계산해 두는 값
+        self.unit_size = np.array([len(ids) for ids in self.units], dtype=np.int64)
+        self.unit_cams = np.array([int(roster.is_cam[ids].sum()) for ids in self.units], dtype=np.int64)
+        self.unit_has_inv = np.array([bool(roster.is_inv[ids].any()) for ids in self.units], dtype=bool)
+        self.unit_has_lead = np.array([bool(roster.is_lead[ids].any()) for ids in self.units], dtype=bool)
+        self.unit_has_role = self.unit_has_inv | self.unit_has_lead
+        # 단위 사이의 이력: unit_pair[u, v] = u 사람들과 v 사람들이 같은 조였던 횟수 합,
+        # unit_group[u, t] = u 사람들이 t+1조였던 횟수 합. 대각 unit_pair[u, u]는 단위 안의 몫(양방향)
+        onehot = np.zeros((n, len(self.units)))
+        onehot[np.arange(n), self.unit_of] = 1.0
+        self.unit_pair = np.rint(onehot.T @ self.hist.pair @ onehot).astype(np.int64)
+        self.unit_group = np.rint(onehot.T @ self.hist.group[:, :k]).astype(np.int64)
+
+        self._check_roles()
+
+        c = int(roster.is_cam.sum())
+        self.size_lo, self.size_hi = n // k, -(-n // k)
+        self.cam_lo, self.cam_hi = c // k, -(-c // k)
+
+    def _check_roles(self):
+        k = self.k
+        is_inv, is_lead = self.roster.is_inv, self.roster.is_lead
+        if is_inv.sum() < k:
+            raise InfeasibleError("조사자 후보 부족")
+        if is_lead.sum() < k:
+            raise InfeasibleError("섹장 후보 부족")
+        if (is_inv | is_lead).sum() < 2 * k:
+            raise InfeasibleError("조사자/섹장을 서로 다른 사람으로 채울 후보가 부족합니다")
+        # 같은 단위는 한 조에만 들어가므로, 역할 후보가 있는 단위도 k개 이상이어야 한다
+        if self.unit_has_inv.sum() < k or self.unit_has_lead.sum() < k:
+            raise InfeasibleError("같이 팀 제약 때문에 모든 조에 조사자/섹장을 나눠 줄 수 없습니다")
+
+    # ----- 벌점 -----
+    def best_roles(self, members):
+        """조원(ID 배열) 중 역할 반복이 가장 적은 (조사자, 섹장, 반복 횟수). 채울 수 없으면 None."""
+        roster, role = self.roster, self.hist.role
+        invs = members[roster.is_inv[members]]
+        leads = members[roster.is_lead[members]]
+        if len(invs) == 0 or len(leads) == 0:
+            return None
+        # 역할이 고정된 사람이 있으면 그 사람이 맡는다
+        if self.fixed_inv[invs].any():
+            invs = invs[self.fixed_inv[invs]]
+        if self.fixed_lead[leads].any():
+            leads = leads[self.fixed_lead[leads]]
+        invs = invs[np.argsort(role[invs, ROLE_INVESTIGATOR], kind="stable")[:2]]
+        leads = leads[np.argsort(role[leads, ROLE_LEADER], kind="stable")[:2]]
+
+        options = []
+        i0, l0 = invs[0], leads[0]
+        if i0 != l0:
+            options.append((i0, l0))
+        else:
+            if len(leads) > 1:
+                options.append((i0, leads[1]))
+            if len(invs) > 1:
+                options.append((invs[1], l0))
+        if not options:
+            return None
+        inv, lead = min(options, key=lambda o: role[o[0], ROLE_INVESTIGATOR] + role[o[1], ROLE_LEADER])
+        return int(inv), int(lead), int(role[inv, ROLE_INVESTIGATOR] + role[lead, ROLE_LEADER])
+
+    def _role_cost(self, members):
+        roles = self.best_roles(members)
+        return ROLE_MISSING_WEIGHT if roles is None else roles[2] * ROLE_WEIGHT
+
+    def _balance_cost(self, size, cams):
+        return (
+            (max(0, cams - self.cam_hi) + max(0, self.cam_lo - cams)) * CAMERA_WEIGHT
+            + (max(0, size - self.size_hi) + max(0, self.size_lo - size)) * SIZE_WEIGHT
+        )
+
+    def team_cost(self, t, members):
+        """조 t(0부터)의 벌점. members: ID 배열."""
+        members = np.asarray(members, dtype=np.int64)
+        pair = int(self.hist.pair[np.ix_(members, members)].sum()) // 2
+        group = int(self.hist.group[members, t].sum())
+        cams = int(self.roster.is_cam[members].sum())
+        return (
+            pair * PAIR_WEIGHT
+            + group * GROUP_WEIGHT
+            + self._role_cost(members)
+            + self._balance_cost(len(members), cams)
+        )
+
+    def team_costs(self, team_of):
+        """
+        전체 편성(사람 -> 조 배열)의 조별 벌점 (k,). team_cost를 조마다 부르는 것과 같은 값을
+        조 루프 없이 bincount로 한 번에 센다. 역할은 조마다 반복이 가장 적은 조사자/섹장을 고르고,
+        그 둘이 같은 사람인 조(두 역할 후보를 겸하는 사람)만 best_roles로 다시 고른다.
+        """
+        k, n = self.k, len(team_of)
+        team_of = np.asarray(team_of, dtype=np.int64)
+        roster, hist = self.roster, self.hist
+
+        pi, pj, pw = hist.upper_pairs()
+        same = team_of[pi] == team_of[pj]
+        pair = np.bincount(team_of[pi[same]], weights=pw[same], minlength=k)
+        group = np.bincount(team_of, weights=hist.group[np.arange(n), team_of], minlength=k)
+        size = np.bincount(team_of, minlength=k)
+        cams = np.bincount(team_of, weights=roster.is_cam, minlength=k)
+
+        # 조마다 (반복 횟수, ID)가 가장 작은 조사자/섹장 후보. 역할이 고정된 사람이 있는 조는 그 사람만 후보
+        ids = np.arange(n, dtype=np.int64)
+        best = []
+        for r, is_role, fixed in ((ROLE_INVESTIGATOR, roster.is_inv, self.fixed_inv),
+                                  (ROLE_LEADER, roster.is_lead, self.fixed_lead)):
+            has_fixed = np.bincount(team_of, weights=fixed & is_role, minlength=k) > 0
+            eligible = is_role & (fixed | ~has_fixed[team_of])
+            key = np.full(k, np.iinfo(np.int64).max)
+            np.minimum.at(key, team_of[eligible], hist.role[eligible, r].astype(np.int64) * n + ids[eligible])
+            best.append(key)
+        inv_key, lead_key = best
+        missing = (inv_key == np.iinfo(np.int64).max) | (lead_key == np.iinfo(np.int64).max)
+        role = np.where(missing, ROLE_MISSING_WEIGHT, (inv_key // n + lead_key // n) * ROLE_WEIGHT)
+        for t in np.flatnonzero(~missing & (inv_key % n == lead_key % n)):
+            role[t] = self._role_cost(np.flatnonzero(team_of == t))
+
+        balance = (
+            (np.maximum(0, cams - self.cam_hi) + np.maximum(0, self.cam_lo - cams)) * CAMERA_WEIGHT
+            + (np.maximum(0, size - self.size_hi) + np.maximum(0, self.size_lo - size)) * SIZE_WEIGHT
+        )
+        return np.rint(pair * PAIR_WEIGHT + group * GROUP_WEIGHT + balance).astype(np.int64) + role
+
+    def total_cost(self, team_of):
+        """전체 편성(사람 -> 조 배열)의 벌점."""
+        return int(self.team_costs(team_of).sum())
+
+    # ----- 첫 배치 -----
+    def initial_assignment(self, rng):
+        """must_apart를 지키는 단위 -> 조 배치. 불가능이 증명되면 InfeasibleError."""
+        k = self.k
+        unit_team = [int(t) if t >= 0 else None for t in self.unit_fixed]
+        constrained = [u for u in self.constrained_units if unit_team[u] is None]
+
+        # 충돌이 있는 단위: DSatur 순서 백트래킹 (그래프 k-색칠)
+        nodes = 0
+
+        def blocked(u):
+            return {unit_team[v] for v in self.conflicts[u] if unit_team[v] is not None}
+
+        def solve(remaining):
+            nonlocal nodes
+            if not remaining:
+                return True
+            nodes += 1
+            if nodes > BACKTRACK_NODE_LIMIT:
+                raise TimeoutError
+            u = max(remaining, key=lambda x: (len(blocked(x)), len(self.conflicts[x]), self.unit_size[x]))
+            teams = [t for t in range(k) if t not in blocked(u)]
+            rng.shuffle(teams)
+            rest = [x for x in remaining if x != u]
+            for t in teams:
+                unit_team[u] = t
+                if solve(rest):
+                    return True
+            unit_team[u] = None
+            return False
+
+        try:
+            if not solve(constrained):
+                raise InfeasibleError(f"다른 팀 제약을 모두 지키면서 {k}개 조로 나눌 수 없습니다")
+        except TimeoutError:
+            raise InfeasibleError("다른 팀 제약이 너무 복잡해 배치를 찾지 못했습니다") from None
+
+        # 나머지 단위: 역할이 하나뿐인 단위 -> 조사자/섹장 모두 되는 단위 -> 나머지 순서로
+        # (둘 다 되는 단위가 먼저 가면 그 조의 두 역할을 한 단위가 채운 것으로 보게 된다),
+        # 같은 순서 안에서는 큰 단위부터, 역할이 빈 조 -> 인원이 적은 조 순서로
+        sizes = np.zeros(k, dtype=np.int64)
+        has_inv = np.zeros(k, dtype=bool)
+        has_lead = np.zeros(k, dtype=bool)
+        for u, t in enumerate(unit_team):
+            if t is not None:
+                self._place_stats(u, t, sizes, has_inv, has_lead)
+        free = [u for u in range(len(self.units)) if unit_team[u] is None]
+        rng.shuffle(free)
+        roles = self.unit_has_inv.astype(int) + self.unit_has_lead
+        free.sort(key=lambda u: ({1: 0, 2: 1, 0: 2}[roles[u]], -self.unit_size[u]))
+        for u in free:
+            needs = (self.unit_has_inv[u] & ~has_inv) | (self.unit_has_lead[u] & ~has_lead)
+            noise = np.array([rng.random() for _ in range(k)])
+            t = int(np.lexsort((noise, sizes, ~needs))[0])
+            unit_team[u] = t
+            self._place_stats(u, t, sizes, has_inv, has_lead)
+        return unit_team
+
+    def _place_stats(self, u, t, sizes, has_inv, has_lead):
+        sizes[t] += self.unit_size[u]
+        has_inv[t] |= self.unit_has_inv[u]
+        has_lead[t] |= self.unit_has_lead[u]
+
+    # ----- 국소 탐색 -----
+    def anneal(self, unit_team, deadline, rng, should_stop=None):
+        """
+        단위 이동/교환 담금질. 반환: (가장 좋은 unit_team, 벌점).
+        should_stop(지금까지 가장 좋은 벌점, 경과 비율)이 True를 돌려주면 일찍 멈춘다.
+        """
+        state = _SearchState(self, unit_team)
+        best, best_total = state.unit_team.tolist(), state.total
+        movable = self.movable
+        if best_total == 0 or self.k == 1 or not movable:
+            return best, best_total
+
+        k, n_movable = self.k, len(movable)
+        # 처음에는 벌점 몇 점짜리로 나빠지는 이동도 자주 받아들일 정도의 온도
+        t0 = max(2.0, min(50.0, state.total / k))
+        temperature = t0
+        start = time.perf_counter()
+        budget = max(deadline - start, 1e-3)
+        cooling_end = 0.01
+        it = 0
+
+        while True:
+            it += 1
+            if it % 128 == 0:
+                now = time.perf_counter()
+                if now >= deadline:
+                    break
+                frac = (now - start) / budget
+                if should_stop is not None and should_stop(best_total, frac):
+                    break
+                # 남은 시간에 맞춰 기하급수적으로 식힌다
+                temperature = t0 * (cooling_end / t0) ** frac
+
+            u = movable[rng.randrange(n_movable)]
+            if rng.random() < 0.5:
+                b = rng.randrange(k - 1)
+                b += b >= state.unit_team[u]
+                move = state.propose_move(u, b)
+            else:
+                move = state.propose_swap(u, movable[rng.randrange(n_movable)])
+            if move is None:
+                continue
+
+            delta = move[0]
+            if delta <= 0 or rng.random() < math.exp(-delta / temperature):
+                state.apply(move)
+                if state.total < best_total:
+                    best, best_total = state.unit_team.tolist(), state.total
+                    if best_total == 0:
+                        break
+
+        # 마무리: 가장 좋았던 편성에서 (벡터화한) 최선의 단일 이동을 더 줄지 않을 때까지
+        if best_total > 0:
+            state = _SearchState(self, best)
+            state.descend()
+            if state.total < best_total:
+                best, best_total = state.unit_team.tolist(), state.total
+        return best, best_total
+
+    # ----- 결과 -----
+    def team_of(self, unit_team):
+        """unit_team -> 사람 ID별 조 번호 배열."""
+        return np.asarray(unit_team, dtype=np.int64)[self.unit_of]
+
+    def format(self, unit_team):
+        """unit_team -> [{"조사자", "섹장", "쩌리"}] (조 순서). 역할을 못 채우면 None."""
+        names = self.roster.names
+        team_of = self.team_of(unit_team)
+        teams = []
+        for t in range(self.k):
+            members = np.flatnonzero(team_of == t)
+            roles = self.best_roles(members)
+            if roles is None:
+                return None
+            inv, lead, _ = roles
+            # 카메라가 있는 쩌리를 앞에 (기존 배정 순서와 같게)
+            extras = [i for i in members.tolist() if i not in (inv, lead)]
+            extras.sort(key=lambda i: not self.roster.is_cam[i])
+            teams.append({"조사자": names[inv], "섹장": names[lead], "쩌리": [names[i] for i in extras]})
+        return teams
+
+
+class _SearchState:
+    """
+    탐색 중인 편성과 보조 값.
+    unit_aff[u, t] = 단위 u 사람들이 지금 조 t 사람들과 같은 조였던 횟수 합 — 이동할 때마다
+    열 두 개만 고치므로, 이동 하나의 벌점 변화는 스칼라 몇 개로 구한다.
+    """
+
+    def __init__(self, problem, unit_team):
+        self.p = p = problem
+        k = p.k
+        self.unit_team = np.asarray(unit_team, dtype=np.int64)
+        self.team_units = [set() for _ in range(k)]
+        for u, t in enumerate(self.unit_team.tolist()):
+            self.team_units[t].add(u)
+
+        onehot = np.zeros((len(p.units), k), dtype=np.int64)
+        onehot[np.arange(len(p.units)), self.unit_team] = 1
+        self.unit_aff = p.unit_pair @ onehot
+        self.sizes = np.bincount(self.unit_team, weights=p.unit_size, minlength=k).astype(np.int64)
+        self.cams = np.bincount(self.unit_team, weights=p.unit_cams, minlength=k).astype(np.int64)
+        team_of = p.team_of(self.unit_team)
+        self.role_cost = [p._role_cost(np.flatnonzero(team_of == t)) for t in range(k)]
+        self.total = p.total_cost(team_of)
+
+    def _members(self, units):
+        return np.concatenate([self.p.units[u] for u in units]) if units else np.empty(0, dtype=np.int64)
+
+    def _conflicts_with(self, u, t, ignore=None):
+        return any(self.unit_team[x] == t for x in self.p.conflicts[u] if x != ignore)
+
+    def _balance_delta(self, a, b, ds, dc):
+        # 조 a에서 ds명(카메라 dc명)이 빠지고 조 b에 들어갈 때
+        bal = self.p._balance_cost
+        sizes, cams = self.sizes, self.cams
+        return (
+            bal(sizes[a] - ds, cams[a] - dc) + bal(sizes[b] + ds, cams[b] + dc)
+            - bal(sizes[a], cams[a]) - bal(sizes[b], cams[b])
+        )
+
+    def propose_move(self, u, b):
+        """단위 u를 조 b로. (벌점 변화, ...) 또는 불가능하면 None."""
+        p = self.p
+        a = int(self.unit_team[u])
+        if a == b or p.unit_fixed[u] >= 0 or len(self.team_units[a]) == 1 or self._conflicts_with(u, b):
+            return None
+        aff = self.unit_aff[u]
+        pair_delta = int(aff[b]) - int(aff[a]) + int(p.unit_pair[u, u])
+        group_delta = int(p.unit_group[u, b]) - int(p.unit_group[u, a])
+        balance_delta = self._balance_delta(a, b, p.unit_size[u], p.unit_cams[u])
+
+        new_a = self.team_units[a] - {u}
+        new_b = self.team_units[b] | {u}
+        role_a, role_b = self._new_role_costs(a, b, new_a, new_b, p.unit_has_role[u])
+
+        delta = (
+            pair_delta * PAIR_WEIGHT
+            + group_delta * GROUP_WEIGHT
+            + balance_delta
+            + role_a + role_b - self.role_cost[a] - self.role_cost[b]
+        )
+        return delta, (u,), (b,), a, b, new_a, new_b, role_a, role_b
+
+    def propose_swap(self, u, v):
+        """단위 u와 v(다른 조)를 맞바꿈."""
+        p = self.p
+        a, b = int(self.unit_team[u]), int(self.unit_team[v])
+        if a == b or p.unit_fixed[u] >= 0 or p.unit_fixed[v] >= 0:
+            return None
+        if self._conflicts_with(u, b, ignore=v) or self._conflicts_with(v, a, ignore=u):
+            return None
+        cross = int(p.unit_pair[u, v])
+        aff_u, aff_v = self.unit_aff[u], self.unit_aff[v]
+        pair_delta = (
+            int(aff_v[a]) - cross - int(aff_u[a]) + int(p.unit_pair[u, u])
+            + int(aff_u[b]) - cross - int(aff_v[b]) + int(p.unit_pair[v, v])
+        )
+        group = p.unit_group
+        group_delta = int(group[u, b] + group[v, a] - group[u, a] - group[v, b])
+        balance_delta = self._balance_delta(
+            a, b, p.unit_size[u] - p.unit_size[v], p.unit_cams[u] - p.unit_cams[v]
+        )
+
+        new_a = (self.team_units[a] - {u}) | {v}
+        new_b = (self.team_units[b] - {v}) | {u}
+        role_a, role_b = self._new_role_costs(a, b, new_a, new_b, p.unit_has_role[u] or p.unit_has_role[v])
+
+        delta = (
+            pair_delta * PAIR_WEIGHT
+            + group_delta * GROUP_WEIGHT
+            + balance_delta
+            + role_a + role_b - self.role_cost[a] - self.role_cost[b]
+        )
+        return delta, (u, v), (b, a), a, b, new_a, new_b, role_a, role_b
+
+    def _new_role_costs(self, a, b, new_a, new_b, changed):
+        # 역할 후보가 없는 단위만 움직이면 두 조의 역할 배정은 그대로
+        if not changed:
+            return self.role_cost[a], self.role_cost[b]
+        return self.p._role_cost(self._members(new_a)), self.p._role_cost(self._members(new_b))
+
+    def move_deltas(self):
+        """
+        모든 (단위, 옮길 조) 이동의 벌점 변화를 한 번에 (U, k) 행렬로.
+        역할 후보가 있는 단위, 고정된 단위, 다른 팀 제약에 걸리는 조, 혼자 남은 조에서의 이동은 inf.
+        """
+        p, k = self.p, self.p.k
+        rows = np.arange(len(p.units))
+        a = self.unit_team
+
+        pair = self.unit_aff - (self.unit_aff[rows, a] - p.unit_pair[rows, rows])[:, None]
+        group = p.unit_group - p.unit_group[rows, a][:, None]
+
+        def bal(sizes, cams):
+            return (
+                (np.maximum(0, cams - p.cam_hi) + np.maximum(0, p.cam_lo - cams)) * CAMERA_WEIGHT
+                + (np.maximum(0, sizes - p.size_hi) + np.maximum(0, p.size_lo - sizes)) * SIZE_WEIGHT
+            )
+
+        s, c = p.unit_size[:, None], p.unit_cams[:, None]
+        gain_b = bal(self.sizes[None, :] + s, self.cams[None, :] + c) - bal(self.sizes, self.cams)[None, :]
+        loss_a = bal(self.sizes[a] - p.unit_size, self.cams[a] - p.unit_cams) - bal(self.sizes[a], self.cams[a])
+
+        deltas = (pair * PAIR_WEIGHT + group * GROUP_WEIGHT + gain_b + loss_a[:, None]).astype(float)
+        deltas[rows, a] = np.inf
+        deltas[p.unit_has_role] = np.inf
+        deltas[p.unit_fixed >= 0] = np.inf
+        team_count = np.bincount(a, minlength=k)
+        deltas[team_count[a] == 1] = np.inf
+        for u in p.constrained_units:
+            for v in p.conflicts[u]:
+                deltas[u, a[v]] = np.inf
+        return deltas
+
+    def descend(self):
+        """가장 좋은 단일 이동을 벌점이 더 줄지 않을 때까지 반복 (담금질 뒤 마무리)."""
+        while True:
+            deltas = self.move_deltas()
+            u, b = np.unravel_index(np.argmin(deltas), deltas.shape)
+            if not deltas[u, b] < 0:
+                return
+            move = self.propose_move(int(u), int(b))
+            if move is None or move[0] >= 0:
+                return
+            self.apply(move)
+
+    def apply(self, move):
+        delta, units, targets, a, b, new_a, new_b, role_a, role_b = move
+        p = self.p
+        for u, t in zip(units, targets):
+            src = self.unit_team[u]
+            col = p.unit_pair[:, u]
+            self.unit_aff[:, src] -= col
+            self.unit_aff[:, t] += col
+            self.sizes[src] -= p.unit_size[u]
+            self.sizes[t] += p.unit_size[u]
+            self.cams[src] -= p.unit_cams[u]
+            self.cams[t] += p.unit_cams[u]
+            self.unit_team[u] = t
+        self.team_units[a], self.team_units[b] = new_a, new_b
+        self.role_cost[a], self.role_cost[b] = role_a, role_b
+        self.total += delta
+
+
+def solve_teams(k, investigators, leaders, cameras, extras, must_together, must_apart, history_stats,
+                time_budget=DEFAULT_TIME_BUDGET, seed=None):
+    """
+    조 편성. 반환: (teams, camera_set, error) — 실패하면 teams/camera_set은 None, error는 이유.
+    teams: [{"조사자": 이름, "섹장": 이름, "쩌리": [이름, ...]}, ...]
+    """
+    rng = random.Random(seed)
+    deadline = time.perf_counter() + time_budget
+    try:
+        problem = TeamProblem(k, investigators, leaders, cameras, extras, must_together, must_apart, history_stats)
+        unit_team = problem.initial_assignment(rng)
+    except InfeasibleError as e:
+        return None, None, str(e)
+
+    unit_team, _ = problem.anneal(unit_team, deadline, rng)
+    teams = problem.format(unit_team)
+    if teams is None:
+        return None, None, "제한 시간 안에 모든 조에 조사자/섹장을 배치하는 조합을 찾지 못했습니다."
+    return teams, problem.cam_set, None
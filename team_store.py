@@ -0,0 +1,417 @@
+"""
+조 편성 SQLite 저장소 (사람 / 날짜 / 배정 / 제약).
+
+세션 상태에만 있던 날짜별 표를 로컬 SQLite 파일에 둔다. 새로고침해도 남고,
+같은 "조사 이름"을 쓰는 여러 진행자가 서로 다른 날짜를 고쳐도 함께 보인다.
+- people      : 조사마다의 사람 (같은 이름이라도 조사가 다르면 다른 행)
+- days        : 날짜별 표 원본(JSON)과 입력(후보/조 개수/제약), 내용 해시
+- assignments : (사람, 날짜, 조, 역할) — (조사, 사람, 날짜) 인덱스
+- pairs       : 같은 조였던 (사람A, 사람B, 날짜) — (조사, 사람A, 사람B, 날짜) 인덱스
+- constraints : 꼭 같은 팀 / 꼭 다른 팀 쌍
+이력 통계(get_history_stats)와 중복 알림(get_warnings)은 이 표들의 집계 질의로 구한다 (읽기만 한다).
+앱에서는 secrets에 TEAM_DB_PATH를 줄 때만 쓴다 (DEFAULT_DB_PATH는 CLI/스크립트용 기본 경로).
+
+스레드(Streamlit 세션)마다 연결을 따로 쓰고, WAL 모드 + busy_timeout으로 동시에 읽고 쓴다.
+날짜 하나를 저장할 때는 BEGIN IMMEDIATE 트랜잭션 하나로 그 날짜의 행을 모두 바꾼다.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+from perf_trace import stage
+from team_history import CAMERA_MARK, ROLES, clean_name, frame_digest, sum_stats, team_columns
+from team_input import DAY_INPUT_KEYS, day_record_inputs
+
+DEFAULT_DB_PATH = os.path.join("data", "teams.sqlite3")
+DEFAULT_SURVEY = "기본"
+BUSY_TIMEOUT_MS = 5000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS people (
+    id     INTEGER PRIMARY KEY,
+    survey TEXT NOT NULL,
+    name   TEXT NOT NULL,
+    UNIQUE (survey, name)
+);
+CREATE TABLE IF NOT EXISTS days (
+    survey      TEXT    NOT NULL,
+    day         INTEGER NOT NULL,
+    digest      TEXT    NOT NULL,
+    table_json  TEXT    NOT NULL,
+    inputs_json TEXT    NOT NULL,
+    updated_at  REAL    NOT NULL,
+    PRIMARY KEY (survey, day)
+);
+CREATE TABLE IF NOT EXISTS assignments (
+    survey    TEXT    NOT NULL,
+    day       INTEGER NOT NULL,
+    person_id INTEGER NOT NULL REFERENCES people (id),
+    team      INTEGER NOT NULL,
+    role      TEXT,
+    camera    INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS assignments_person_day ON assignments (survey, person_id, day);
+CREATE INDEX IF NOT EXISTS assignments_day ON assignments (survey, day);
+CREATE TABLE IF NOT EXISTS pairs (
+    survey TEXT    NOT NULL,
+    day    INTEGER NOT NULL,
+    a      INTEGER NOT NULL REFERENCES people (id),
+    b      INTEGER NOT NULL REFERENCES people (id),
+    team   INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pairs_pair_day ON pairs (survey, a, b, day);
+CREATE INDEX IF NOT EXISTS pairs_day ON pairs (survey, day);
+CREATE TABLE IF NOT EXISTS constraints (
+    survey TEXT    NOT NULL,
+    day    INTEGER NOT NULL,
+    kind   TEXT    NOT NULL CHECK (kind IN ('together', 'apart')),
+    a      INTEGER NOT NULL REFERENCES people (id),
+    b      INTEGER NOT NULL REFERENCES people (id)
+);
+CREATE INDEX IF NOT EXISTS constraints_day ON constraints (survey, day);
+"""
+
+# 사람 id를 가리키는 열 (조사마다 사람을 따로 두기 전의 파일을 옮길 때 다시 잇는다)
+PERSON_COLUMNS = (("assignments", "person_id"), ("pairs", "a"), ("pairs", "b"), ("constraints", "a"), ("constraints", "b"))
+
+
+def record_digest(df, inputs):
+    """표 + 입력 내용 해시 (저장소의 days.digest)."""
+    payload = f"{frame_digest(df)}|{json.dumps(inputs or {}, ensure_ascii=False, sort_keys=True)}"
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def has_names(df):
+    """이름이 하나라도 든 표인지 (빈 기본 표는 저장하지 않는다)."""
+    if df is None or df.empty:
+        return False
+    return any(clean_name(v) is not None for col in team_columns(df) for v in df[col].tolist())
+
+
+def _table_json(df):
+    rows = [[None if isinstance(v, float) and v != v else v for v in row] for row in df.to_numpy(dtype=object).tolist()]
+    return json.dumps({"columns": list(map(str, df.columns)), "rows": rows}, ensure_ascii=False)
+
+
+def _cells(df):
+    """표 -> [(조 번호(1부터), 이름, 역할 또는 None, 카메라 여부)] (조 안에서는 행 순서)."""
+    roles = df["역할"].tolist() if "역할" in df.columns else [None] * len(df)
+    cells = []
+    for team, col in enumerate(team_columns(df), start=1):
+        for role, value in zip(roles, df[col].tolist()):
+            name = clean_name(value)
+            if name is not None:
+                cells.append((team, name, role if role in ROLES else None, CAMERA_MARK in str(value)))
+    return cells
+
+
+class TeamStore:
+    """SQLite 파일 하나. 스레드마다 연결을 따로 연다."""
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._migrate_people()
+        self._conn().executescript(SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+            conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA foreign_keys = ON")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _write(self):
+        """쓰기 트랜잭션. 시작할 때 쓰기 잠금을 잡아 두 세션이 같은 날짜를 섞어 쓰지 않는다."""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _migrate_people(self):
+        """
+        people가 조사 구분 없이 이름만으로 한 행이던 파일이면, 그 사람이 나온 조사마다 행을 나누고
+        배정/쌍/제약의 id를 새 행으로 바꾼다 (외래 키 검사를 끄고 트랜잭션 하나로).
+        """
+        conn = self._conn()
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(people)")]
+        if not columns or "survey" in columns:
+            return
+        used = " UNION ".join(f"SELECT survey, {column} AS id FROM {table}" for table, column in PERSON_COLUMNS)
+        conn.execute("PRAGMA foreign_keys = OFF")
+        try:
+            with self._write():
+                conn.execute(
+                    "CREATE TABLE people_by_survey (id INTEGER PRIMARY KEY, survey TEXT NOT NULL, name TEXT NOT NULL, "
+                    "UNIQUE (survey, name))"
+                )
+                conn.execute(
+                    "INSERT INTO people_by_survey (survey, name) "
+                    f"SELECT DISTINCT u.survey, p.name FROM ({used}) u JOIN people p ON p.id = u.id"
+                )
+                for table, column in PERSON_COLUMNS:
+                    conn.execute(
+                        f"UPDATE {table} SET {column} = (SELECT n.id FROM people o JOIN people_by_survey n "
+                        f"ON n.name = o.name AND n.survey = {table}.survey WHERE o.id = {table}.{column})"
+                    )
+                conn.execute("DROP TABLE people")
+                conn.execute("ALTER TABLE people_by_survey RENAME TO people")
+        finally:
+            conn.execute("PRAGMA foreign_keys = ON")
+
+    def _person_ids(self, conn, survey, names):
+        """이 조사의 이름 -> 사람 id (없는 이름은 새로 넣는다)."""
+        names = sorted(set(names))
+        conn.executemany("INSERT OR IGNORE INTO people (survey, name) VALUES (?, ?)", [(survey, n) for n in names])
+        ids = {}
+        for i in range(0, len(names), 500):
+            chunk = names[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            ids.update(conn.execute(f"SELECT name, id FROM people WHERE survey = ? AND name IN ({marks})", [survey] + chunk))
+        return ids
+
+    # ----- 날짜 -----
+    def day_versions(self, survey):
+        """{날짜: 내용 해시}."""
+        return dict(self._conn().execute("SELECT day, digest FROM days WHERE survey = ?", (survey,)))
+
+    def save_day(self, survey, day, df, inputs=None, constraints=()):
+        """
+        날짜 하나를 통째로 바꿔 쓴다. 반환: 저장한 내용 해시.
+        constraints: [("together" | "apart", 이름A, 이름B), ...]
+        """
+        inputs = inputs or {}
+        digest = record_digest(df, inputs)
+        cells = _cells(df)
+        constraints = [(kind, a, b) for kind, a, b in constraints if a and b]
+        names = [name for _, name, _, _ in cells] + [n for _, a, b in constraints for n in (a, b)]
+
+        members = {}
+        for team, name, _, _ in cells:
+            members.setdefault(team, []).append(name)
+
+        with stage("store_save", day=day, cells=len(cells)):
+            with self._write() as conn:
+                ids = self._person_ids(conn, survey, names)
+                for table in ("assignments", "pairs", "constraints"):
+                    conn.execute(f"DELETE FROM {table} WHERE survey = ? AND day = ?", (survey, day))
+                conn.executemany(
+                    "INSERT INTO assignments (survey, day, person_id, team, role, camera) VALUES (?, ?, ?, ?, ?, ?)",
+                    [(survey, day, ids[name], team, role, int(cam)) for team, name, role, cam in cells],
+                )
+                # 쌍은 이름 순서(앞, 뒤)로 — team_history의 pair_counts 키와 같게
+                pair_rows = []
+                for team, names_in_team in members.items():
+                    for i in range(len(names_in_team)):
+                        for j in range(i + 1, len(names_in_team)):
+                            a, b = sorted((names_in_team[i], names_in_team[j]))
+                            pair_rows.append((survey, day, ids[a], ids[b], team))
+                conn.executemany("INSERT INTO pairs (survey, day, a, b, team) VALUES (?, ?, ?, ?, ?)", pair_rows)
+                conn.executemany(
+                    "INSERT INTO constraints (survey, day, kind, a, b) VALUES (?, ?, ?, ?, ?)",
+                    [(survey, day, kind, ids[a], ids[b]) for kind, a, b in constraints],
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO days (survey, day, digest, table_json, inputs_json, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (survey, day, digest, _table_json(df), json.dumps(inputs, ensure_ascii=False), time.time()),
+                )
+        return digest
+
+    def load_day(self, survey, day):
+        """(표, 입력, 내용 해시). 없으면 None."""
+        row = self._conn().execute(
+            "SELECT table_json, inputs_json, digest FROM days WHERE survey = ? AND day = ?", (survey, day)
+        ).fetchone()
+        if row is None:
+            return None
+        table = json.loads(row[0])
+        return pd.DataFrame(table["rows"], columns=table["columns"]), json.loads(row[1]), row[2]
+
+    def delete_day(self, survey, day):
+        with self._write() as conn:
+            for table in ("assignments", "pairs", "constraints", "days"):
+                conn.execute(f"DELETE FROM {table} WHERE survey = ? AND day = ?", (survey, day))
+
+    def constraints(self, survey, day):
+        """그 날짜의 [("together" | "apart", 이름A, 이름B)]."""
+        return self._conn().execute(
+            "SELECT c.kind, pa.name, pb.name FROM constraints c "
+            "JOIN people pa ON pa.id = c.a JOIN people pb ON pb.id = c.b "
+            "WHERE c.survey = ? AND c.day = ? ORDER BY c.rowid",
+            (survey, day),
+        ).fetchall()
+
+    # ----- 이력 -----
+    def history_stats(self, survey, last_day):
+        """1 ~ last_day일차 누적 (role_counts, pair_counts, group_counts) — team_history와 같은 모양."""
+        role_counts, pair_counts, group_counts = sum_stats(())
+        if last_day <= 0:
+            return role_counts, pair_counts, group_counts
+        with stage("store_history", last_day=last_day):
+            conn = self._conn()
+            args = (survey, last_day)
+            for name, role, n in conn.execute(
+                "SELECT p.name, a.role, COUNT(*) FROM assignments a JOIN people p ON p.id = a.person_id "
+                "WHERE a.survey = ? AND a.day <= ? AND a.role IS NOT NULL GROUP BY a.person_id, a.role",
+                args,
+            ):
+                role_counts[name][role] += n
+            for name, team, n in conn.execute(
+                "SELECT p.name, a.team, COUNT(*) FROM assignments a JOIN people p ON p.id = a.person_id "
+                "WHERE a.survey = ? AND a.day <= ? GROUP BY a.person_id, a.team",
+                args,
+            ):
+                group_counts[name][team] += n
+            for a, b, n in conn.execute(
+                "SELECT pa.name, pb.name, x.n FROM ("
+                "  SELECT a, b, COUNT(*) AS n FROM pairs WHERE survey = ? AND day <= ? GROUP BY a, b"
+                ") x JOIN people pa ON pa.id = x.a JOIN people pb ON pb.id = x.b",
+                args,
+            ):
+                pair_counts[(a, b)] += n
+        return role_counts, pair_counts, group_counts
+
+
+class StoreHistory:
+    """
+    HistoryIndex 대신 세션에 두는 이력 원본 (같은 읽기 메서드: cumulative / prefix_key).
+    세션의 df_day_{n}을 저장소에 쓰고(push), 다른 세션이 바꾼 날짜를 읽어 오며(pull),
+    누적 통계는 저장소 집계 질의로 구해 날짜 해시가 같은 동안 캐시한다.
+    읽기 경로는 저장소에 쓰지 않는다. 세션에서 고친 날짜는 재실행 끝의 push 한 번으로 저장되고,
+    이력은 그때까지 저장된 표로 센다.
+    inputs_of(session_state, day) -> (입력 dict, 제약 목록): 표와 함께 저장할 입력.
+    """
+
+    def __init__(self, store, survey, inputs_of=None):
+        self.store = store
+        self.survey = survey
+        self.inputs_of = inputs_of or (lambda session_state, day: ({}, []))
+        self._known = {}       # day -> 마지막으로 저장소와 맞춘 내용 해시
+        self._versions = None  # 저장소의 {날짜: 내용 해시} (pull에서 채우고 push가 쓰면 버린다)
+        self._cumulative = {}  # day -> (prefix key, stats)
+        self.recounts = 0
+
+    def _local(self, session_state, day):
+        df = session_state.get(f"df_day_{day}")
+        inputs, constraints = self.inputs_of(session_state, day)
+        return df, inputs, constraints
+
+    def versions(self):
+        """저장소의 {날짜: 내용 해시}. 재실행 처음의 pull이 읽은 값을 그 재실행 동안 쓴다."""
+        if self._versions is None:
+            self._versions = self.store.day_versions(self.survey)
+        return self._versions
+
+    def push(self, session_state, last_day):
+        """세션에서 바뀐 날짜를 저장소에 쓴다 (표를 비웠으면 지운다). 쓴 날짜 목록."""
+        written = []
+        for day in range(1, last_day + 1):
+            df, inputs, constraints = self._local(session_state, day)
+            if not has_names(df):
+                if df is not None and self._known.pop(day, None) is not None:
+                    self.store.delete_day(self.survey, day)
+                    written.append(day)
+                continue
+            digest = record_digest(df, inputs)
+            if digest != self._known.get(day):
+                self._known[day] = self.store.save_day(self.survey, day, df, inputs, constraints)
+                written.append(day)
+        if written:
+            self._versions = None
+        return written
+
+    def pull(self, session_state, last_day):
+        """
+        다른 세션이 저장소에서 바꾼 날짜 -> [(날짜, 표, 입력)].
+        세션에서 고쳤는데 아직 저장하지 않은 날짜는 건너뛴다. 세션에 넣는 일은 호출하는 쪽에서.
+        """
+        self._versions = None
+        versions = self.versions()
+        loaded = []
+        for day in range(1, last_day + 1):
+            remote = versions.get(day)
+            if remote is None or remote == self._known.get(day):
+                continue
+            df, inputs, _ = self._local(session_state, day)
+            locally_changed = has_names(df) and record_digest(df, inputs) != self._known.get(day)
+            if locally_changed and day in self._known:
+                continue
+            loaded.append((day,) + self.store.load_day(self.survey, day)[:2])
+            self._known[day] = remote
+        return loaded
+
+    def prefix_key(self, day):
+        versions = self.versions()
+        return tuple(versions.get(d) for d in range(1, day + 1))
+
+    def cumulative(self, day):
+        key = self.prefix_key(day)
+        entry = self._cumulative.get(day)
+        if entry is None or entry[0] != key:
+            entry = (key, self.store.history_stats(self.survey, day))
+            self._cumulative[day] = entry
+            self.recounts += 1
+        return entry[1]
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_team_store(path=DEFAULT_DB_PATH):
+    """경로마다 프로세스 공용 저장소 하나."""
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = TeamStore(path)
+        return _stores[path]
+
+
+# 조사를 바꿀 때 비우는 날짜별 세션 값
+DAY_STATE_PATTERN = re.compile(r"(df_day|solved_df|editor|" + "|".join(DAY_INPUT_KEYS) + r")_\d+")
+
+
+def use_team_store(session_state, survey, num_days, path=DEFAULT_DB_PATH):
+    """
+    path 저장소의 이 조사 이력을 세션 이력 원본으로 두고, 다른 세션이 바꾼 날짜를 세션으로 읽어 온다.
+    읽어 온 날짜 목록.
+    """
+    history = session_state.get("history_index")
+    if not isinstance(history, StoreHistory) or history.survey != survey:
+        if isinstance(history, StoreHistory):
+            # 다른 조사의 표/입력이 새 조사에 저장되지 않도록
+            for key in [k for k in session_state if DAY_STATE_PATTERN.fullmatch(k)]:
+                del session_state[key]
+            for key in ("day_summaries", "schedule_result"):
+                session_state.pop(key, None)
+        history = StoreHistory(get_team_store(path), survey, day_record_inputs)
+        session_state["history_index"] = history
+        session_state.pop("warnings_engine", None)
+
+    loaded = []
+    for day, df, inputs in history.pull(session_state, num_days):
+        session_state[f"df_day_{day}"] = df
+        # 읽어 온 표를 기준으로, 그 뒤에 고친 칸만 손으로 고친 칸으로 본다
+        session_state[f"solved_df_{day}"] = df.copy()
+        session_state.pop(f"editor_{day}", None)
+        for name, value in inputs.items():
+            session_state[f"{name}_{day}"] = value
+        loaded.append(day)
+    return loaded
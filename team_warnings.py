@@ -0,0 +1,186 @@
+"""
+조 편성 표의 중복 알림 (역할 반복 / 조 번호 반복 / 같은 조였던 쌍).
+
+예전에는 셀을 고칠 때마다 표를 iterrows로 훑고, 조마다 모든 쌍을 파이썬으로 돌았다.
+- 표를 (행, 조, 이름, 역할) 긴 표로 한 번 펴고, 이력 카운터를 pandas Series로 바꿔 둔 것과
+  인덱스(get_indexer)로 한꺼번에 맞춰 본다. 쌍은 조마다 삼각 인덱스로 한꺼번에 만든다.
+- 이력 Series는 앞 날짜 표 내용이 같은 동안 재사용한다.
+- 조(열)마다 알림을 캐시해 두고, 열 내용(이름과 역할 칸)이 바뀐 조만 다시 계산한다.
+알림 문구와 순서는 예전과 같다 (칸 알림은 행 -> 조 순서, 그다음 조별 쌍 알림).
+"""
+import numpy as np
+import pandas as pd
+
+from perf_trace import stage
+from team_history import ROLES, clean_name, get_history_index, team_columns
+
+ENGINE_KEY = "warnings_engine"
+
+
+# 여러 칸으로 된 키((이름, 조 번호), (이름A, 이름B))를 문자열 하나로 이을 때 쓰는 구분자
+KEY_SEP = "\x1f"
+
+
+def _keys(first, second):
+    """두 배열을 원소별로 이은 문자열 키 배열."""
+    return np.asarray(first, dtype=object) + KEY_SEP + np.asarray(second).astype(str).astype(object)
+
+
+def _lookup(series, keys):
+    """키 배열로 이력 Series를 맞춰 본 횟수 배열 (없으면 0)."""
+    if series.empty or len(keys) == 0:
+        return np.zeros(len(keys), dtype=np.int64)
+    pos = series.index.get_indexer(keys)
+    return np.where(pos >= 0, series.to_numpy()[pos], 0)
+
+
+def _series(items):
+    keys, counts = zip(*items) if items else ((), ())
+    return pd.Series(np.array(counts, dtype=np.int64), index=pd.Index(keys, dtype=object))
+
+
+class _HistoryFrames:
+    """누적 통계 -> 0이 아닌 값만 담은 Series (역할별 이름, 이름+조 번호, 이름A+이름B 키)."""
+
+    def __init__(self, stats):
+        role_counts, pair_counts, group_counts = stats
+        self.role = {
+            role: _series([(name, c[role]) for name, c in role_counts.items() if c.get(role)])
+            for role in ROLES
+        }
+        self.group = _series([
+            (f"{name}{KEY_SEP}{g}", c) for name, counts in group_counts.items() for g, c in counts.items() if c
+        ])
+        self.pair = _series([(f"{a}{KEY_SEP}{b}", c) for (a, b), c in pair_counts.items() if c])
+
+
+def _long_frame(df, cols):
+    """
+    표의 cols 열 -> 이름이 든 칸만 펼친 긴 표 (열 이름 -> 배열): row, col(조 순서, 0부터), name, role.
+    조 안에서는 행 순서를 유지한다.
+    """
+    roles = df["역할"].tolist() if "역할" in df.columns else [None] * len(df)
+    rows, col_ids, names = [], [], []
+    for t, col in cols:
+        for r, value in enumerate(df[col].tolist()):
+            name = clean_name(value)
+            if name is not None:
+                rows.append(r)
+                col_ids.append(t)
+                names.append(name)
+    return {
+        "row": np.array(rows, dtype=np.int64),
+        "col": np.array(col_ids, dtype=np.int64),
+        "name": np.array(names, dtype=object),
+        "role": np.array([roles[r] for r in rows], dtype=object),
+    }
+
+
+def _column_warnings(df, cols, history):
+    """
+    cols [(조 순서, 열 이름)]의 알림을 한꺼번에.
+    반환: {조 순서: (칸 알림 [(행, 종류, 문구)], 쌍 알림 [문구])}
+    """
+    results = {t: ([], []) for t, _ in cols}
+    long = _long_frame(df, cols)
+    if not len(long["name"]):
+        return results
+    rows, col_ids, names = long["row"], long["col"], long["name"]
+
+    # 1. 역할 반복
+    for role in ROLES:
+        sel = np.flatnonzero(long["role"] == role)
+        counts = _lookup(history.role[role], names[sel])
+        for i, c in zip(sel[counts > 0], counts[counts > 0]):
+            results[col_ids[i]][0].append(
+                (rows[i], 0, f"⚠️ **{names[i]}**: 과거에 이미 '{role}' 역할을 {c}번 수행했습니다.")
+            )
+
+    # 2. 조 번호 반복
+    counts = _lookup(history.group, _keys(names, col_ids + 1))
+    for i in np.flatnonzero(counts > 0):
+        t = col_ids[i]
+        results[t][0].append((rows[i], 1, f"🔢 **{names[i]}**: 과거에 이미 {t + 1}조에 {counts[i]}번 배정됐습니다."))
+
+    # 3. 같은 조였던 쌍: 조마다 행 순서로 (앞 사람, 뒤 사람) 쌍을 만들고 한꺼번에 맞춰 본다
+    pair_cols, first, second = [], [], []
+    starts = np.flatnonzero(np.r_[True, col_ids[1:] != col_ids[:-1]])
+    for start, end in zip(starts, np.r_[starts[1:], len(col_ids)]):
+        i, j = np.triu_indices(end - start, 1)
+        a, b = names[start + i], names[start + j]
+        swap = b < a
+        first.append(np.where(swap, b, a))
+        second.append(np.where(swap, a, b))
+        pair_cols.append(np.full(len(i), col_ids[start]))
+    first, second = np.concatenate(first), np.concatenate(second)
+    pair_cols = np.concatenate(pair_cols)
+    counts = _lookup(history.pair, _keys(first, second))
+    col_names = dict(cols)
+    for k in np.flatnonzero(counts > 0):
+        t = pair_cols[k]
+        results[t][1].append(f"👥 **{col_names[t]}**: ({first[k]}, {second[k]}) 조합은 이전에 {counts[k]}번 같은 조였습니다.")
+    return results
+
+
+class WarningsEngine:
+    """세션마다 하나. 날짜별로 이력 Series와 조(열)별 알림을 캐시한다."""
+
+    def __init__(self):
+        self._history = {}   # day -> (이력 키, _HistoryFrames)
+        self._columns = {}   # day -> {열 서명: 알림}
+        self.recomputed = 0  # 다시 계산한 조(열) 수
+
+    def _history_frames(self, day, history_index):
+        history_key = history_index.prefix_key(day - 1)
+        entry = self._history.get(day)
+        if entry is None or entry[0] != history_key:
+            entry = (history_key, _HistoryFrames(history_index.cumulative(day - 1)))
+            self._history[day] = entry
+            self._columns.pop(day, None)
+        return entry[1]
+
+    def warnings(self, df, day, history_index):
+        if df is None or df.empty:
+            return []
+        history = self._history_frames(day, history_index)
+
+        roles = tuple(df["역할"].tolist()) if "역할" in df.columns else ()
+        signatures = {
+            t: (t, col, roles, tuple(map(clean_name, df[col].tolist())))
+            for t, col in enumerate(team_columns(df))
+        }
+        cached = self._columns.get(day, {})
+        changed = [(t, sig[1]) for t, sig in signatures.items() if sig not in cached]
+        fresh = _column_warnings(df, changed, history) if changed else {}
+        self.recomputed += len(changed)
+
+        # 지금 표에 있는 열만 남긴다
+        columns = {sig: fresh[t] if t in fresh else cached[sig] for t, sig in signatures.items()}
+        self._columns[day] = columns
+
+        cells = sorted(
+            (r, t, kind, text)
+            for t, sig in signatures.items()
+            for r, kind, text in columns[sig][0]
+        )
+        warnings = [text for _, _, _, text in cells]
+        for t, sig in signatures.items():
+            warnings.extend(columns[sig][1])
+        return list(dict.fromkeys(warnings))
+
+
+def get_warnings_engine(session_state):
+    if ENGINE_KEY not in session_state:
+        session_state[ENGINE_KEY] = WarningsEngine()
+    return session_state[ENGINE_KEY]
+
+
+def get_warnings(df, day_idx, session_state):
+    """day_idx일차 표의 중복 알림 문구 목록 (1 ~ day_idx-1일차 이력 기준)."""
+    with stage("warnings", day=day_idx) as span:
+        index = get_history_index(session_state, day_idx - 1)
+        engine = get_warnings_engine(session_state)
+        recomputed = engine.recomputed
+        warnings = engine.warnings(df, day_idx, index)
+        span.set(warnings=len(warnings), recomputed_cols=engine.recomputed - recomputed)
+    return warnings
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 모듈들이 저장소 최상위에 평평하게 있다 (패키지 아님)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,62 @@
+import pytest
+
+import field_sheet
+from field_sheet import convert, parse_row
+from lru_cache import LRUCache
+
+
+@pytest.mark.parametrize("line, expected", [
+    ("참새\t12", "참새 <12>"),
+    (" 큰 부리 까마귀 \t 1,200 \t\t", "큰 부리 까마귀 <1,200>"),
+    ("쇠백로 3", "쇠백로 <3>"),
+    ("흰뺨 검둥오리   15", "흰뺨 검둥오리 <15>"),
+    ("국명\t관찰수", ""),
+    ("Species\tCount", ""),
+    ("국명 개체수", ""),
+    ("참새\t다수", None),
+    ("참새\t12\t비고", None),
+    ("참새\t1,2", None),
+    ("\t12", None),
+    ("참새", None),
+])
+def test_parse_row(line, expected):
+    assert parse_row(line) == expected
+
+
+@pytest.fixture
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(field_sheet, "_cache", LRUCache(max_entries=8))
+
+
+def test_convert_sends_only_malformed_runs_and_caches_them(fresh_cache):
+    sent = []
+
+    def complete(text):
+        sent.append(text)
+        return "까치 <몇>, 까마귀 <2>"
+
+    text = "국명\t관찰수\n참새\t12\n\n까치\t몇\n까마귀\t2\t비고\n쇠백로 3\n"
+    result = convert(text, complete)
+    assert result.text == "참새 <12>, 까치 <몇>, 까마귀 <2>, 쇠백로 <3>"
+    # 연달아 있는 두 행은 한 번에 보낸다
+    assert sent == ["까치\t몇\n까마귀\t2\t비고"]
+    assert (result.local_rows, result.llm_rows, result.llm_calls, result.cache_hits) == (2, 2, 1, 0)
+
+    again = convert(text, complete)
+    assert again.text == result.text
+    assert (again.llm_calls, again.cache_hits) == (0, 1) and len(sent) == 1
+
+
+def test_convert_without_or_with_failing_completer(fresh_cache):
+    text = "참새\t12\n까치\t몇"
+    result = convert(text)
+    assert result.text == "참새 <12>"
+    assert result.unresolved == ["까치\t몇"]
+
+    def fail(text):
+        raise RuntimeError("rate limit")
+
+    result = convert(text, fail)
+    assert result.text == "참새 <12>"
+    assert result.unresolved == ["까치\t몇"] and result.errors == ["rate limit"]
+    assert field_sheet.get_response_cache().stats()["entries"] == 0
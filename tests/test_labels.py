@@ -0,0 +1,48 @@
+import geopandas as gpd
+import shapely
+
+from labels import LABEL_MAX_ZOOM, LABEL_MIN_ZOOM, declutter, label_anchors
+
+ALL_ZOOMS = (1 << (LABEL_MAX_ZOOM - LABEL_MIN_ZOOM + 1)) - 1
+
+
+def anchors(rows):
+    """rows: [(경도, 위도, 텍스트, 종류, 우선순위)]"""
+    return gpd.GeoDataFrame(
+        {
+            "text": [r[2] for r in rows],
+            "color": ["red"] * len(rows),
+            "layer_type": [r[3] for r in rows],
+            "priority": [r[4] for r in rows],
+        },
+        geometry=[shapely.Point(r[0], r[1]) for r in rows],
+        crs="EPSG:4326",
+    )
+
+
+def test_declutter_keeps_higher_priority_label_on_overlap():
+    masks = declutter(anchors([
+        (128.9, 35.1, "시작: 하구둑", "point", 1.2),
+        (128.9, 35.1, "A-1", "line", 3.4),
+        (127.0, 37.5, "멀리", "polygon", 2.0),
+    ]))
+    assert masks.tolist() == [0, ALL_ZOOMS, ALL_ZOOMS]
+
+
+def test_declutter_shows_nearby_labels_once_zoomed_in():
+    # 약 200m 떨어진 두 라벨: 낮은 줌에서는 겹쳐 하나만, 가까이 보면 둘 다
+    masks = declutter(anchors([(128.900, 35.1, "A-1", "line", 3.1), (128.902, 35.1, "A-2", "line", 3.2)]))
+    assert masks[1] == ALL_ZOOMS
+    lowest_shared = next(b for b in range(ALL_ZOOMS.bit_length()) if masks[0] >> b & 1)
+    assert 0 < lowest_shared and masks[0] == ALL_ZOOMS & ~((1 << lowest_shared) - 1)
+
+
+def test_line_label_sits_on_the_line_midpoint():
+    frame = gpd.GeoDataFrame(
+        {"color": ["red", "blue"], "label": ["A-1", None]},
+        geometry=[shapely.LineString([(0, 0), (2, 0), (2, 2)]), shapely.LineString([(5, 5), (6, 6)])],
+        crs="EPSG:4326",
+    )
+    out = label_anchors(frame, "line")
+    assert out["text"].tolist() == ["A-1"]
+    assert out.geometry.iloc[0].equals(shapely.Point(2, 0))
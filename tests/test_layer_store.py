@@ -0,0 +1,59 @@
+import os
+
+import geopandas as gpd
+from shapely.geometry import Point
+
+from layer_store import LayerStore, data_version
+
+
+def write_parts(tmp_path, dbf=b"dbf"):
+    path = tmp_path / "layer.shp"
+    path.write_bytes(b"shp")
+    (tmp_path / "layer.dbf").write_bytes(dbf)
+    return str(path)
+
+
+def counting_loader():
+    calls = []
+
+    def load(path):
+        calls.append(path)
+        return gpd.GeoDataFrame({"n": [len(calls)]}, geometry=[Point(127, 37)], crs="EPSG:4326")
+
+    return load, calls
+
+
+def test_reads_once_until_a_part_changes(tmp_path):
+    path = write_parts(tmp_path)
+    loader, calls = counting_loader()
+    store = LayerStore(loader)
+
+    assert store.get(path)["n"].tolist() == [1]
+    assert store.get(path)["n"].tolist() == [1]
+    assert len(calls) == 1
+    version = store.version(path)
+
+    # .shp가 아닌 구성 파일(.dbf)만 바뀌어도 다시 읽는다
+    write_parts(tmp_path, dbf=b"dbf changed")
+    assert store.get(path)["n"].tolist() == [2]
+    assert store.version(path) != version
+    assert store.stats() == {"hits": 1, "misses": 2, "layers": 1}
+
+
+def test_returned_frame_does_not_touch_the_cache(tmp_path):
+    path = write_parts(tmp_path)
+    store = LayerStore(counting_loader()[0])
+    gdf = store.get(path)
+    gdf["extra"] = 1
+    assert "extra" not in store.get(path).columns
+
+
+def test_data_version_includes_sidecar(tmp_path):
+    path = write_parts(tmp_path)
+    before = data_version([path])
+    (tmp_path / "layer.parquet").write_bytes(b"parquet")
+    after = data_version([path])
+    assert before != after
+    assert [ext for ext, _, _ in after[0]] == [".shp", ".dbf", ".parquet"]
+    os.remove(tmp_path / "layer.parquet")
+    assert data_version([path]) == before
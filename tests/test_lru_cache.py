@@ -0,0 +1,33 @@
+from lru_cache import LRUCache, byte_size
+
+
+def test_byte_size_counts_utf8_bytes():
+    assert byte_size("abc") == 3
+    assert byte_size("한글") == 6
+    assert byte_size(b"\x00\x01") == 2
+
+
+def test_evicts_least_recently_used_by_bytes():
+    cache = LRUCache(max_entries=10, max_bytes=12)
+    cache.put("a", "가나")      # 6
+    cache.put("b", "abcd")      # 4
+    assert cache.get("a") == "가나"
+    cache.put("c", "다")        # 3 -> 13 > 12, 가장 오래 안 쓴 b가 빠진다
+    assert cache.get("b") is None
+    assert cache.stats() == {"hits": 1, "misses": 0, "evictions": 1, "entries": 2, "bytes": 9}
+
+    # 같은 키를 다시 넣으면 예전 크기를 빼고 센다
+    cache.put("a", "x")
+    assert cache.stats()["bytes"] == 4
+
+
+def test_keeps_a_single_oversized_entry_and_counts_misses():
+    cache = LRUCache(max_entries=2, max_bytes=4)
+    assert cache.get_or_build("big", lambda: "0123456789") == "0123456789"
+    assert cache.get_or_build("big", lambda: "other") == "0123456789"
+    stats = cache.stats()
+    assert (stats["entries"], stats["bytes"], stats["hits"], stats["misses"]) == (1, 10, 1, 1)
+    cache.put("x", "1")
+    assert cache.get("big") is None and cache.stats()["bytes"] == 1
+    cache.clear()
+    assert cache.stats()["entries"] == 0 and cache.stats()["bytes"] == 0
@@ -0,0 +1,44 @@
+import folium
+import geopandas as gpd
+import shapely
+
+from map_render import add_layer_to_map, frame_with_geometry, layer_frame
+
+
+def test_frame_with_geometry_swaps_only_the_geometry():
+    gdf = gpd.GeoDataFrame(
+        {"sector_key": ["A-1", None, "A-3"], "color": ["red", None, "green"], "name": ["x", "y", "z"]},
+        geometry=[shapely.LineString([(0, 0), (1, 1)]), shapely.LineString([(1, 1), (2, 2)]), None],
+        crs="EPSG:4326",
+    )
+    frame = layer_frame(gdf, "line", "하천", "라인")
+    # 단순화한 단계에서 두 번째 선이 비어 버린 경우
+    simplified = gdf.set_geometry([shapely.LineString([(0, 0), (1, 1.01)]), shapely.LineString(), None])
+    out = frame_with_geometry(frame, simplified)
+    assert out.index.tolist() == [0]
+    assert out.geometry.iloc[0].equals(simplified.geometry.iloc[0])
+    assert out.drop(columns="geometry").equals(frame.drop(columns="geometry").loc[[0]])
+    # 라벨용 원본 frame은 그대로다
+    assert frame.index.tolist() == [0, 1] and frame.geometry.iloc[0].equals(gdf.geometry.iloc[0])
+
+
+def test_each_layer_is_one_feature_collection():
+    gdf = gpd.GeoDataFrame(
+        {"sector_key": ["A-1", "A-2", None], "color": ["red", "blue", None],
+         "startend": ["시작", None, None], "location": ["다리", "보", None]},
+        geometry=[shapely.Point(127.0, 37.0), shapely.Point(127.1, 37.1), shapely.Point(127.2, 37.2)],
+        crs="EPSG:4326",
+    )
+    frame = layer_frame(gdf, "point", "하천", "하천 포인트")
+    assert frame["label"].tolist() == ["시작: 다리", "보", None]
+
+    m = folium.Map(tiles=None)
+    add_layer_to_map(m, frame, "point", "하천", "하천 포인트")
+    layers = [c for c in m._children.values() if isinstance(c, folium.GeoJson)]
+    assert len(layers) == 1
+    features = layers[0].data["features"]
+    assert [f["properties"] for f in features] == [
+        {"color": "red", "tooltip": "하천 포인트 - A-1"},
+        {"color": "blue", "tooltip": "하천 포인트 - A-2"},
+        {"color": "blue", "tooltip": "하천 포인트 - 구역 정보 없음"},
+    ]
@@ -0,0 +1,72 @@
+import json
+
+import geopandas as gpd
+import pytest
+import shapely
+
+import perf_trace
+from perf_trace import begin_run, configure_log, current_trace, end_run, stage
+
+
+@pytest.fixture
+def trace_log(tmp_path, monkeypatch):
+    monkeypatch.setattr(perf_trace, "_logger", None)
+    path = tmp_path / "logs" / "trace.jsonl"
+    configure_log(str(path))
+    return path
+
+
+def read_records(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_stage_is_a_no_op_when_off(monkeypatch):
+    monkeypatch.setattr(perf_trace, "_logger", None)
+    assert current_trace() is None
+    with stage("x", a=1) as span:
+        assert not span
+        span.set(b=2)
+        span.geometry(None)
+
+
+def test_run_records_nested_stages(trace_log):
+    trace = begin_run("rerun", page="조 편성")
+    gdf = gpd.GeoDataFrame(geometry=[shapely.LineString([(0, 0), (1, 1), (2, 0)]), shapely.Point(0, 0)])
+    with stage("outer", region="하천") as outer:
+        with stage("inner") as inner:
+            inner.geometry(gdf)
+        outer.set(done=True)
+    assert current_trace() is trace
+    end_run(trace)
+    assert current_trace() is None
+
+    (record,) = read_records(trace_log)
+    assert record["label"] == "rerun" and record["page"] == "조 편성" and record["status"] == "ok"
+    stages = [{k: s[k] for k in ("stage", "depth")} for s in record["stages"]]
+    assert stages == [{"stage": "outer", "depth": 0}, {"stage": "inner", "depth": 1}]
+    assert record["stages"][0]["region"] == "하천" and record["stages"][0]["done"] is True
+    assert (record["stages"][1]["features"], record["stages"][1]["vertices"]) == (2, 4)
+    assert [row["단계"] for row in trace.rows()] == ["outer", "  inner"]
+    assert trace.summary()["가장 느린 단계"].startswith("outer ")
+
+    # 두 번 닫아도 한 줄만
+    end_run(trace)
+    assert len(read_records(trace_log)) == 1
+
+
+def test_unfinished_run_is_closed_as_interrupted(trace_log):
+    first = begin_run("rerun")
+    with stage("a"):
+        pass
+    second = begin_run("rerun", previous=first)
+    end_run(second)
+    assert [(r["run"], r["status"]) for r in read_records(trace_log)] == [(first.id, "interrupted"), (second.id, "ok")]
+
+
+def test_stage_outside_a_run_writes_its_own_record(trace_log):
+    with stage("export_xlsx", days=3) as span:
+        assert span
+    (record,) = read_records(trace_log)
+    assert record["label"] == "export_xlsx"
+    assert [s["stage"] for s in record["stages"]] == ["export_xlsx"]
+    assert record["stages"][0]["days"] == 3
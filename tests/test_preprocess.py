@@ -0,0 +1,70 @@
+import os
+
+import geopandas as gpd
+import shapely
+
+from layer_store import load_layer, sidecar_is_fresh, sidecar_path
+from preprocess import preprocess_tab
+from sectors import DERIVED_COLUMNS, annotate_tab_layers, has_derived_columns
+
+
+def write_tab(tmp_path):
+    """EPSG:5186 라인/포인트 Shapefile 두 개짜리 탭 설정."""
+    lines = gpd.GeoDataFrame(
+        {"sector": ["하천6-1", "하천6-2", "하천7"]},
+        geometry=[shapely.LineString([(200000 + i * 100, 550000), (200050 + i * 100, 550080)]) for i in range(3)],
+        crs="EPSG:5186",
+    )
+    points = gpd.GeoDataFrame(
+        {"sector": ["하천7", None], "location": ["다리", "보"]},
+        geometry=[shapely.Point(200000, 550000), shapely.Point(200300, 550050)],
+        crs="EPSG:5186",
+    )
+    files = []
+    for layer_type, gdf in (("line", lines), ("point", points)):
+        path = str(tmp_path / f"{layer_type}.shp")
+        gdf.to_file(path, encoding="utf-8")
+        files.append({"path": path, "type": layer_type, "layer_name": layer_type, "sector_col": "sector"})
+    return {"name": "하천", "files": files}
+
+
+def shapefile_layers(tab_config):
+    gdfs = {f["type"]: {"gdf": load_layer(f["path"]), "config": f} for f in tab_config["files"]}
+    return annotate_tab_layers(tab_config["name"], gdfs)
+
+
+def test_sidecar_round_trip_matches_shapefile_path(tmp_path):
+    tab_config = write_tab(tmp_path)
+    expected = shapefile_layers(tab_config)
+
+    written = preprocess_tab(tab_config)
+    assert [(os.path.basename(p), n) for p, n in written] == [("line.parquet", 3), ("point.parquet", 2)]
+
+    for file_config in tab_config["files"]:
+        assert sidecar_is_fresh(file_config["path"])
+        gdf = load_layer(file_config["path"])
+        assert gdf.crs == "EPSG:4326"
+        assert has_derived_columns(gdf)
+        want = expected[file_config["type"]]["gdf"]
+        assert gdf[DERIVED_COLUMNS].equals(want[DERIVED_COLUMNS])
+        assert gdf.geometry.geom_equals_exact(want.geometry, tolerance=1e-9).all()
+
+    # 사이드카가 있으면 다시 붙이지 않는다 (같은 객체 그대로)
+    gdfs = {f["type"]: {"gdf": load_layer(f["path"]), "config": f} for f in tab_config["files"]}
+    before = {lt: item["gdf"] for lt, item in gdfs.items()}
+    annotate_tab_layers(tab_config["name"], gdfs)
+    assert all(gdfs[lt]["gdf"] is before[lt] for lt in gdfs)
+
+
+def test_stale_sidecar_falls_back_to_shapefile(tmp_path):
+    tab_config = write_tab(tmp_path)
+    preprocess_tab(tab_config)
+    path = tab_config["files"][0]["path"]
+
+    # 원본이 사이드카보다 새로우면 원본 Shapefile을 읽는다
+    sidecar_mtime = os.stat(sidecar_path(path)).st_mtime_ns
+    os.utime(os.path.splitext(path)[0] + ".dbf", ns=(sidecar_mtime + 10**9, sidecar_mtime + 10**9))
+    assert not sidecar_is_fresh(path)
+    gdf = load_layer(path)
+    assert gdf.crs == "EPSG:4326"
+    assert not has_derived_columns(gdf)
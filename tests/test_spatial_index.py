@@ -0,0 +1,76 @@
+import os
+
+import geopandas as gpd
+import pytest
+import shapely
+from pyproj import Transformer
+
+import spatial_index
+from spatial_index import METRIC_CRS, SpatialIndexStore, locate
+
+X0, Y0 = 1000000, 1900000
+_to_wgs84 = Transformer.from_crs(METRIC_CRS, "EPSG:4326", always_xy=True)
+
+
+def location_at(x, y):
+    lon, lat = _to_wgs84.transform(X0 + x, Y0 + y)
+    return {"latitude": lat, "longitude": lon}
+
+
+@pytest.fixture
+def region(tmp_path, monkeypatch):
+    """EPSG:5179 미터 좌표로 만든 지역 하나 (큰 폴리곤 안에 작은 폴리곤, 라인 둘, 시작/종료 지점)."""
+    layers = {
+        "polygon": gpd.GeoDataFrame(
+            {"sector": ["큰 구역", "작은 구역"]},
+            geometry=[shapely.box(X0, Y0, X0 + 1000, Y0 + 1000), shapely.box(X0 + 100, Y0 + 100, X0 + 200, Y0 + 200)],
+        ),
+        "line": gpd.GeoDataFrame(
+            {"sector": ["하천1", "하천2"]},
+            geometry=[shapely.LineString([(X0, Y0 + 500), (X0 + 1000, Y0 + 500)]),
+                      shapely.LineString([(X0 + 500, Y0), (X0 + 500, Y0 + 300)])],
+        ),
+        "point": gpd.GeoDataFrame(
+            {"sector": ["하천1", "하천1", "하천1"], "startend": ["시작", "종료", ""], "location": ["다리", "보", "중간"]},
+            geometry=[shapely.Point(X0, Y0 + 500), shapely.Point(X0 + 1000, Y0 + 500), shapely.Point(X0 + 150, Y0 + 150)],
+        ),
+    }
+    files = []
+    for layer_type, gdf in layers.items():
+        path = str(tmp_path / f"{layer_type}.shp")
+        gdf.set_crs(METRIC_CRS).to_file(path, encoding="utf-8")
+        files.append({"path": path, "type": layer_type, "layer_name": layer_type, "sector_col": "sector"})
+    monkeypatch.setattr(spatial_index, "_store", SpatialIndexStore([{"name": "테스트", "files": files}]))
+    return "테스트"
+
+
+def test_locate_picks_smallest_polygon_and_nearest_features(region):
+    result = locate(region, location_at(150, 160))
+    assert result["polygon"] == {"layer_name": "polygon", "sector": "작은 구역"}
+    # 라인 하천2(x=500)까지 350m, 하천1(y=500)까지 340m
+    assert result["line"]["sector"] == "하천1"
+    assert result["line"]["distance_m"] == pytest.approx(340, abs=0.5)
+    # 시작/종료가 아닌 지점(중간)은 후보가 아니다
+    assert result["point"]["location"] == "다리"
+    assert result["point"]["startend"] == "시작"
+    assert result["point"]["distance_m"] == pytest.approx((150 ** 2 + 340 ** 2) ** 0.5, abs=0.5)
+
+
+def test_locate_outside_polygons_and_without_location(region):
+    result = locate(region, location_at(1200, 500))
+    assert result["polygon"] is None
+    assert result["line"]["distance_m"] == pytest.approx(200, abs=0.5)
+    assert result["point"]["location"] == "보"
+
+    assert locate(region, None) is None
+    assert locate(region, {"latitude": None, "longitude": None}) is None
+
+
+def test_index_is_reused_until_data_changes(region, tmp_path):
+    store = spatial_index.get_spatial_index_store()
+    index = store.get(region)
+    assert store.get(region) is index
+    dbf = tmp_path / "line.dbf"
+    mtime = dbf.stat().st_mtime_ns + 10**9
+    os.utime(dbf, ns=(mtime, mtime))
+    assert store.get(region) is not index
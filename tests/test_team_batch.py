@@ -0,0 +1,70 @@
+import pandas as pd
+
+from team_batch import batch_workbook, iter_batch, next_day, read_batch_history, sheet_names, split_cohorts
+
+
+def roster_table():
+    rows = []
+    for cohort, k in (("A", 2), ("B", None)):
+        for i in range(8):
+            rows.append({
+                "조사지": cohort, "이름": f"{cohort}{i}",
+                "조사자": "O" if i < 2 else "", "섹장": "O" if 2 <= i < 4 else "",
+                "조 개수": k or "",
+            })
+    return pd.DataFrame(rows)
+
+
+def test_split_cohorts_uses_k_column_then_default():
+    specs = split_cohorts(roster_table(), default_k=3)
+    assert list(specs) == ["A", "B"]
+    assert specs["A"]["k"] == 2 and specs["B"]["k"] == 3
+    assert specs["A"]["investigators"] == ["A0", "A1"]
+
+
+def test_next_day_skips_gaps():
+    assert next_day({}) == 1
+    assert next_day({"df_day_2": None}) == 3
+    assert next_day({"df_day_1": None, "df_day_3": None}) == 4
+
+
+def test_history_with_missing_cohort_sheet_keeps_day_numbers(tmp_path):
+    specs = split_cohorts(roster_table(), default_k=2)
+    first = list(iter_batch(specs, time_budget=0.1, seed=1))
+    day1 = tmp_path / "day1.xlsx"
+    day2 = tmp_path / "day2.xlsx"
+    day2.write_bytes(batch_workbook(first))
+    # 1일차 파일에는 B만 있다 (A 시트 없음)
+    day1.write_bytes(batch_workbook([r for r in first if r.cohort == "B"]))
+
+    history = read_batch_history([str(day1), str(day2)], list(specs))
+    assert sorted(history["A"]) == ["df_day_2"]
+    assert sorted(history["B"]) == ["df_day_1", "df_day_2"]
+    assert next_day(history["A"]) == 3
+
+    second = {r.cohort: r for r in iter_batch(specs, history, time_budget=0.1, seed=2)}
+    # A의 2일차 이력(조사자/섹장 반복 등)이 빠지지 않고 알림으로 나온다
+    repeated_roles = [w for w in second["A"].warnings if "과거에 이미" in w]
+    assert repeated_roles
+
+
+def test_sheet_names_are_excel_safe_and_unique():
+    names = sheet_names(["a:b", "a/b", "요약", "x" * 40])
+    assert names["a:b"] == "a_b"
+    assert names["a/b"] == "a_b (2)"
+    assert names["요약"] != "요약"
+    assert len(names["x" * 40]) <= 31
+
+
+def test_parallel_batches_reuse_the_shared_pool():
+    import team_parallel
+
+    specs = split_cohorts(roster_table(), default_k=2)
+    first = list(iter_batch(specs, time_budget=0.1, workers=2, seed=1))
+    executor = team_parallel._executor
+    assert executor is not None
+    second = list(iter_batch(specs, time_budget=0.1, workers=2, seed=1))
+    # 같은 풀을 그대로 쓰고 닫지 않는다 (병렬 탐색도 같은 풀을 쓴다)
+    assert team_parallel._executor is executor
+    assert executor.submit(sum, (1, 2)).result() == 3
+    assert [r.error for r in first + second] == [None] * 4
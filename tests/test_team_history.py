@@ -0,0 +1,57 @@
+import pytest
+
+from team_history import HistoryIndex, day_summaries, format_teams_for_editor, get_history_stats, store_day_summary
+
+
+def day_table(*teams):
+    return format_teams_for_editor([{"조사자": i, "섹장": l, "쩌리": list(rest)} for i, l, *rest in teams], {"c1"})
+
+
+def test_day_summaries_drop_warning_count_after_table_changes():
+    state = {"df_day_1": day_table(("a1", "b1", "c1"), ("a2", "b2"))}
+    store_day_summary(state, 1, state["df_day_1"], 2)
+    rows = day_summaries(state, 2)
+    assert rows[0] == {"날짜": "1일차", "조": 2, "인원": 5, "중복 알림": 2}
+    assert rows[1] == {"날짜": "2일차", "조": None, "인원": 0, "중복 알림": None}
+
+    state["df_day_1"] = day_table(("a1", "b2", "c1"), ("a2", "b1"))
+    assert day_summaries(state, 1)[0]["중복 알림"] is None
+
+
+def test_history_index_recounts_only_changed_days():
+    index = HistoryIndex()
+    days = {
+        1: day_table(("a1", "b1", "c1"), ("a2", "b2")),
+        2: day_table(("a2", "b1"), ("a1", "b2", "c1")),
+        3: day_table(("a1", "b2"), ("a2", "b1", "c1")),
+    }
+    for day, df in days.items():
+        index.update_day(day, df)
+    index.cumulative(3)
+    first = index.cumulative(1)
+    assert index.recounts == 3
+
+    # 같은 내용이면 다시 세지 않는다
+    assert not index.update_day(2, days[2].copy())
+    assert index.cumulative(3) is index.cumulative(3)
+    # 2일차가 바뀌면 그 날짜만 다시 세고, 1일차까지의 누적은 그대로 쓴다
+    key = index.prefix_key(3)
+    assert index.update_day(2, day_table(("a1", "b1"), ("a2", "b2", "c1")))
+    assert index.recounts == 4
+    assert index.cumulative(1) is first
+    assert index.prefix_key(1) == key[:1] and index.prefix_key(3) != key
+    assert index.cumulative(3)[1][("a1", "b1")] == 2
+
+
+def test_get_history_stats_returns_copies_of_the_cache():
+    state = {"df_day_1": day_table(("a1", "b1", "c1"), ("a2", "b2"))}
+    role_counts, pair_counts, group_counts = get_history_stats(2, state)
+    assert type(pair_counts) is dict and pair_counts[("a1", "b1")] == 1
+    with pytest.raises(KeyError):
+        pair_counts[("a1", "zz")]
+    role_counts["a1"]["조사자"] = 99
+    group_counts.clear()
+
+    again = get_history_stats(2, state)
+    assert again[0]["a1"]["조사자"] == 1 and again[2]["a1"] == {1: 1}
+    assert ("a1", "zz") not in state["history_index"].cumulative(1)[1]
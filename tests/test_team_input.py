@@ -0,0 +1,71 @@
+import pandas as pd
+import pytest
+
+from team_input import (
+    day_record_inputs, init_day_inputs, keep_day_inputs, parse_names_auto, parse_pairs_auto, roster_from_table,
+)
+
+
+def test_parse_names_auto_splits_on_comma_newline_tab():
+    assert parse_names_auto("a, b\nc\td,,\n e ") == ["a", "b", "c", "d", "e"]
+    assert parse_names_auto("") == []
+    assert parse_names_auto(None) == []
+
+
+def test_parse_pairs_auto_skips_malformed_chunks():
+    raw = "a-b, c - d\ne\nf-\n-g, h-i-j"
+    assert parse_pairs_auto(raw) == [("a", "b"), ("c", "d"), ("h", "i-j")]
+    assert parse_pairs_auto("") == []
+
+
+def test_roster_from_table_flags_and_pairs():
+    df = pd.DataFrame({
+        "이름": ["a", "b", "c", "", "a"],
+        "조사자": ["O", "", "", "O", ""],
+        "섹장": ["", "1", "", "", ""],
+        "카메라": ["", "", "예", "", ""],
+        "같은 팀": ["c", "", "", "", ""],
+        "다른 팀": ["", "a, c", "", "", ""],
+    })
+    spec = roster_from_table(df, 2)
+    assert spec["k"] == 2
+    assert spec["investigators"] == ["a"]
+    assert spec["leaders"] == ["b"]
+    assert spec["cameras"] == ["c"]
+    # 두 번째 a 행에는 표시가 없지만, 조사자 표시가 한 번이라도 있으면 쩌리 후보에서 뺀다
+    assert spec["extras"] == ["c"]
+    assert spec["must_together"] == [("a", "c")]
+    assert spec["must_apart"] == [("a", "b"), ("b", "c")]
+
+
+def test_roster_from_table_requires_name_column():
+    with pytest.raises(ValueError):
+        roster_from_table(pd.DataFrame({"조사자": ["O"]}), 1)
+
+
+def test_init_day_inputs_carries_previous_day_candidates():
+    state = {"input_inv_1": "a, b", "input_lead_1": "c", "k_2": 4}
+    init_day_inputs(state, 2)
+    assert state["input_inv_2"] == "a, b" and state["input_lead_2"] == "c"
+    assert state["input_extra_2"] == ""
+    # 이미 있는 값은 그대로 둔다
+    assert state["k_2"] == 4
+    assert state["together_2"] == "" and state["parallel_2"] is False
+
+
+def test_keep_day_inputs_rewrites_only_existing_keys():
+    class Recording(dict):
+        def __setitem__(self, key, value):
+            self.setdefault("_written", []).append(key)
+            super().__setitem__(key, value)
+
+    state = Recording({"k_1": 3, "input_inv_2": "a", "df_day_1": None})
+    keep_day_inputs(state, 2)
+    assert sorted(state["_written"]) == ["input_inv_2", "k_1"]
+
+
+def test_day_record_inputs_collects_inputs_and_constraints():
+    state = {"k_1": 2, "together_1": "a-b", "apart_1": "c-d, e-f", "df_day_1": None, "k_2": 5}
+    inputs, constraints = day_record_inputs(state, 1)
+    assert inputs == {"k": 2, "together": "a-b", "apart": "c-d, e-f"}
+    assert constraints == [("together", "a", "b"), ("apart", "c", "d"), ("apart", "e", "f")]
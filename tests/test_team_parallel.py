@@ -0,0 +1,49 @@
+import os
+import subprocess
+import sys
+
+from team_parallel import solve_teams_parallel
+
+NO_HISTORY = ({}, {}, {})
+
+
+def test_parallel_solve_honors_constraints():
+    invs, leads = ["i0", "i1", "i2"], ["l0", "l1", "l2"]
+    extras = [f"e{i}" for i in range(6)]
+    teams, _, err = solve_teams_parallel(
+        3, invs, leads, ["e0"], extras, [("e0", "e1")], [("e2", "e3")], NO_HISTORY,
+        time_budget=1.0, workers=2, seed=5,
+    )
+    assert err is None
+    where = {name: t for t, team in enumerate(teams) for name in [team["조사자"], team["섹장"]] + team["쩌리"]}
+    assert len(where) == 12
+    assert where["e0"] == where["e1"]
+    assert where["e2"] != where["e3"]
+
+
+def test_parallel_solve_reports_conflict_before_spawning():
+    teams, cam_set, err = solve_teams_parallel(
+        1, ["i0"], ["l0"], [], ["e0", "e1"], [], [("e0", "e1")], NO_HISTORY, time_budget=0.5, workers=2,
+    )
+    assert teams is None and cam_set is None
+    assert err
+
+
+def test_workers_do_not_rerun_the_main_script(tmp_path):
+    """Streamlit처럼 __main__이 스크립트를 가리켜도 작업자는 그 스크립트를 실행하지 않는다."""
+    marker = tmp_path / "ran"
+    script = tmp_path / "app.py"
+    script.write_text(f"open({str(marker)!r}, 'w').close()\n")
+    driver = f"""
+import sys, types
+main = types.ModuleType("__main__")
+main.__file__ = {str(script)!r}
+sys.modules["__main__"] = main
+from team_parallel import solve_teams_parallel
+teams, _, err = solve_teams_parallel(1, ["i0"], ["l0"], [], ["e0"], [], [], ({{}}, {{}}, {{}}), time_budget=0.5, workers=2)
+assert err is None, err
+assert sys.modules["__main__"] is main
+"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    subprocess.run([sys.executable, "-c", driver], cwd=root, check=True, timeout=120)
+    assert not marker.exists()
@@ -0,0 +1,58 @@
+import pandas as pd
+import pytest
+
+from team_history import format_teams_for_editor
+from team_schedule import collect_schedule_days, fixed_assignments
+from team_solver import InfeasibleError
+
+
+def day_table(*teams):
+    return format_teams_for_editor([{"조사자": i, "섹장": l, "쩌리": list(rest)} for i, l, *rest in teams], set())
+
+
+def test_collect_schedule_days_solves_filled_days_and_freezes_the_rest():
+    state = {
+        "input_inv_1": "a1, a2", "input_lead_1": "b1, b2", "input_extra_1": "c1", "k_1": 2, "apart_1": "a1-c1",
+        # 2일차는 후보가 비어 있어 지금 표를 이력으로만 쓴다
+        "input_inv_2": "", "input_lead_2": "", "input_extra_2": "",
+        "df_day_2": day_table(("a1", "b1"), ("a2", "b2")),
+    }
+    days, frozen = collect_schedule_days(state, 3)
+    # 3일차는 열어 본 적이 없어 2일차(빈 후보)를 이어받고, 표도 없으니 빠진다
+    assert list(days) == [1] and len(frozen) == 1
+    spec = days[1]
+    assert spec["k"] == 2 and spec["investigators"] == ["a1", "a2"] and spec["extras"] == ["c1"]
+    assert spec["must_apart"] == [("a1", "c1")] and spec["fixed"] == {}
+    assert state["input_inv_3"] == ""
+
+
+def test_collect_schedule_days_adds_hand_typed_names_as_candidates():
+    solved = day_table(("a1", "b1"), ("a2", "b2"))
+    edited = solved.copy()
+    edited.loc[0, "1조"] = "new"
+    state = {"input_inv_1": "a1, a2", "input_lead_1": "b1, b2", "df_day_1": edited, "solved_df_1": solved}
+    days, _ = collect_schedule_days(state, 1)
+    assert days[1]["fixed"] == {"new": (0, "조사자")}
+    assert days[1]["investigators"] == ["a1", "a2", "new"]
+
+
+def test_collect_schedule_days_prefixes_day_on_duplicate_names():
+    solved = day_table(("a1", "b1"), ("a2", "b2"))
+    edited = solved.copy()
+    edited.loc[0, "1조"] = "b2"
+    state = {"input_inv_2": "a1, a2", "input_lead_2": "b1, b2", "df_day_2": edited, "solved_df_2": solved}
+    with pytest.raises(InfeasibleError, match="^2일차: "):
+        collect_schedule_days(state, 2)
+
+
+def test_fixed_assignments_report_duplicate_names():
+    df = pd.DataFrame({"역할": ["조사자", "섹장", "쩌리1"], "1조": ["a", "b", "c"], "2조": ["d", "a", ""]})
+    with pytest.raises(InfeasibleError, match="a \\(1조 조사자, 2조 섹장\\)"):
+        fixed_assignments(df)
+
+
+def test_fixed_assignments_keep_only_hand_edited_cells():
+    solved = pd.DataFrame({"역할": ["조사자", "섹장"], "1조": ["a", "b"], "2조": ["c", "d"]})
+    edited = solved.copy()
+    edited.loc[1, "2조"] = "x 📷"
+    assert fixed_assignments(edited, solved) == {"x": (1, "섹장")}
@@ -0,0 +1,109 @@
+import random
+import time
+
+import numpy as np
+import pytest
+
+from team_solver import InfeasibleError, TeamProblem, UnionFind, solve_teams
+
+NO_HISTORY = ({}, {}, {})
+
+
+def roster(k=3, size=4):
+    invs = [f"i{t}" for t in range(k)]
+    leads = [f"l{t}" for t in range(k)]
+    extras = [f"e{i}" for i in range(k * (size - 2))]
+    return invs, leads, extras
+
+
+def team_index(teams):
+    return {name: t for t, team in enumerate(teams) for name in [team["조사자"], team["섹장"]] + team["쩌리"]}
+
+
+def test_union_find_merges_transitively():
+    uf = UnionFind(6)
+    uf.union(0, 1)
+    uf.union(2, 1)
+    uf.union(4, 5)
+    assert uf.find(0) == uf.find(1) == uf.find(2)
+    assert uf.find(4) == uf.find(5)
+    assert uf.find(3) == 3
+    assert uf.find(0) != uf.find(4)
+
+
+def test_must_together_and_apart_on_same_unit_is_infeasible():
+    invs, leads, extras = roster()
+    together = [("e0", "e1"), ("e1", "e2")]
+    with pytest.raises(InfeasibleError, match="서로 충돌"):
+        TeamProblem(3, invs, leads, [], extras, together, [("e0", "e2")], NO_HISTORY)
+
+
+def test_constraint_with_unknown_name_is_infeasible():
+    invs, leads, extras = roster()
+    with pytest.raises(InfeasibleError, match="존재하지 않는 이름"):
+        TeamProblem(3, invs, leads, [], extras, [("e0", "nobody")], [], NO_HISTORY)
+
+
+def test_solve_teams_reports_conflict_as_error():
+    invs, leads, extras = roster()
+    teams, cam_set, err = solve_teams(3, invs, leads, [], extras, [("e0", "e1")], [("e0", "e1")], NO_HISTORY,
+                                      time_budget=0.1, seed=1)
+    assert teams is None and cam_set is None
+    assert "충돌" in err
+
+
+def test_solve_teams_honors_constraints():
+    invs, leads, extras = roster()
+    together = [("e0", "e1"), ("i0", "e2")]
+    apart = [("e3", "e4"), ("e3", "e5"), ("e4", "e5")]
+    teams, _, err = solve_teams(3, invs, leads, [], extras, together, apart, NO_HISTORY, time_budget=0.2, seed=7)
+    assert err is None
+    where = team_index(teams)
+    assert len(where) == len(invs + leads + extras)
+    assert where["e0"] == where["e1"] and where["i0"] == where["e2"]
+    assert len({where["e3"], where["e4"], where["e5"]}) == 3
+    assert all(team["조사자"] in invs and team["섹장"] in leads for team in teams)
+
+
+def random_history(names, k, rng):
+    roles = {n: {"조사자": rng.randint(0, 3), "섹장": rng.randint(0, 3)} for n in names}
+    pairs = {(a, b): rng.randint(1, 4) for a, b in (rng.sample(names, 2) for _ in range(len(names) * 3))}
+    groups = {n: {g: rng.randint(0, 2) for g in range(1, k + 1)} for n in names}
+    return roles, pairs, groups
+
+
+def test_total_cost_matches_per_team_scores():
+    rng = random.Random(3)
+    k = 5
+    invs = [f"i{t}" for t in range(8)]
+    leads = [f"l{t}" for t in range(8)] + invs[:4]  # 조사자/섹장을 둘 다 할 수 있는 사람
+    extras = [f"e{i}" for i in range(14)]
+    cams = extras[:5] + invs[:2]
+    names = list(dict.fromkeys(invs + leads + extras))
+    fixed = {"i5": (0, "조사자"), "i1": (2, "섹장")}
+    problem = TeamProblem(k, invs, leads, cams, extras, [], [], random_history(names, k, rng), fixed=fixed)
+    draw = np.random.default_rng(0)
+    for _ in range(300):
+        team_of = draw.integers(0, k, len(names))
+        expected = [problem.team_cost(t, np.flatnonzero(team_of == t)) for t in range(k)]
+        assert problem.team_costs(team_of).tolist() == expected
+        assert problem.total_cost(team_of) == sum(expected)
+
+
+def test_fixed_assignments_are_honored():
+    invs, leads, extras = roster()
+    fixed = {"e0": (2, None), "l0": (1, "섹장"), "i2": (0, "조사자")}
+    problem = TeamProblem(3, invs, leads, [], extras, [("e0", "e1")], [], NO_HISTORY, fixed=fixed)
+    rng = random.Random(3)
+    unit_team, _ = problem.anneal(problem.initial_assignment(rng), time.perf_counter() + 0.2, rng)
+    teams = problem.format(unit_team)
+    where = team_index(teams)
+    assert where["e0"] == where["e1"] == 2
+    assert teams[1]["섹장"] == "l0"
+    assert teams[0]["조사자"] == "i2"
+
+
+def test_fixed_assignment_conflicting_with_must_together_is_infeasible():
+    invs, leads, extras = roster()
+    with pytest.raises(InfeasibleError, match="고정 배정"):
+        TeamProblem(3, invs, leads, [], extras, [("e0", "e1")], [], NO_HISTORY, fixed={"e0": (0, None), "e1": (1, None)})
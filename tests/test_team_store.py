@@ -0,0 +1,162 @@
+import pandas as pd
+
+import sqlite3
+
+from team_history import HistoryIndex, format_teams_for_editor, get_history_stats, plain_stats
+from team_store import StoreHistory, TeamStore, get_team_store, use_team_store
+
+
+def day_table(*teams):
+    return format_teams_for_editor([{"조사자": i, "섹장": l, "쩌리": list(rest)} for i, l, *rest in teams], {"c1"})
+
+
+def inputs_of(session_state, day):
+    inputs = {"k": session_state.get(f"k_{day}", 2)}
+    return inputs, [("apart", "a1", "b1")]
+
+
+def test_save_and_load_day_round_trip(tmp_path):
+    store = TeamStore(str(tmp_path / "teams.sqlite3"))
+    df = day_table(("a1", "b1", "c1"), ("a2", "b2", "c2", "c3"))
+    version = store.save_day("조사", 1, df, {"k": 2}, [("apart", "a1", "b1")])
+
+    loaded, inputs, loaded_version = store.load_day("조사", 1)
+    pd.testing.assert_frame_equal(loaded.reset_index(drop=True), df)
+    assert inputs == {"k": 2}
+    assert loaded_version == version
+    assert [tuple(c) for c in store.constraints("조사", 1)] == [("apart", "a1", "b1")]
+    assert store.day_versions("조사") == {1: version}
+    # 다른 조사 이름과는 섞이지 않는다
+    assert store.day_versions("다른 조사") == {}
+
+    store.delete_day("조사", 1)
+    assert store.day_versions("조사") == {}
+
+
+def test_history_stats_match_session_history(tmp_path):
+    store = TeamStore(str(tmp_path / "teams.sqlite3"))
+    days = {
+        1: day_table(("a1", "b1", "c1"), ("a2", "b2", "c2")),
+        2: day_table(("a2", "b1", "c1"), ("a1", "b2", "c2")),
+    }
+    index = HistoryIndex()
+    for day, df in days.items():
+        store.save_day("조사", day, df)
+        index.update_day(day, df)
+    assert plain_stats(store.history_stats("조사", 2)) == plain_stats(index.cumulative(2))
+    assert plain_stats(store.history_stats("조사", 1)) == plain_stats(index.cumulative(1))
+
+
+def test_push_and_pull_between_sessions(tmp_path):
+    store = TeamStore(str(tmp_path / "teams.sqlite3"))
+    alice, bob = {}, {}
+    alice_history = StoreHistory(store, "조사", inputs_of)
+    bob_history = StoreHistory(store, "조사", inputs_of)
+
+    alice["df_day_1"] = day_table(("a1", "b1", "c1"), ("a2", "b2", "c2"))
+    assert alice_history.push(alice, 2) == [1]
+    # 바뀐 것이 없으면 다시 쓰지 않는다
+    assert alice_history.push(alice, 2) == []
+
+    pulled = bob_history.pull(bob, 2)
+    assert [day for day, _, _ in pulled] == [1]
+    day, df, inputs = pulled[0]
+    pd.testing.assert_frame_equal(df.reset_index(drop=True), alice["df_day_1"])
+    assert inputs == {"k": 2}
+    assert bob_history.pull(bob, 2) == []
+
+    # 읽기(get_history_stats -> cumulative)는 저장소에 쓰지 않는다
+    bob["df_day_2"] = day_table(("a2", "b1", "c1"), ("a1", "b2", "c2"))
+    bob["history_index"] = bob_history
+    get_history_stats(3, bob)
+    assert set(store.day_versions("조사")) == {1}
+    assert bob_history.push(bob, 2) == [2]
+    pulled = alice_history.pull(alice, 2)
+    assert [day for day, _, _ in pulled] == [2]
+    alice["df_day_2"] = pulled[0][1]
+
+    # 표를 비우면 그 날짜를 지운다
+    alice["df_day_2"] = alice["df_day_2"].iloc[0:0]
+    assert alice_history.push(alice, 2) == [2]
+    assert set(store.day_versions("조사")) == {1}
+
+
+def test_cumulative_reads_day_versions_once_per_pull(tmp_path):
+    store = TeamStore(str(tmp_path / "teams.sqlite3"))
+    calls = []
+    day_versions = store.day_versions
+    store.day_versions = lambda survey: calls.append(survey) or day_versions(survey)
+    history = StoreHistory(store, "조사", inputs_of)
+    session = {"df_day_1": day_table(("a1", "b1", "c1"), ("a2", "b2", "c2"))}
+
+    history.pull(session, 3)
+    for day in (1, 2, 2, 3):
+        history.cumulative(day)
+    assert len(calls) == 1
+    # 저장하면 다음 읽기에서 한 번 다시 읽는다
+    assert history.push(session, 3) == [1]
+    assert history.cumulative(1)[1] == {("a1", "b1"): 1, ("a1", "c1"): 1, ("b1", "c1"): 1,
+                                        ("a2", "b2"): 1, ("a2", "c2"): 1, ("b2", "c2"): 1}
+    history.cumulative(2)
+    assert len(calls) == 2
+
+
+def test_people_are_scoped_by_survey(tmp_path):
+    store = TeamStore(str(tmp_path / "teams.sqlite3"))
+    store.save_day("조사", 1, day_table(("a1", "b1", "c1")))
+    store.save_day("다른 조사", 1, day_table(("a1", "b2")))
+    conn = sqlite3.connect(store.path)
+    assert conn.execute("SELECT survey, name FROM people WHERE name = 'a1' ORDER BY survey").fetchall() == [
+        ("다른 조사", "a1"), ("조사", "a1"),
+    ]
+    assert plain_stats(store.history_stats("다른 조사", 1))[1] == {("a1", "b2"): 1}
+
+
+def test_store_moves_name_only_people_to_surveys(tmp_path):
+    path = str(tmp_path / "teams.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE people (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+        CREATE TABLE assignments (survey TEXT NOT NULL, day INTEGER NOT NULL,
+            person_id INTEGER NOT NULL REFERENCES people (id), team INTEGER NOT NULL, role TEXT,
+            camera INTEGER NOT NULL DEFAULT 0);
+        CREATE TABLE pairs (survey TEXT NOT NULL, day INTEGER NOT NULL, a INTEGER NOT NULL REFERENCES people (id),
+            b INTEGER NOT NULL REFERENCES people (id), team INTEGER NOT NULL);
+        CREATE TABLE constraints (survey TEXT NOT NULL, day INTEGER NOT NULL, kind TEXT NOT NULL,
+            a INTEGER NOT NULL REFERENCES people (id), b INTEGER NOT NULL REFERENCES people (id));
+        INSERT INTO people (id, name) VALUES (1, 'a1'), (2, 'b1'), (3, 'b2');
+        INSERT INTO assignments VALUES ('조사', 1, 1, 1, '조사자', 0), ('조사', 1, 2, 1, '섹장', 0),
+            ('다른 조사', 1, 1, 1, '조사자', 0), ('다른 조사', 1, 3, 1, '섹장', 0);
+        INSERT INTO pairs VALUES ('조사', 1, 1, 2, 1), ('다른 조사', 1, 1, 3, 1);
+        INSERT INTO constraints VALUES ('다른 조사', 1, 'apart', 1, 3);
+    """)
+    conn.close()
+
+    store = TeamStore(path)
+    assert plain_stats(store.history_stats("조사", 1)) == (
+        {"a1": {"조사자": 1, "섹장": 0}, "b1": {"조사자": 0, "섹장": 1}}, {("a1", "b1"): 1}, {"a1": {1: 1}, "b1": {1: 1}},
+    )
+    assert plain_stats(store.history_stats("다른 조사", 1))[1] == {("a1", "b2"): 1}
+    assert [tuple(c) for c in store.constraints("다른 조사", 1)] == [("apart", "a1", "b2")]
+    rows = store._conn().execute("SELECT survey, name FROM people ORDER BY survey, name").fetchall()
+    assert rows == [("다른 조사", "a1"), ("다른 조사", "b2"), ("조사", "a1"), ("조사", "b1")]
+    assert store._conn().execute("PRAGMA foreign_key_check").fetchall() == []
+
+
+def test_use_team_store_loads_other_sessions_and_clears_on_survey_change(tmp_path):
+    path = str(tmp_path / "teams.sqlite3")
+    get_team_store(path).save_day("조사", 1, day_table(("a1", "b1", "c1"), ("a2", "b2")), {"k": 2, "together": "a1-c1"})
+
+    state = {}
+    assert use_team_store(state, "조사", 2, path) == [1]
+    history = state["history_index"]
+    assert isinstance(history, StoreHistory) and history.store is get_team_store(path)
+    assert state["k_1"] == 2 and state["together_1"] == "a1-c1"
+    assert state["solved_df_1"].equals(state["df_day_1"])
+    assert use_team_store(state, "조사", 2, path) == []
+
+    # 다른 조사로 바꾸면 앞 조사의 날짜 값은 세션에서 지운다
+    state["day_summaries"] = {1: ("x", 0)}
+    assert use_team_store(state, "다른 조사", 2, path) == []
+    assert not any(key.endswith("_1") for key in state)
+    assert "day_summaries" not in state and state["history_index"].survey == "다른 조사"
@@ -0,0 +1,58 @@
+from team_history import HistoryIndex, format_teams_for_editor
+from team_warnings import WarningsEngine
+
+
+def day_table(*teams):
+    return format_teams_for_editor([{"조사자": i, "섹장": l, "쩌리": list(rest)} for i, l, *rest in teams], {"c1"})
+
+
+def history(*days):
+    index = HistoryIndex()
+    for day, df in enumerate(days, 1):
+        index.update_day(day, df)
+    return index
+
+
+def test_warnings_text_and_order():
+    index = history(day_table(("a1", "b1", "c1"), ("a2", "b2")))
+    warnings = WarningsEngine().warnings(day_table(("a1", "b2", "c1"), ("a2", "b1")), 2, index)
+    # 칸 알림은 행 -> 조 순서, 그다음 조별 쌍 알림
+    assert warnings == [
+        "⚠️ **a1**: 과거에 이미 '조사자' 역할을 1번 수행했습니다.",
+        "🔢 **a1**: 과거에 이미 1조에 1번 배정됐습니다.",
+        "⚠️ **a2**: 과거에 이미 '조사자' 역할을 1번 수행했습니다.",
+        "🔢 **a2**: 과거에 이미 2조에 1번 배정됐습니다.",
+        "⚠️ **b2**: 과거에 이미 '섹장' 역할을 1번 수행했습니다.",
+        "⚠️ **b1**: 과거에 이미 '섹장' 역할을 1번 수행했습니다.",
+        "🔢 **c1**: 과거에 이미 1조에 1번 배정됐습니다.",
+        "👥 **1조**: (a1, c1) 조합은 이전에 1번 같은 조였습니다.",
+    ]
+
+
+def test_recomputes_only_changed_columns():
+    index = history(day_table(("a1", "b1", "c1"), ("a2", "b2")))
+    engine = WarningsEngine()
+    df = day_table(("a1", "b2", "c1"), ("a2", "b1"), ("a3", "b3"))
+    engine.warnings(df, 2, index)
+    assert engine.recomputed == 3
+
+    # 같은 표면 다시 계산하지 않는다
+    assert engine.warnings(df.copy(), 2, index) == engine.warnings(df, 2, index)
+    assert engine.recomputed == 3
+
+    # 2조만 바꾸면 2조만 다시 계산하고, 결과는 새 엔진과 같다
+    edited = df.copy()
+    edited.loc[0, "2조"] = "a1"
+    warnings = engine.warnings(edited, 2, index)
+    assert engine.recomputed == 4
+    assert warnings == WarningsEngine().warnings(edited, 2, index)
+
+    # 앞 날짜 이력이 바뀌면 모든 조를 다시 계산한다
+    index.update_day(1, day_table(("a3", "b3"), ("a2", "b2", "c1")))
+    warnings = engine.warnings(edited, 2, index)
+    assert engine.recomputed == 7
+    assert warnings == WarningsEngine().warnings(edited, 2, index)
+
+    # 다른 날짜는 따로 캐시한다
+    engine.warnings(edited, 3, history(df, df))
+    assert engine.recomputed == 10
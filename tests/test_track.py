@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from track import TRACK_PLACEHOLDER, TrackLine, TrackRecorder, distance_m, inject_track
+
+# 위도 0.001도 ~ 111m
+STEP = 0.001
+
+
+def test_thins_points_inside_the_accuracy_radius():
+    rec = TrackRecorder(capacity=10)
+    assert rec.add(37.0, 127.0, accuracy=5, timestamp=0)
+    # 제자리 반복, 최소 반경(3m) 안
+    assert not rec.add(37.0, 127.0, accuracy=5, timestamp=1)
+    assert not rec.add(37.00002, 127.0, timestamp=2)
+    # 직전 점의 오차(50m)가 크면 그 안은 버린다
+    assert rec.add(37.0 + STEP, 127.0, accuracy=50, timestamp=3)
+    assert not rec.add(37.0 + STEP * 1.4, 127.0, accuracy=5, timestamp=4)
+    assert rec.add(37.0 + STEP * 2, 127.0, accuracy=5, timestamp=5)
+    assert not rec.add(None, 127.0)
+    assert len(rec) == 3
+    assert rec.points[:, 3].tolist() == [0, 3, 5]
+
+
+def test_memory_is_bounded_and_keeps_both_ends():
+    rec = TrackRecorder(capacity=8)
+    for i in range(100):
+        assert rec.add(37.0 + STEP * i, 127.0, timestamp=i)
+        assert len(rec) <= 8
+    times = rec.points[:, 3].tolist()
+    assert times[0] == 0 and times[-1] == 99
+    assert times == sorted(times)
+    assert rec.version == 100
+    assert rec._data.shape == (8, 4)
+
+
+def test_capacity_must_be_at_least_four():
+    with pytest.raises(ValueError):
+        TrackRecorder(capacity=3)
+
+
+def test_exports_and_injects_the_track():
+    rec = TrackRecorder()
+    rec.add(37.0, 127.0, accuracy=4.24, timestamp=0)
+    geojson = json.loads(rec.to_geojson())
+    assert geojson["features"][0]["geometry"] == {"type": "Point", "coordinates": [127.0, 37.0]}
+
+    rec.add(37.0 + STEP, 127.0 + STEP, timestamp=60)
+    feature = json.loads(rec.to_geojson())["features"][0]
+    assert feature["geometry"]["type"] == "LineString"
+    assert feature["properties"]["times"] == ["1970-01-01T00:00:00Z", "1970-01-01T00:01:00Z"]
+    assert feature["properties"]["accuracy_m"] == [4.2, 0.0]
+
+    gpx = rec.to_gpx(name="a & b")
+    assert "<name>a &amp; b</name>" in gpx
+    assert gpx.count("<trkpt ") == 2
+
+    html = f"var coords = {TRACK_PLACEHOLDER};"
+    assert inject_track(html, rec) == f"var coords = {json.dumps(rec.latlngs())};"
+    assert inject_track(html, TrackRecorder()) == html
+    assert TrackLine().placeholder == TRACK_PLACEHOLDER
+
+
+def test_distance_m():
+    assert distance_m(37.0, 127.0, 37.0 + STEP, 127.0) == pytest.approx(111.2, abs=0.1)
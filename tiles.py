@@ -0,0 +1,281 @@
+"""
+벡터 타일(Mapbox Vector Tile) 모드.
+
+레이어를 페이지 HTML에 통째로 넣는 대신, 지도에 보이는 타일만 로컬 엔드포인트에서
+받아 오게 한다. 타일은 요청이 올 때 만들고(LRU 캐시), 원본 데이터 버전이 바뀌면
+새로 만든다. 타일 속성에는 sector / sector_key / location / startend 등 원본 컬럼과
+color / tooltip / label이 그대로 들어 있어 스타일과 라벨이 인라인 모드와 같다.
+
+    python tiles.py serve --port 8765                 # 타일 서버만 실행
+    python tiles.py build --out tiles --max-zoom 16   # 정적 타일 피라미드를 미리 생성
+
+엔드포인트: /{지역}/{line|polygon|point}/{z}/{x}/{y}.pbf  (지역 이름은 URL 인코딩)
+"""
+import argparse
+import math
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote, unquote
+
+import numpy as np
+import pandas as pd
+import shapely
+
+from layer_store import data_version
+from lod import tolerance_for_zoom
+from lru_cache import LRUCache
+from sectors import TAB_CONFIGS
+
+TILE_EXTENT = 4096
+# 타일 경계 밖으로 여유 있게 잘라 선 굵기/점 반경이 타일 경계에서 잘리지 않게 한다 (extent 단위)
+TILE_BUFFER = 64
+MERCATOR_HALF = 20037508.342789244
+
+DEFAULT_MIN_ZOOM = 8
+DEFAULT_MAX_ZOOM = 16
+
+# 타일에 그대로 싣는 원본 속성 컬럼
+KEEP_ATTRIBUTES = ["sector", "sector_key", "location", "startend", "name", "code"]
+
+
+def tile_bounds(z, x, y):
+    """XYZ 타일의 EPSG:3857 경계 (minx, miny, maxx, maxy)."""
+    size = 2 * MERCATOR_HALF / (2 ** z)
+    minx = -MERCATOR_HALF + x * size
+    maxy = MERCATOR_HALF - y * size
+    return (minx, maxy - size, minx + size, maxy)
+
+
+def tiles_covering(bounds, z):
+    """EPSG:3857 경계를 덮는 줌 z의 (x, y) 타일 목록."""
+    size = 2 * MERCATOR_HALF / (2 ** z)
+    n = 2 ** z
+    x0 = max(0, int(math.floor((bounds[0] + MERCATOR_HALF) / size)))
+    x1 = min(n - 1, int(math.floor((bounds[2] + MERCATOR_HALF) / size)))
+    y0 = max(0, int(math.floor((MERCATOR_HALF - bounds[3]) / size)))
+    y1 = min(n - 1, int(math.floor((MERCATOR_HALF - bounds[1]) / size)))
+    return [(x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)]
+
+
+def _clean_value(v):
+    if v is None or (isinstance(v, float) and math.isnan(v)) or v is pd.NA:
+        return None
+    if isinstance(v, (np.integer,)):
+        return int(v)
+    if isinstance(v, (np.floating,)):
+        return float(v)
+    if isinstance(v, (bool, int, float, str)):
+        return v
+    return str(v)
+
+
+class RegionTiles:
+    """지역(탭) 하나의 레이어를 EPSG:3857로 들고 있다가 타일 단위로 잘라 MVT로 인코딩."""
+
+    def __init__(self, tab_config, gdfs):
+        from map_render import layer_frame
+
+        self.name = tab_config["name"]
+        self.layers = {}
+        for layer_type, item in gdfs.items():
+            gdf = item["gdf"]
+            frame = layer_frame(gdf, layer_type, self.name, item["config"]["layer_name"])
+            attrs = frame[["color", "tooltip", "label"]].copy()
+            for col in KEEP_ATTRIBUTES:
+                if col in gdf.columns:
+                    attrs[col] = gdf.loc[frame.index, col]
+
+            geoms = np.asarray(frame.geometry.to_crs("EPSG:3857").values)
+            properties = [
+                {k: _clean_value(v) for k, v in row.items() if _clean_value(v) is not None}
+                for row in attrs.to_dict("records")
+            ]
+            self.layers[layer_type] = {
+                "geoms": geoms,
+                "properties": properties,
+                "tree": shapely.STRtree(geoms),
+            }
+
+    def bounds(self):
+        """전체 레이어의 EPSG:3857 경계."""
+        all_geoms = [l["geoms"] for l in self.layers.values() if len(l["geoms"])]
+        if not all_geoms:
+            return None
+        return shapely.total_bounds(np.concatenate(all_geoms))
+
+    def encode(self, layer_type, z, x, y):
+        """타일 하나를 MVT bytes로. 해당 레이어가 없거나 비어 있으면 빈 타일."""
+        import mapbox_vector_tile
+
+        layer = self.layers.get(layer_type)
+        bounds = tile_bounds(z, x, y)
+        if layer is None:
+            return mapbox_vector_tile.encode([])
+
+        pad = (bounds[2] - bounds[0]) * TILE_BUFFER / TILE_EXTENT
+        clip_box = (bounds[0] - pad, bounds[1] - pad, bounds[2] + pad, bounds[3] + pad)
+        idx = layer["tree"].query(shapely.box(*clip_box))
+        if len(idx) == 0:
+            return mapbox_vector_tile.encode([])
+
+        idx = np.sort(idx)
+        geoms = layer["geoms"][idx]
+        if layer_type != "point":
+            # 이 줌에서 반 픽셀 이하의 정점은 버리고 타일 범위로 자른다
+            geoms = shapely.simplify(geoms, tolerance_for_zoom(z), preserve_topology=True)
+            geoms = shapely.clip_by_rect(geoms, *clip_box)
+
+        features = []
+        for i, g in zip(idx, geoms):
+            if g is None or g.is_empty:
+                continue
+            features.append({"geometry": g, "properties": layer["properties"][i]})
+
+        return mapbox_vector_tile.encode(
+            [{"name": layer_type, "features": features}],
+            default_options={"quantize_bounds": bounds, "extents": TILE_EXTENT},
+        )
+
+
+class TileService:
+    """지역별 RegionTiles와 인코딩된 타일 LRU 캐시. 데이터 버전이 바뀌면 다시 만든다."""
+
+    def __init__(self, tab_configs=TAB_CONFIGS, max_tiles=4096, max_bytes=128 * 1024 * 1024):
+        self.tab_configs = {c["name"]: c for c in tab_configs}
+        self._lock = threading.Lock()
+        self._regions = {}
+        self.cache = LRUCache(max_entries=max_tiles, max_bytes=max_bytes)
+
+    def region(self, name):
+        from map_render import load_region_layers
+
+        tab_config = self.tab_configs[name]
+        version = data_version([f["path"] for f in tab_config["files"]])
+        with self._lock:
+            entry = self._regions.get(name)
+            if entry is not None and entry[0] == version:
+                return version, entry[1]
+
+        region = RegionTiles(tab_config, load_region_layers(tab_config))
+        with self._lock:
+            self._regions[name] = (version, region)
+        return version, region
+
+    def get_tile(self, name, layer_type, z, x, y):
+        version, region = self.region(name)
+        key = (name, layer_type, version, z, x, y)
+        return self.cache.get_or_build(key, lambda: region.encode(layer_type, z, x, y))
+
+
+class _TileHandler(BaseHTTPRequestHandler):
+    service = None
+
+    def do_GET(self):
+        parts = [unquote(p) for p in self.path.split("?", 1)[0].strip("/").split("/")]
+        try:
+            name, layer_type, z, x, y = parts
+            if not y.endswith(".pbf"):
+                raise ValueError(y)
+            z, x, y = int(z), int(x), int(y[:-4])
+            if name not in self.service.tab_configs:
+                raise KeyError(name)
+        except (ValueError, KeyError):
+            self.send_error(404)
+            return
+
+        body = self.service.get_tile(name, layer_type, z, x, y)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-protobuf")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Cache-Control", "public, max-age=300")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_service = None
+_server = None
+_server_lock = threading.Lock()
+
+
+def get_tile_service():
+    global _service
+    with _server_lock:
+        if _service is None:
+            _service = TileService()
+        return _service
+
+
+def ensure_tile_server(host="127.0.0.1", port=8765):
+    """
+    프로세스당 한 번 백그라운드 스레드로 타일 서버를 띄운다.
+    포트가 이미 사용 중이면(다른 워커가 띄운 경우) 그 서버를 쓰는 것으로 본다.
+    """
+    global _server
+    service = get_tile_service()
+    with _server_lock:
+        if _server is not None:
+            return _server
+        handler = type("TileHandler", (_TileHandler,), {"service": service})
+        try:
+            _server = ThreadingHTTPServer((host, port), handler)
+        except OSError:
+            return None
+        threading.Thread(target=_server.serve_forever, name="tile-server", daemon=True).start()
+        return _server
+
+
+def tile_url_template(base_url, region_name, layer_type):
+    """Leaflet용 타일 URL 템플릿."""
+    return f"{base_url.rstrip('/')}/{quote(region_name)}/{layer_type}/{{z}}/{{x}}/{{y}}.pbf"
+
+
+def build_static_tiles(out_dir, min_zoom=DEFAULT_MIN_ZOOM, max_zoom=DEFAULT_MAX_ZOOM):
+    """모든 지역/레이어의 타일을 out_dir/{지역}/{레이어}/{z}/{x}/{y}.pbf 로 미리 생성."""
+    service = TileService()
+    count = 0
+    for name in service.tab_configs:
+        _, region = service.region(name)
+        bounds = region.bounds()
+        if bounds is None:
+            continue
+        for layer_type in region.layers:
+            for z in range(min_zoom, max_zoom + 1):
+                for x, y in tiles_covering(bounds, z):
+                    path = os.path.join(out_dir, name, layer_type, str(z), str(x), f"{y}.pbf")
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    with open(path, "wb") as f:
+                        f.write(region.encode(layer_type, z, x, y))
+                    count += 1
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="조사 경로 레이어 벡터 타일 서버/생성기")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_serve = sub.add_parser("serve", help="타일 서버 실행")
+    p_serve.add_argument("--host", default="127.0.0.1")
+    p_serve.add_argument("--port", type=int, default=8765)
+
+    p_build = sub.add_parser("build", help="정적 타일 피라미드 생성")
+    p_build.add_argument("--out", default="tiles")
+    p_build.add_argument("--min-zoom", type=int, default=DEFAULT_MIN_ZOOM)
+    p_build.add_argument("--max-zoom", type=int, default=DEFAULT_MAX_ZOOM)
+
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        handler = type("TileHandler", (_TileHandler,), {"service": get_tile_service()})
+        print(f"타일 서버: http://{args.host}:{args.port}/")
+        ThreadingHTTPServer((args.host, args.port), handler).serve_forever()
+    else:
+        n = build_static_tiles(args.out, args.min_zoom, args.max_zoom)
+        print(f"{n}개 타일 생성 -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
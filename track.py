@@ -0,0 +1,172 @@
+"""
+GPS 이동 경로 기록.
+
+세션마다 TrackRecorder 하나를 두고 위치를 받을 때마다 (위도, 경도, 오차, 시각)을 붙인다.
+- 저장: 크기가 고정된 numpy 배열. 다 차면 한 점 건너 하나씩 남겨(첫/마지막 점 유지)
+  절반으로 줄이므로 하루 종일 기록해도 세션당 메모리가 capacity를 넘지 않는다.
+  (여러 번 줄어든 오래된 구간일수록 점이 성기고, 최근 구간은 촘촘하게 남는다)
+- 솎아내기: 직전에 남긴 점에서 오차 반경 안으로 들어온 위치는 버린다
+  (제자리에서 같은 위치가 반복 들어오는 경우도 여기서 걸러진다).
+- 지도: 경로 전체를 polyline 하나로 그린다. 지도 HTML은 경로 없이 캐시해 두고
+  좌표 배열만 자리표시자에 끼워 넣으므로, 경로가 바뀌어도 지도를 다시 만들지 않는다.
+- 내보내기: GPX / GeoJSON 문자열을 배열을 한 번 훑어 만든다.
+"""
+import json
+import math
+import time
+from datetime import datetime, timezone
+from xml.sax.saxutils import escape
+
+import numpy as np
+from branca.element import MacroElement
+from folium.template import Template
+
+DEFAULT_CAPACITY = 5000
+# 오차 정보가 없거나 아주 작을 때 쓰는 최소 솎아내기 반경(m)
+MIN_THIN_RADIUS_M = 3.0
+EARTH_RADIUS_M = 6371008.8
+
+TRACK_PLACEHOLDER = "/*__TRACK_COORDS__*/[]"
+TRACK_STYLE = {"color": "#e6194b", "weight": 4, "opacity": 0.8}
+
+
+def distance_m(lat1, lon1, lat2, lon2):
+    """두 WGS84 좌표 사이의 거리(m, 구면 근사)."""
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+class TrackRecorder:
+    """세션 하나의 이동 경로. (capacity, 4) 고정 크기 배열에 위도, 경도, 오차, 시각을 담는다."""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        if capacity < 4:
+            raise ValueError("capacity는 4 이상이어야 합니다")
+        self.capacity = capacity
+        self._data = np.empty((capacity, 4), dtype=np.float64)
+        self._n = 0
+        # 점이 바뀔 때마다 올라가는 번호
+        self.version = 0
+
+    def __len__(self):
+        return self._n
+
+    @property
+    def points(self):
+        """기록된 점 (n, 4) 배열 보기: lat, lon, accuracy, timestamp."""
+        return self._data[: self._n]
+
+    def add(self, lat, lon, accuracy=None, timestamp=None):
+        """위치 하나를 추가. 직전 점의 오차 반경 안이면 버린다. 추가했으면 True."""
+        if lat is None or lon is None:
+            return False
+        accuracy = float(accuracy) if accuracy is not None else 0.0
+        timestamp = time.time() if timestamp is None else float(timestamp)
+
+        if self._n:
+            last_lat, last_lon, last_acc, _ = self._data[self._n - 1]
+            radius = max(accuracy, last_acc, MIN_THIN_RADIUS_M)
+            if distance_m(last_lat, last_lon, lat, lon) <= radius:
+                return False
+
+        if self._n == self.capacity:
+            self._compact()
+        self._data[self._n] = (lat, lon, accuracy, timestamp)
+        self._n += 1
+        self.version += 1
+        return True
+
+    def add_location(self, location):
+        """streamlit_geolocation 결과 dict를 추가."""
+        if not location:
+            return False
+        return self.add(location.get("latitude"), location.get("longitude"), location.get("accuracy"))
+
+    def _compact(self):
+        # 짝수 번째 점 + 마지막 점만 남긴다 (경로의 시작과 끝은 그대로)
+        keep = np.arange(0, self._n, 2)
+        if keep[-1] != self._n - 1:
+            keep = np.append(keep, self._n - 1)
+        kept = self._data[keep]
+        self._n = len(kept)
+        self._data[: self._n] = kept
+
+    def clear(self):
+        self._n = 0
+        self.version += 1
+
+    def latlngs(self):
+        """Leaflet polyline용 [[lat, lon], ...] (소수점 6자리, 약 0.1m)."""
+        return np.round(self.points[:, :2], 6).tolist()
+
+    def to_geojson(self):
+        """경로 전체를 LineString Feature 하나로 (점이 1개면 Point)."""
+        pts = self.points
+        coords = np.round(pts[:, [1, 0]], 7).tolist()
+        if len(coords) == 1:
+            geometry = {"type": "Point", "coordinates": coords[0]}
+        else:
+            geometry = {"type": "LineString", "coordinates": coords}
+        feature = {
+            "type": "Feature",
+            "geometry": geometry,
+            "properties": {
+                "times": [_iso(t) for t in pts[:, 3]],
+                "accuracy_m": np.round(pts[:, 2], 1).tolist(),
+            },
+        }
+        return json.dumps({"type": "FeatureCollection", "features": [feature]}, ensure_ascii=False)
+
+    def to_gpx(self, name="조사 경로"):
+        """GPX 1.1 트랙 (trkseg 하나). 오차는 GPX 표준 필드가 없어 GeoJSON에만 넣는다."""
+        parts = [
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<gpx version="1.1" creator="UBCK" xmlns="http://www.topografix.com/GPX/1/1">\n'
+            f"<trk><name>{escape(name)}</name><trkseg>\n"
+        ]
+        parts.extend(
+            f'<trkpt lat="{lat:.7f}" lon="{lon:.7f}"><time>{_iso(t)}</time></trkpt>\n'
+            for lat, lon, _, t in self.points
+        )
+        parts.append("</trkseg></trk>\n</gpx>\n")
+        return "".join(parts)
+
+
+def _iso(timestamp):
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class TrackLine(MacroElement):
+    """
+    기록된 경로를 그리는 polyline 하나.
+    좌표는 TRACK_PLACEHOLDER 자리에 들어가므로, 캐시된 지도 HTML에 inject_track으로 끼워 넣는다.
+    """
+
+    _template = Template(
+        """
+        {% macro script(this, kwargs) %}
+        var {{ this.get_name() }} = (function(map) {
+            var coords = {{ this.placeholder }};
+            var line = L.polyline(coords, {{ this.style_json }});
+            if (coords.length) { line.addTo(map); }
+            return line;
+        })({{ this._parent.get_name() }});
+        {% endmacro %}
+        """
+    )
+
+    def __init__(self, style=None):
+        super().__init__()
+        self._name = "TrackLine"
+        self.placeholder = TRACK_PLACEHOLDER
+        self.style_json = json.dumps(style or TRACK_STYLE)
+
+
+def inject_track(html, recorder):
+    """캐시된 지도 HTML의 경로 자리표시자에 recorder의 좌표를 넣는다."""
+    if recorder is None or not len(recorder):
+        return html
+    return html.replace(TRACK_PLACEHOLDER, json.dumps(recorder.latlngs()), 1)
@@ -1,878 +1,557 @@
 import streamlit as st
-from groq import Groq
-import folium
-from streamlit_folium import st_folium
-import geopandas as gpd
-import random
-from collections import Counter, defaultdict
-from streamlit_geolocation import streamlit_geolocation
-from folium import Icon, Marker
-import time
-import pandas as pd
-import io
-import re
-
-# MODEL_NAME = "openai/gpt-oss-120b" 
+import streamlit.components.v1 as components
+import sys
+import uuid
+from functools import partial
+from map_cache import get_map_cache, location_bucket
+from perf_trace import DEFAULT_TRACE_PATH, begin_run, configure_log, end_run, stage
+
+# 무거운 라이브러리(geopandas/folium/shapely, pandas/numpy, openpyxl)는 맨 위에서 읽지 않는다.
+# 새 작업자 프로세스의 첫 화면(페이지 틀과 탭)이 먼저 나가고, 각 탭이 처음 열릴 때 필요한 것만 읽는다.
+# (python import_budget.py로 탭별 첫 실행 시간과 읽힌 모듈을 확인한다)
 
 st.set_page_config(layout="wide", page_title="UBCK")
 
-# api_key = st.secrets["GROQ_API_KEY"]
-# client = Groq(api_key=api_key)
+# 단계별 시간 측정 (perf_trace.py). secrets에 PERF_TRACE = true면 모든 재실행을 JSONL로 남기고,
+# 주소 뒤에 ?debug=1을 붙이면 그 세션만 재서 맨 아래 디버그 패널에 보여준다
+PERF_TRACE = bool(st.secrets.get("PERF_TRACE", False))
+debug_panel = st.query_params.get("debug") == "1"
+perf_run = None
+if PERF_TRACE:
+    configure_log(st.secrets.get("PERF_TRACE_PATH", DEFAULT_TRACE_PATH))
+if PERF_TRACE or debug_panel:
+    previous_run = st.session_state.get("perf_run")
+    perf_run = begin_run("web", previous=previous_run, session=st.session_state.setdefault("perf_session", uuid.uuid4().hex[:8]))
+    st.session_state["perf_run"] = perf_run
+    if previous_run is not None:
+        # 지난 재실행 요약 (st.rerun으로 끊긴 실행은 interrupted)
+        st.session_state["perf_history"] = (st.session_state.get("perf_history", []) + [previous_run.summary()])[-20:]
 
 # ===== 탭 생성 =====
-tab2, tab3 = st.tabs(["🗺️ 조사 경로 지도", "👥 조 편성"])
-
-# # ===== 탭 1: 기존 AI 변환기 =====
-# with tab1:
-#     col1, col2 = st.columns(2)
-
-#     with col1:
-#         st.subheader("📋 야장정리기 결과를 그대로 복사/붙여넣기하세요.")
-#         user_input = st.text_area("엑셀에서 복사/붙여넣기한 텍스트", height=400)
-#         run_button = st.button("변환 실행 ▶", use_container_width=True)
-
-#     with col2:
-#         st.subheader("✨ 관찰종 및 개체수")
-#         result_container = st.empty()
-        
-#         if run_button and user_input:
-#             try:
-#                 with st.spinner("AI가 변환 중입니다..."):
-#                     chat_completion = client.chat.completions.create(
-#                         messages=[
-#                             # 1. 시스템 프롬프트: AI의 역할과 규칙 정의 (여기를 튜닝하세요)
-#                             {
-#                                 "role": "system",
-#                                 "content": """
-#                                 당신은 “조류상 조사 결과 포맷터”이다.
-
-#                                 입력은 엑셀에서 복사-붙여넣기한 텍스트이며, 각 행은 2열로 구성된다:
-#                                 - 1열: 조류 국명(한글)
-#                                 - 2열: 관찰 수(숫자 형태의 문자열)
-#                                 열 구분은 탭(Tab)일 수 있고, 행 구분은 줄바꿈이다.
-
-#                                 작업:
-#                                 - 입력의 각 행을 위에서 아래 순서대로 처리한다.
-#                                 - 각 행을 다음 형식의 조각으로 변환한다: {국명} <{관찰수}>
-#                                 - 모든 조각을 ", " (콤마+공백)으로 연결하여 한 줄의 텍스트로 출력한다.
-
-#                                 절대 규칙(매우 중요):
-#                                 - 출력은 오직 최종 결과 한 줄만 출력한다.
-#                                 - 설명, 인사, 머리말/꼬리말, 코드블록, 따옴표, 불릿, 추가 문장, 줄바꿈을 절대 포함하지 않는다.
-#                                 - 입력값의 진위/타당성 검증(국명 확인, 개체 수 검증 등)을 하지 않는다. 입력에 있는 문자열을 그대로 사용한다.
-#                                 - 순서를 절대 바꾸지 않는다.
-#                                 - 괄호/기호는 다음만 사용한다: 각 항목의 수를 감싸는 "<"와 ">".
-#                                 """
-#                             },
-                            
-#                             # 2. 사용자 입력
-#                             {
-#                                 "role": "user", 
-#                                 "content": user_input
-#                             }
-#                         ],
-#                         model=MODEL_NAME,
-#                         temperature=0.1 
-#                     )
-#                     result_text = chat_completion.choices[0].message.content
-#                     result_container.text_area("결과물", value=result_text, height=400)
-#                     st.success("완료!")
-#             except Exception as e:
-#                 st.error(f"오류 발생: {e}")
+# 열려 있는 탭만 실행한다 (탭을 바꾸면 다시 실행). ?tab=teams로 조 편성 탭부터 열 수 있다
+MAIN_TABS = {"map": "🗺️ 조사 경로 지도", "teams": "👥 조 편성", "field": "📋 야장 변환"}
+tab2, tab3, tab1 = st.tabs(
+    list(MAIN_TABS.values()), key="main_tab", on_change="rerun", default=MAIN_TABS.get(st.query_params.get("tab")),
+)
+
+def keep_widget_state(session_state, keys):
+    """닫힌 탭의 위젯은 그려지지 않아 Streamlit이 그 값을 지운다. 다시 써 두면 탭을 다시 열 때까지 남는다."""
+    for key in keys:
+        if key in session_state:
+            session_state[key] = session_state[key]
+
+# ===== 탭 1: 야장 변환기 =====
+# "국명<TAB>관찰수" 행은 field_sheet에서 바로 바꾸고, 형식이 맞지 않는 행만 Groq에 보낸다 (같은 내용은 캐시)
+FIELD_WIDGET_KEYS = ("field_input",)
+
+if not tab1.open:
+    keep_widget_state(st.session_state, FIELD_WIDGET_KEYS)
+else:
+    with tab1:
+        from field_sheet import convert, groq_completer
+
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.subheader("📋 야장정리기 결과를 그대로 복사/붙여넣기하세요.")
+            user_input = st.text_area("엑셀에서 복사/붙여넣기한 텍스트", height=400, key="field_input")
+            run_button = st.button("변환 실행 ▶", use_container_width=True)
+
+        with col2:
+            st.subheader("✨ 관찰종 및 개체수")
+            if run_button and user_input:
+                api_key = st.secrets.get("GROQ_API_KEY")
+                complete = groq_completer(api_key) if api_key else None
+                with stage("field_convert") as span:
+                    with st.spinner("변환 중입니다..."):
+                        result = convert(user_input, complete)
+                    span.set(local_rows=result.local_rows, llm_rows=result.llm_rows, llm_calls=result.llm_calls,
+                             cache_hits=result.cache_hits, unresolved=len(result.unresolved))
+                st.session_state["field_result"] = result
+
+            result = st.session_state.get("field_result")
+            if result is not None:
+                st.text_area("결과물", value=result.text, height=400)
+                if result.llm_rows:
+                    st.success(f"완료! ({result.local_rows}행은 바로 변환, {result.llm_rows}행은 AI 변환)")
+                else:
+                    st.success(f"완료! ({result.local_rows}행)")
+                for error in result.errors:
+                    st.error(f"오류 발생: {error}")
+                if result.unresolved:
+                    reason = "AI 변환에 실패해" if result.errors else "GROQ_API_KEY가 없어"
+                    st.warning(f"형식이 맞지 않는 {len(result.unresolved)}행은 {reason} 결과에서 뺐습니다:  \n"
+                               + "  \n".join(line.replace("\t", " ") for line in result.unresolved))
 
 # ===== 탭 2: 지도 시각화 =====
-with tab2:
-    st.subheader("🗺️ 조사 경로")
-
-    # GPS 위치 가져오기
-    col_gps1, col_gps2 = st.columns([1, 4])
-    with col_gps1:
-        gps_button = st.button("📍 내 위치", use_container_width=True)
-
-    # geolocation 호출
-    loc_data = streamlit_geolocation()
-
-    # location 정보를 세션 스테이트에 저장/업데이트
-    if loc_data and loc_data.get("latitude"):
-        st.session_state["my_location"] = loc_data
-
-    # 세션에서 위치 정보 가져오기 (없으면 None)
-    current_location = st.session_state.get("my_location", None)
+MAP_WIDGET_KEYS = ("live_tracking", "live_min_interval", "live_min_move", "record_track")
+
+if not tab2.open:
+    keep_widget_state(st.session_state, MAP_WIDGET_KEYS + tuple(k for k in st.session_state if k.startswith("polygon_toggle_")))
+else:
+    with tab2:
+        # GIS 라이브러리는 지도 탭을 처음 열 때 읽는다 (그다음부터는 sys.modules에 있어 바로 끝남)
+        with stage("import_map_modules"):
+            from streamlit_geolocation import streamlit_geolocation
+            from layer_store import data_version, get_layer_store
+            from sectors import TAB_CONFIGS
+            from map_render import region_map_html, vworld_tile_url
+            from live_location import DEFAULT_MIN_INTERVAL_MS, DEFAULT_MIN_MOVE_M
+            from spatial_index import locate
+            from track import TrackRecorder, inject_track
+            from tiles import ensure_tile_server
+
+        st.subheader("🗺️ 조사 경로")
+
+        # GPS 위치 가져오기
+        col_gps1, col_gps2 = st.columns([1, 4])
+        with col_gps1:
+            gps_button = st.button("📍 내 위치", use_container_width=True)
+        with col_gps2:
+            # 실시간 추적: 지도 페이지 안에서 브라우저가 직접 마커를 옮긴다 (스크립트 재실행 없음)
+            live_tracking_on = st.toggle("실시간 위치 추적", value=False, key="live_tracking")
+
+        live_tracking = None
+        if live_tracking_on:
+            col_live1, col_live2 = st.columns(2)
+            with col_live1:
+                min_interval_s = st.number_input(
+                    "최소 갱신 간격(초)", min_value=0.5, max_value=60.0, step=0.5,
+                    value=float(st.secrets.get("LIVE_MIN_INTERVAL_MS", DEFAULT_MIN_INTERVAL_MS)) / 1000,
+                    key="live_min_interval",
+                )
+            with col_live2:
+                min_move_m = st.number_input(
+                    "최소 이동 거리(m)", min_value=0.0, max_value=500.0, step=1.0,
+                    value=float(st.secrets.get("LIVE_MIN_MOVE_M", DEFAULT_MIN_MOVE_M)),
+                    key="live_min_move",
+                )
+            live_tracking = {"min_interval_ms": int(min_interval_s * 1000), "min_move_m": min_move_m}
+
+        # geolocation 호출
+        loc_data = streamlit_geolocation()
+
+        # location 정보를 세션 스테이트에 저장/업데이트
+        if loc_data and loc_data.get("latitude"):
+            st.session_state["my_location"] = loc_data
+
+        # 세션에서 위치 정보 가져오기 (없으면 None)
+        current_location = st.session_state.get("my_location", None)
+
+        # 이동 경로 기록 (세션마다 고정 크기 버퍼 하나)
+        col_track1, col_track2, col_track3, col_track4 = st.columns([2, 1, 1, 1])
+        with col_track1:
+            record_track = st.toggle("이동 경로 기록", value=False, key="record_track")
+        if "track_recorder" not in st.session_state:
+            st.session_state["track_recorder"] = TrackRecorder()
+        track_recorder = st.session_state["track_recorder"]
+        if record_track and loc_data and loc_data.get("latitude"):
+            track_recorder.add_location(loc_data)
+        with col_track2:
+            st.download_button(
+                "GPX", data=track_recorder.to_gpx, file_name="track.gpx",
+                mime="application/gpx+xml", disabled=not len(track_recorder), key="track_gpx",
+            )
+        with col_track3:
+            st.download_button(
+                "GeoJSON", data=track_recorder.to_geojson, file_name="track.geojson",
+                mime="application/geo+json", disabled=not len(track_recorder), key="track_geojson",
+            )
+        with col_track4:
+            if st.button("경로 지우기", disabled=not len(track_recorder), key="track_clear"):
+                track_recorder.clear()
 
-    # 2개 메인 탭 생성 (하천/하구)
-    subtabs = st.tabs(["하천", "하구"])
+        # 2개 메인 탭 생성 (하천/하구)
+        subtabs = st.tabs(["하천", "하구"])
     
-    # 각 탭별 Shapefile 설정
-    tab_configs = [
-    {
-        "name": "하천",
-        "files": [
-            {"path": "data/HacheonLine.shp", "type": "line", "layer_name": "하천 라인", "sector_col": "sector"},
-            {"path": "data/HacheonPolygon.shp", "type": "polygon", "layer_name": "하천 폴리곤", "sector_col": "sector"},
-            {"path": "data/HacheonPoint.shp", "type": "point", "layer_name": "하천 포인트", "sector_col": "sector"}
-        ]
-    },
-    {
-        "name": "하구",
-        "files": [
-            {"path": "data/HaguLine.shp", "type": "line", "layer_name": "하구 라인", "sector_col": "sector"},
-            {"path": "data/HaguPolygon.shp", "type": "polygon", "layer_name": "하구 폴리곤", "sector_col": "code"},
-            {"path": "data/HaguPoint.shp", "type": "point", "layer_name": "하구 포인트", "sector_col": "sector"}
-        ]
-    }
-]
-
-    # 구역별 색상 할당
-    def get_color_for_sector(sector_value, all_sectors):
-        colors = ['red', 'blue', 'green', 'purple', 'orange','darkblue', 'darkgreen', '#301934', 'pink']
-        try:
-            idx = list(all_sectors).index(sector_value)
-            return colors[idx % len(colors)]
-        except:
-            return 'blue'
-        
-    def normalize_sector_value(tab_name: str, sector_value: str):
-        """색상/표시 통일을 위한 sector 정규화."""
-        if sector_value is None:
-            return None
-        s = str(sector_value).strip()
-
-        # 하천 라인의 하천6-1, 하천6-2를 하천6으로 통일
-        if tab_name == "하천" and s.startswith("하천6-"):
-            return "하천6"
-
-        return s
-
-    def build_sector_color_map(tab_name: str, gdfs: dict):
-        """
-        탭(하천/하구) 단위로 sector->color 매핑을 1회 생성.
-        - 하구 polygon은 색 고정이므로, 매핑에는 굳이 포함하지 않아도 됨(포함해도 무방).
-        """
-        seen = set()
-        ordered = []
-
-        # line -> polygon -> point 순서로 “처음 등장한 sector”를 수집
-        for lt in ["line", "polygon", "point"]:
-            if lt not in gdfs:
-                continue
-            gdf = gdfs[lt]["gdf"]
-
-            if "sector" not in gdf.columns:
-                continue
-
-            for v in gdf["sector"].tolist():
-                key = normalize_sector_value(tab_name, v)
-                if key is None:
-                    continue
-                if key not in seen:
-                    seen.add(key)
-                    ordered.append(key)
-
-        # colors는 기존 그대로 사용
-        sector_color_map = {}
-        for i, key in enumerate(ordered):
-            sector_color_map[key] = get_color_for_sector(key, ordered)  # 기존 함수 그대로 사용
-
-        return sector_color_map
+        # 각 탭별 Shapefile 설정 (sectors.py)
+        tab_configs = TAB_CONFIGS
+
+        # 벡터 타일 모드(선택): secrets에 VECTOR_TILE_URL(브라우저가 접근할 주소)이 있으면
+        # 이 프로세스에서 타일 서버를 띄우고, 도형은 페이지에 넣지 않고 타일로 받아 온다
+        vector_tile_url = st.secrets.get("VECTOR_TILE_URL")
+        if vector_tile_url:
+            ensure_tile_server(
+                host=st.secrets.get("VECTOR_TILE_HOST", "127.0.0.1"),
+                port=int(st.secrets.get("VECTOR_TILE_PORT", 8765)),
+            )
     
-    def make_label_html(text, color, font_size_pt=12, bold=True):
-        fw = "700" if bold else "500"
-        return f"""
-        <div style="
-            white-space: nowrap;
-            display: inline-block;
-            writing-mode: horizontal-tb;
-            font-size: {font_size_pt}pt;
-            font-weight: {fw};
-            color: {color};
-            background: rgba(255,255,255,0.75);
-            padding: 2px 6px;
-            border: 1px solid rgba(0,0,0,0.25);
-            border-radius: 6px;
-            text-shadow: -1px -1px 0 white, 1px -1px 0 white,
-                        -1px  1px 0 white, 1px  1px 0 white;
-        ">{text}</div>
-        """
-
-    def add_point_geometry_to_map(geom, m, color, popup_text=None, tooltip_text=None, label_text=None):
-        if geom is None:
-            return
-
-        def _add_one_point(pt):
-            folium.CircleMarker(
-                location=[pt.y, pt.x],
-                radius=7,
-                color=color,
-                weight=3,
-                fill=True,
-                fill_color=color,
-                fill_opacity=0.9,
-                popup=popup_text,
-                tooltip=tooltip_text,
-            ).add_to(m)
-
-            # 지도 위 텍스트 라벨(시작/종료 + location) [web:165]
-            if label_text:
-                folium.Marker(
-                    location=[pt.y, pt.x],
-                    icon=folium.DivIcon(
-                        html=make_label_html(label_text, color, font_size_pt=9, bold=False),
-                        icon_size=(320, 18),
-                        icon_anchor=(0, 0)
+        # 각 메인 탭 처리
+        for tab_idx, (subtab, tab_config) in enumerate(zip(subtabs, tab_configs)):
+            with subtab:
+                # 폴리곤 on/off 토글
+                show_polygon = st.checkbox(f"{tab_config['name']} 폴리곤 표시", value=True, key=f"polygon_toggle_{tab_idx}")
+            
+                try:
+                    # 지도 캐시 키: 지역, 폴리곤 표시 여부, 데이터 버전, GPS 위치 버킷
+                    # 실시간 추적 중에는 위치가 지도 HTML에 들어가지 않으므로 버킷도 키에서 뺀다.
+                    # 위치 마커가 든 지도는 그 사람의 정확한 좌표를 담으므로 세션끼리 나눠 쓰지 않는다
+                    loc_bucket = None if live_tracking else location_bucket(current_location)
+                    focus = loc_bucket if gps_button else None
+                    map_key = (
+                        tab_config["name"],
+                        show_polygon,
+                        data_version([f["path"] for f in tab_config["files"]]),
+                        loc_bucket,
+                        st.session_state.setdefault("map_session", uuid.uuid4().hex) if loc_bucket else None,
+                        focus is not None,
+                        vector_tile_url,
+                        tuple(sorted(live_tracking.items())) if live_tracking else None,
+                        record_track,
                     )
-                ).add_to(m)
-
-        gtype = getattr(geom, "geom_type", "")
 
-        if gtype == "Point":
-            _add_one_point(geom)
+                    # 브이월드 배경지도
+                    tile_url = vworld_tile_url(st.secrets["VWORLD_API_KEY"])
+
+                    def build_map_html():
+                        return region_map_html(
+                            tab_config,
+                            show_polygon,
+                            tile_url=tile_url,
+                            focus=focus,
+                            current_location=current_location,
+                            vector_tile_base_url=vector_tile_url,
+                            live_tracking=live_tracking,
+                            track=record_track,
+                        )
+
+                    # 키가 같으면 지도를 다시 만들지 않고 캐시된 HTML을 그대로 사용
+                    # 경로 좌표는 캐시 밖에서 끼워 넣는다 (경로가 바뀌어도 지도는 그대로 재사용)
+                    with stage("map", region=tab_config["name"]) as span:
+                        map_html = get_map_cache().get_or_build(map_key, build_map_html)
+                        if record_track:
+                            map_html = inject_track(map_html, track_recorder)
+                        if span:
+                            span.set(html_bytes=len(map_html.encode("utf-8")))
+                    with stage("components_html", region=tab_config["name"]):
+                        components.html(map_html, height=420)
+                
+                    # GPS 정보 텍스트 표시
+                    if live_tracking:
+                        st.info("📍 실시간 추적 중: 지도 위 마커가 브라우저에서 바로 갱신됩니다.")
+                    elif current_location and current_location.get("latitude"):
+                        st.success(f"📍 현재 위치: 위도 {current_location['latitude']:.6f}, 경도 {current_location['longitude']:.6f}")
+                    else:
+                        st.warning("위치 정보를 가져오는 중이거나 권한이 필요합니다.")
+
+                    # 현재 위치 기준 구역/가장 가까운 라인/시작·종료 지점 (spatial_index.py)
+                    nearby = locate(tab_config["name"], current_location)
+                    if nearby:
+                        inside = nearby["polygon"]["sector"] if nearby["polygon"] else "없음"
+                        lines = [f"- 포함 폴리곤: {inside}"]
+                        if nearby["line"]:
+                            line = nearby["line"]
+                            lines.append(f"- 가장 가까운 라인: {line.get('label') or line['sector']} ({line['distance_m']:,.0f}m)")
+                        if nearby["point"]:
+                            point = nearby["point"]
+                            lines.append(f"- 가장 가까운 {point['startend']} 지점: {point.get('location') or point['sector']} ({point['distance_m']:,.0f}m)")
+                        st.markdown("\n".join(lines))
+            
+                except Exception as e:
+                    st.error(f"{tab_config['name']} 지도 로딩 실패: {e}")
 
-        elif gtype == "MultiPoint":
-            for p in geom.geoms:
-                _add_one_point(p)
+        with st.expander("레이어 캐시 상태", expanded=False):
+            st.json({"layers": get_layer_store().stats(), "maps": get_map_cache().stats()})
 
-        else:
-            folium.GeoJson(geom).add_to(m)
 
+# ===== 탭 3: 조 편성 =====
+# 조 편성 엔진(pandas/numpy, team_*)은 조 편성 탭을 열 때 읽는다 (xlsx를 만드는 openpyxl은 내려받을 때 읽는다).
+# 날짜 입력/요약/저장소 연결은 team_input, team_history, team_schedule, team_store에 있다 (team_input은 pandas 없이 읽힌다)
 
-    # 각 메인 탭 처리
-    for tab_idx, (subtab, tab_config) in enumerate(zip(subtabs, tab_configs)):
-        with subtab:
-            # 폴리곤 on/off 토글
-            show_polygon = st.checkbox(f"{tab_config['name']} 폴리곤 표시", value=True, key=f"polygon_toggle_{tab_idx}")
-            
-            try:
-                # 모든 파일 로드
-                gdfs = {}
-                all_bounds = []
-                
-                for file_config in tab_config["files"]:
-                    gdf = gpd.read_file(file_config["path"])
-                    if gdf.crs != "EPSG:4326":
-                        gdf = gdf.to_crs(epsg=4326)
-                    gdfs[file_config["type"]] = {"gdf": gdf, "config": file_config}
-                    all_bounds.append(gdf.total_bounds)
-                
-                sector_color_map = build_sector_color_map(tab_config["name"], gdfs)
-
-                # 전체 영역의 중심점 계산
-                if all_bounds:
-                    min_x = min(b[0] for b in all_bounds)
-                    min_y = min(b[1] for b in all_bounds)
-                    max_x = max(b[2] for b in all_bounds)
-                    max_y = max(b[3] for b in all_bounds)
-                    default_center_lat = (min_y + max_y) / 2
-                    default_center_lon = (min_x + max_x) / 2
+# 메인 UI
+TEAM_WIDGET_KEYS = ("num_days", "survey_name", "schedule_time_limit", "batch_k", "batch_time_limit", "day_tab")
+
+if not tab3.open:
+    from team_input import DEFAULT_NUM_DAYS, keep_day_inputs
+
+    keep_widget_state(st.session_state, TEAM_WIDGET_KEYS)
+    keep_day_inputs(st.session_state, int(st.session_state.get("num_days", DEFAULT_NUM_DAYS)))
+else:
+    with tab3:
+        with stage("import_team_modules"):
+            import pandas as pd
+            from team_solver import DEFAULT_TIME_BUDGET, InfeasibleError, solve_teams
+            from team_parallel import default_workers, solve_teams_parallel
+            from team_history import day_summaries, format_teams_for_editor, get_history_stats, store_day_summary
+            from team_input import DEFAULT_NUM_DAYS, MAX_DAYS, init_day_inputs, keep_day_inputs, parse_names_auto, parse_pairs_auto
+            from team_batch import COL_COHORT, COL_K, SUMMARY_HEADER, batch_workbook, iter_batch, read_batch, summary_row
+            from team_export import XLSX_MIME, day_workbook, schedule_workbook
+            from team_schedule import DEFAULT_SCHEDULE_TIME_BUDGET, collect_schedule_days, solve_schedule
+            from team_store import DEFAULT_SURVEY, use_team_store
+            from team_warnings import get_warnings
+
+        # 조 편성 저장소. secrets에 TEAM_DB_PATH(예: data/teams.sqlite3)를 줄 때만 쓰고,
+        # 없으면 세션 안에서만 관리한다 (같은 조사 이름을 쓰는 세션끼리 이력이 섞이지 않도록 기본은 끈다)
+        TEAM_DB_PATH = st.secrets.get("TEAM_DB_PATH", "")
+
+        st.subheader("👥 조 편성")
+        st.info("각 날짜 탭을 순서대로 진행하세요. 이전 날짜의 편성 결과가 다음 날짜의 알고리즘에 반영되어 중복을 최소화합니다.  \n조사자/섹장을 이미 했던 사람은 최대한 쩌리로 가며, 같은 조에 또다시 배정되는 일을 최소화합니다.  \n콤마(,), Enter, Tab 으로 사람을 구분합니다. 후보 입력 칸이나 아래 표 모두 **'엑셀에서 그대로 북사/붙여넣기'를 허용합니다.**")
+
+        col_days, col_survey = st.columns([1, 2])
+        with col_days:
+            num_days = int(st.number_input(
+                "조사 일수", min_value=1, max_value=MAX_DAYS, value=DEFAULT_NUM_DAYS, key="num_days",
+                help="날짜 탭 개수. 열려 있는 날짜 탭만 계산하고, 나머지 날짜는 아래 요약으로 보여줍니다.",
+            ))
+        store_enabled = bool(TEAM_DB_PATH)
+        if store_enabled:
+            with col_survey:
+                survey = st.text_input(
+                    "조사 이름", value=DEFAULT_SURVEY, key="survey_name",
+                    help="편성 표는 이 이름으로 저장되어 새로고침해도 남고, 같은 이름을 쓰는 다른 진행자와 함께 보입니다.",
+                ).strip() or DEFAULT_SURVEY
+            with stage("store_pull", survey=survey) as span:
+                loaded = use_team_store(st.session_state, survey, num_days, TEAM_DB_PATH)
+                span.set(loaded=len(loaded))
+            if loaded:
+                st.toast(f"저장된 편성을 불러왔습니다: {', '.join(f'{d}일차' for d in loaded)}")
+        keep_day_inputs(st.session_state, num_days)
+
+        with st.expander("🗓️ 전체 일정 한 번에 편성"):
+            st.caption("모든 날짜의 후보/제약을 함께 보고, 일정 전체에서 겹치는 조합·같은 조 번호·역할 반복이 가장 적도록 모든 날짜를 한 번에 편성합니다.  \n"
+                       "표에서 직접 고친 칸은 그 조/역할 그대로 둡니다. 후보를 비워 둔 날짜는 지금 표를 이력으로만 씁니다.")
+            sc1, sc2 = st.columns([1, 3])
+            with sc1:
+                schedule_time = st.number_input(
+                    "탐색 시간(초)", min_value=1.0, max_value=600.0, value=float(DEFAULT_SCHEDULE_TIME_BUDGET), step=1.0,
+                    key="schedule_time_limit",
+                )
+            with sc2:
+                st.write("")
+                run_schedule = st.button("🚀 전체 일정 편성 실행", key="btn_schedule", use_container_width=True)
+            if run_schedule:
+                collect_error = None
+                try:
+                    schedule_days, frozen = collect_schedule_days(st.session_state, num_days)
+                except InfeasibleError as e:
+                    schedule_days, frozen, collect_error = {}, [], str(e)
+                if collect_error:
+                    st.error(collect_error)
+                elif not schedule_days:
+                    st.error("후보를 입력한 날짜가 없습니다.")
                 else:
-                    default_center_lat, default_center_lon = 37.5, 127.0
-                
-                # GPS 위치 설정
-                if gps_button and current_location and current_location.get("latitude"):
-                    center_lat = current_location["latitude"]
-                    center_lon = current_location["longitude"]
-                    zoom = 16
-                elif current_location and current_location.get("latitude"):
-                     center_lat = default_center_lat
-                     center_lon = default_center_lon
-                     zoom = 13
+                    with st.spinner(f"전체 일정 탐색 중... (최대 {schedule_time:g}초)"):
+                        with stage("solve_schedule", days=len(schedule_days)) as span:
+                            plans, total, err = solve_schedule(schedule_days, frozen, time_budget=float(schedule_time))
+                            span.set(penalty=total, error=err)
+                    if err:
+                        st.error(err)
+                    else:
+                        for d, (teams_struct, cam_set) in plans.items():
+                            df_res = format_teams_for_editor(teams_struct, cam_set)
+                            st.session_state[f"df_day_{d}"] = df_res
+                            st.session_state[f"solved_df_{d}"] = df_res.copy()
+                            # 편집기에 남은 이전 표 기준의 수정 내역이 새 표에 다시 적용되지 않도록
+                            st.session_state.pop(f"editor_{d}", None)
+                        st.session_state["schedule_result"] = (sorted(plans), total)
+                        st.rerun()
+            if "schedule_result" in st.session_state:
+                planned, total = st.session_state["schedule_result"]
+                st.success(f"{', '.join(f'{d}일차' for d in planned)} 편성 완료 (일정 전체 벌점 {total})")
+
+        with st.expander("📦 여러 조사지 한꺼번에 편성"):
+            st.caption(f"명단 파일 하나(xlsx/CSV)에 **{COL_COHORT}** 열을 더해 올리면 조사지마다 따로, 동시에 편성합니다.  \n"
+                       f"열: {COL_COHORT}, 이름, 조사자, 섹장, 카메라, 같은 팀, 다른 팀, {COL_K} (조사자/섹장/카메라는 1·O 표시, "
+                       f"같은 팀/다른 팀은 이름 목록). 결과는 요약 시트와 조사지마다 시트 하나인 엑셀 파일입니다.")
+            batch_file = st.file_uploader("명단 파일", type=["xlsx", "xls", "csv"], key="batch_file")
+            bc1, bc2, bc3 = st.columns([1, 1, 2])
+            with bc1:
+                batch_k = st.number_input(f"기본 {COL_K}", min_value=1, value=4, key="batch_k",
+                                          help=f"'{COL_K}' 열이 비어 있는 조사지에 씁니다.")
+            with bc2:
+                batch_time = st.number_input("조사지마다 탐색 시간(초)", min_value=0.5, max_value=60.0,
+                                             value=float(DEFAULT_TIME_BUDGET), step=0.5, key="batch_time_limit")
+            with bc3:
+                st.write("")
+                run_batch = st.button("🚀 조사지별 편성 실행", key="btn_batch", use_container_width=True,
+                                      disabled=batch_file is None)
+            if run_batch:
+                try:
+                    specs = read_batch(batch_file, int(batch_k))
+                except ValueError as e:
+                    st.error(str(e))
                 else:
-                    center_lat = default_center_lat
-                    center_lon = default_center_lon
-                    zoom = 13
-                
-                # Folium 지도 생성
-                m = folium.Map(
-                    location=[center_lat, center_lon],
-                    zoom_start=zoom,
-                    tiles=None
+                    progress = st.progress(0.0, text=f"조사지 {len(specs)}곳 편성 중...")
+
+                    rows = []
+
+                    def batch_progress(results):
+                        for i, result in enumerate(results, start=1):
+                            rows.append(summary_row(result))
+                            progress.progress(i / len(specs), text=f"{result.cohort} 완료 ({i}/{len(specs)})")
+                            yield result
+
+                    results = iter_batch(specs, time_budget=float(batch_time), workers=default_workers())
+                    with stage("solve_batch", cohorts=len(specs)):
+                        data = batch_workbook(batch_progress(results))
+                    progress.empty()
+                    st.session_state["batch_result"] = (data, pd.DataFrame(rows, columns=SUMMARY_HEADER), batch_file.name)
+            if "batch_result" in st.session_state:
+                data, batch_summary, source = st.session_state["batch_result"]
+                st.dataframe(batch_summary, hide_index=True, use_container_width=True)
+                st.download_button(
+                    "💾 조사지별 편성 결과 다운로드 (.xlsx)",
+                    data=data,
+                    file_name=f"조편성_{source.rsplit('.', 1)[0]}.xlsx",
+                    mime=XLSX_MIME,
+                    key="down_batch",
                 )
-                
-                # 브이월드 배경지도
-                vworld_key = st.secrets["VWORLD_API_KEY"]
-                folium.TileLayer(
-                    tiles=f'https://api.vworld.kr/req/wmts/1.0.0/{vworld_key}/Base/{{z}}/{{y}}/{{x}}.png',
-                    attr='VWorld',
-                    name='배경지도',
-                    overlay=False,
-                    control=True
-                ).add_to(m)
-                
-                # 각 레이어 추가 (라인 -> 폴리곤 -> 포인트 순서)
-                for layer_type in ["line", "polygon", "point"]:
-                    if layer_type not in gdfs:
-                        continue
-                    
-                    # 폴리곤이고 토글이 꺼져있으면 스킵
-                    if layer_type == "polygon" and not show_polygon:
-                        continue
-                    
-                    gdf = gdfs[layer_type]["gdf"]
-                    layer_config = gdfs[layer_type]["config"]
-                    
-                    # Sector 컬럼 찾기
-                    sector_col = layer_config.get("sector_col", "sector")
-
-                    # 컬럼이 실제로 존재하는지 확인(대소문자까지)
-                    if sector_col not in gdf.columns:
-                        found = None
-                        for c in gdf.columns:
-                            if c.lower() == sector_col.lower():
-                                found = c
-                                break
-                        sector_col = found  # 못 찾으면 None
-                                        
-                    # 레이어별 처리
-                    if layer_type == "line":
-                        for idx_row, row in gdf.iterrows():
-                            # 색상 키(정규화 sector)
-                            raw_sector = row[sector_col] if sector_col else None
-                            sector_key = normalize_sector_value(tab_config["name"], raw_sector)
-                            color = sector_color_map.get(sector_key, "blue")
-
-                            # 표시용 이름(하구 라인은 name, 하천 라인은 sector_key)
-                            if tab_config["name"] == "하구" and "name" in gdf.columns and pd.notna(row.get("name")):
-                                display_name = str(row["name"])
-                            else:
-                                display_name = sector_key if sector_key else "구역 정보 없음"
-
-                            folium.GeoJson(
-                                row['geometry'],
-                                style_function=lambda x, color=color: {
-                                    'color': color,
-                                    'weight': 4,
-                                    'opacity': 0.8
-                                },
-                                tooltip=f"{layer_config['layer_name']} - {display_name}"
-                            ).add_to(m)
-
-                            centroid = row['geometry'].centroid
-                            folium.Marker(
-                                location=[centroid.y, centroid.x],
-                                icon=folium.DivIcon(
-                                    html=make_label_html(display_name, color, font_size_pt=12, bold=True),
-                                    icon_size=(300, 24),     # 충분히 넓게
-                                    icon_anchor=(0, 0)
-                                )
-                            ).add_to(m)
-
-                    
-                    elif layer_type == "polygon":
-                        if tab_config["name"] == "하구":
-                            fixed_color = 'blue'
-
-                            for idx_row, row in gdf.iterrows():
-                                sector_name = row[sector_col] if sector_col else "구역 정보 없음"
-
-                                folium.GeoJson(
-                                    row['geometry'],
-                                    style_function=lambda x, color=fixed_color: {
-                                        'color': color,
-                                        'weight': 2,
-                                        'opacity': 0.9,
-                                        'fillColor': 'transparent',
-                                        'fillOpacity': 0.0
-                                    },
-                                    tooltip=f"{layer_config['layer_name']} - {sector_name}"
-                                ).add_to(m)
-
-                                centroid = row['geometry'].centroid
-                                folium.Marker(
-                                    location=[centroid.y, centroid.x],
-                                    icon=folium.DivIcon(
-                                        html=make_label_html(str(sector_name), fixed_color, font_size_pt=12, bold=True),
-                                        icon_size=(300, 24),
-                                        icon_anchor=(0, 0)
-                                    )
-                                ).add_to(m)
-
-                        else:
-                            for idx_row, row in gdf.iterrows():
-                                sector_key = normalize_sector_value(
-                                    tab_config["name"],
-                                    row[sector_col] if sector_col else None
-                                )
-                                color = sector_color_map.get(sector_key, "blue")
-
-                                folium.GeoJson(
-                                    row['geometry'],
-                                    style_function=lambda x, color=color: {
-                                        'fillColor': color,
-                                        'color': color,
-                                        'weight': 2,
-                                        'fillOpacity': 0.3,
-                                        'opacity': 0.8
-                                    },
-                                    tooltip=f"{layer_config['layer_name']} - {sector_key}"
-                                ).add_to(m)
-
-                    elif layer_type == "point":
-                        for _, row in gdf.iterrows():
-                            raw_sector = row[sector_col] if sector_col else None
-                            sector_key = normalize_sector_value(tab_config["name"], raw_sector)
-                            color = sector_color_map.get(sector_key, "blue")
-
-                            # 시작/종료 + 지점명 라벨
-                            se = str(row["startend"]).strip() if "startend" in gdf.columns and pd.notna(row["startend"]) else ""
-                            loc = str(row["location"]).strip() if "location" in gdf.columns and pd.notna(row["location"]) else ""
-                            label_text = f"{se}: {loc}" if se and loc else (loc if loc else None)
-
-                            add_point_geometry_to_map(
-                                row["geometry"],
-                                m,
-                                color=color,
-                                popup_text=f"{layer_config['layer_name']} - {sector_key}",
-                                tooltip_text=f"{layer_config['layer_name']} - {sector_key}",
-                                label_text=label_text
-                            )
-                            
-                
-                # 내 위치 마커
-                if current_location and current_location.get("latitude"):
-                    folium.Marker(
-                        location=[current_location["latitude"], current_location["longitude"]],
-                        popup="📍 현재 위치",
-                        tooltip="내 위치",
-                        icon=folium.Icon(color='red', icon='user', prefix='fa')
-                    ).add_to(m)
-                    
-                    if current_location.get("accuracy"):
-                        folium.Circle(
-                            location=[current_location["latitude"], current_location["longitude"]],
-                            radius=current_location["accuracy"],
-                            color='red', fill=True, fillOpacity=0.1,
-                            popup=f"오차범위: {current_location['accuracy']:.0f}m"
-                        ).add_to(m)
-                
-                folium.LayerControl().add_to(m)
-                st_folium(m, use_container_width=True, height=420, key=f"map_{tab_idx}")
-                
-                # GPS 정보 텍스트 표시
-                if current_location and current_location.get("latitude"):
-                    st.success(f"📍 현재 위치: 위도 {current_location['latitude']:.6f}, 경도 {current_location['longitude']:.6f}")
-                else:
-                    st.warning("위치 정보를 가져오는 중이거나 권한이 필요합니다.")
-                
-                # 실시간 추적
-                if current_location and gps_button:
-                     time.sleep(0.1)
-                     st.rerun()
-            
-            except Exception as e:
-                st.error(f"{tab_config['name']} 지도 로딩 실패: {e}")
-
 
-# ===== 탭 3: 조 편성 =====
-def parse_names_auto(raw: str):
-    if not raw: return []
-    parts = re.split(r'[,\n\t]+', raw)
-    return [p.strip() for p in parts if p.strip()]
-
-def parse_pairs_auto(raw: str):
-    if not raw: return []
-    pairs = []
-    chunks = re.split(r'[,\n]+', raw)
-    for chunk in chunks:
-        chunk = chunk.strip()
-        if not chunk or '-' not in chunk: continue
-        parts = chunk.split('-', 1)
-        if len(parts) == 2:
-            a, b = parts[0].strip(), parts[1].strip()
-            if a and b: pairs.append((a, b))
-    return pairs
-
-def create_excel_buffer(df):
-    buffer = io.BytesIO()
-    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-        df.to_excel(writer, sheet_name='조편성', index=False)
-    buffer.seek(0)
-    return buffer
-
-def check_constraints(teams, must_together, must_apart):
-    person_to_team = {}
-    for i, t in enumerate(teams):
-        members = [t["조사자"], t["섹장"]] + t["쩌리"]
-        members = [m for m in members if m]
-        
-        for m in members:
-            person_to_team[m] = i
-
-    for a, b in must_together:
-        if a not in person_to_team or b not in person_to_team:
-            return False, f"같이 팀 제약에 존재하지 않는 이름이 있습니다: {a}, {b}"
-        if person_to_team[a] != person_to_team[b]:
-            return False, f"같이 팀 제약 위반: {a}, {b}"
-
-    for a, b in must_apart:
-        if a not in person_to_team or b not in person_to_team:
-            return False, f"다른 팀 제약에 존재하지 않는 이름이 있습니다: {a}, {b}"
-        if person_to_team[a] == person_to_team[b]:
-            return False, f"다른 팀 제약 위반: {a}, {b}"
-
-    return True, ""
-
-def create_excel_buffer(df):
-    buffer = io.BytesIO()
-    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-        df.to_excel(writer, sheet_name='조편성', index=False)
-    buffer.seek(0)
-    return buffer
-
-def get_history_stats(day_idx, session_state):
-    """
-    Returns:
-        role_counts: {이름: {'조사자': 횟수, '섹장': 횟수}}
-        pair_counts: {(이름A, 이름B): 같이한 횟수}
-        group_counts: {이름: {1: 횟수, 2: 횟수, ...}}  <- 조 번호 이력 추가
-    """
-    role_counts = defaultdict(lambda: {'조사자': 0, '섹장': 0})
-    pair_counts = defaultdict(int)
-    group_counts = defaultdict(lambda: defaultdict(int)) # {이름: {조번호: 횟수}}
-
-    for d in range(1, day_idx):
-        key = f"df_day_{d}"
-        if key in session_state and session_state[key] is not None:
-            df = session_state[key]
-            
-            # ['1조', '2조', '3조']
-            team_cols = [c for c in df.columns if "조" in c]
-            
-            # 1. 역할 카운트
-            for _, row in df.iterrows():
-                role = row.get("역할")
-                if role in ["조사자", "섹장"]:
-                    for col in team_cols:
-                        name = str(row[col]).replace(" 📷", "").strip()
-                        if name and name != "nan" and name != "":
-                            role_counts[name][role] += 1
-            
-            # 2. 팀 쌍 & 조 번호 카운트
-            for col_idx, col in enumerate(team_cols):
-                group_num = col_idx + 1
-                
-                members = []
-                for _, row in df.iterrows():
-                    name = str(row[col]).replace(" 📷", "").strip()
-                    if name and name != "nan" and name != "":
-                        members.append(name)
-                        group_counts[name][group_num] += 1
-                
-                for i in range(len(members)):
-                    for j in range(i + 1, len(members)):
-                        p1, p2 = sorted((members[i], members[j]))
-                        pair_counts[(p1, p2)] += 1
-                        
-    return role_counts, pair_counts, group_counts
+        # 요약은 열린 날짜의 알림 수를 센 뒤에 채운다
+        summary_box = st.expander("📋 날짜별 요약", expanded=False)
 
+        # 열려 있는 날짜 탭만 그린다 (탭을 바꾸면 다시 실행)
+        days = st.tabs([f"{i}일차" for i in range(1, num_days + 1)], key="day_tab", on_change="rerun")
 
-def try_make_teams_history_aware(k, investigators, leaders, cameras, extras, must_together, must_apart, history_stats, max_tries=1000):
-    role_counts, pair_counts, group_counts = history_stats
-    
-    inv_pool = investigators[:]
-    lead_pool = leaders[:]
-    cam_set = set(cameras)
-    extra_pool = extras[:]
-    
-    # 페널티 점수 계산
-    def get_team_penalty(team_idx, current_members, new_member):
-        penalty = 0
-        group_num = team_idx + 1
-        
-        # 1. 쌍 중복 페널티 (가중치 1)
-        for m in current_members:
-            key = tuple(sorted((m, new_member)))
-            penalty += pair_counts[key] * 1 
-            
-        # 2. 조 중복 페널티 (이전에도 그 조였으면 감점) (가중치 10)
-        prev_group_count = group_counts[new_member][group_num]
-        penalty += prev_group_count * 10
-        
-        return penalty
-
-    def sort_by_role_fatigue(candidates, role_name):
-        return sorted(candidates, key=lambda x: (role_counts[x][role_name], random.random()))
-
-    best_teams = None
-    min_total_penalty = float('inf')
-
-    for _ in range(max_tries):
-        inv_candidates = sort_by_role_fatigue(inv_pool, '조사자')
-        lead_candidates = sort_by_role_fatigue(lead_pool, '섹장')
-        random.shuffle(extra_pool)
-
-        current_teams = [{"members": [], "camera_count": 0} for _ in range(k)]
-        
-        # 조사자 배정
-        if len(inv_candidates) < k: return None, None, "조사자 후보 부족"
-        inv_picked = inv_candidates[:k]
-        inv_left = inv_candidates[k:]
-        
-        for i in range(k):
-            p = inv_picked[i]
-            current_teams[i]["members"].append({"role": "조사자", "name": p})
-            if p in cam_set: current_teams[i]["camera_count"] += 1
-
-        # 섹장 배정
-        used = set(inv_picked)
-        valid_leaders = [p for p in lead_candidates if p not in used]
-        if len(valid_leaders) < k: continue
-        
-        lead_picked = valid_leaders[:k]
-        lead_left = [p for p in lead_candidates if p not in lead_picked and p not in used]
-        
-        for i in range(k):
-            p = lead_picked[i]
-            current_teams[i]["members"].append({"role": "섹장", "name": p})
-            if p in cam_set: current_teams[i]["camera_count"] += 1
-
-        # 쩌리 배정
-        leftovers = extra_pool + inv_left + lead_left
-        left_cams = [p for p in leftovers if p in cam_set]
-        left_no_cams = [p for p in leftovers if p not in cam_set]
-        random.shuffle(left_cams)
-        random.shuffle(left_no_cams)
-
-        def assign_extras(candidates):
-            for p in candidates:
-                best_team_idx = -1
-                best_score = float('inf')
-
-                team_indices = list(range(k))
-                random.shuffle(team_indices)
-                
-                for t_idx in team_indices:
-                    team = current_teams[t_idx]
-                    current_names = [m['name'] for m in team['members']]
-
-                    # 1. 인원 수 (균형 맞추기)
-                    score = len(team['members']) * 1000 
-                    
-                    # 2. 패널티 (쌍 중복 + 조 중복 * 10)
-                    penalty = get_team_penalty(t_idx, current_names, p)
-                    score += penalty * 500
-                    
-                    # 3. 카메라 균형
-                    if p in cam_set:
-                        score += team['camera_count'] * 300
-                        
-                    if score < best_score:
-                        best_score = score
-                        best_team_idx = t_idx
-                
-                # 배정
-                current_teams[best_team_idx]["members"].append({"role": "쩌리", "name": p})
-                if p in cam_set: current_teams[best_team_idx]["camera_count"] += 1
-
-        assign_extras(left_cams)
-        assign_extras(left_no_cams)
-
-        # 평가
-        formatted = []
-        total_penalty_score = 0
-        
-        for t_idx, t in enumerate(current_teams):
-            ft = {"조사자": None, "섹장": None, "쩌리": []}
-            names_in_team = []
-            group_num = t_idx + 1
-            
-            for m in t["members"]:
-                p_name = m["name"]
-                names_in_team.append(p_name)
-                if m["role"] == "조사자": ft["조사자"] = p_name
-                elif m["role"] == "섹장": ft["섹장"] = p_name
-                else: ft["쩌리"].append(p_name)
-                
-                if group_counts[p_name][group_num] > 0:
-                    total_penalty_score += group_counts[p_name][group_num] * 2
-
-            formatted.append(ft)
-
-            for i in range(len(names_in_team)):
-                for j in range(i+1, len(names_in_team)):
-                    p1, p2 = sorted((names_in_team[i], names_in_team[j]))
-                    total_penalty_score += pair_counts[(p1, p2)]
-
-        ok, msg = check_constraints(formatted, must_together, must_apart)
-        
-        if ok:
-            if total_penalty_score < min_total_penalty:
-                min_total_penalty = total_penalty_score
-                best_teams = formatted
-                if min_total_penalty == 0: break
-    
-    if best_teams:
-        return best_teams, cam_set, None
-    else:
-        return None, None, "조건을 만족하는 조합을 찾지 못했습니다."
-
-
-def format_teams_for_editor(teams, camera_set):
-    max_jjuri = max((len(t["쩌리"]) for t in teams), default=0)
-    def mark(name):
-        if not name: return ""
-        return f"{name} 📷" if name in camera_set else name
-
-    rows = []
-    rows.append(["조사자"] + [mark(t["조사자"]) for t in teams])
-    rows.append(["섹장"] + [mark(t["섹장"]) for t in teams])
-    for i in range(max_jjuri):
-        row = [f"쩌리{i+1}"]
-        for t in teams:
-            if i < len(t["쩌리"]): row.append(mark(t["쩌리"][i]))
-            else: row.append("")
-        rows.append(row)
-        
-    cols = ["역할"] + [f"{i+1}조" for i in range(len(teams))]
-    return pd.DataFrame(rows, columns=cols)
-
-def get_warnings(df, day_idx, session_state):
-    warnings = []
-    if df is None or df.empty: return warnings
-    
-    role_counts, pair_counts, group_counts = get_history_stats(day_idx, session_state)
-    
-    team_cols = [c for c in df.columns if "조" in c]
-    
-    for _, row in df.iterrows():
-        role = row.get("역할")
-        for col_idx, col in enumerate(team_cols):
-            name_raw = str(row[col])
-            name = name_raw.replace(" 📷", "").strip()
-            
-            if not name or name == "nan" or name == "":
+        for i, day_tab in enumerate(days):
+            day_num = i + 1
+            if not day_tab.open:
                 continue
+            with day_tab:
+                st.markdown(f"### 📅 {day_num}일차")
             
-            # 1. 역할 중복 경고
-            if role in ["조사자", "섹장"]:
-                prev_count = role_counts[name][role]
-                if prev_count > 0:
-                    warnings.append(f"⚠️ **{name}**: 과거에 이미 '{role}' 역할을 {prev_count}번 수행했습니다.")
+                key_df = f"df_day_{day_num}"
+                key_input_inv = f"input_inv_{day_num}"
+                key_input_lead = f"input_lead_{day_num}"
+                key_input_cam = f"input_cam_{day_num}"
+                key_input_extra = f"input_extra_{day_num}"
             
-            # 2. 조 번호 중복 경고
-            group_num = col_idx + 1 
-            prev_group_cnt = group_counts[name][group_num]
-            if prev_group_cnt > 0:
-                warnings.append(f"🔢 **{name}**: 과거에 이미 {group_num}조에 {prev_group_cnt}번 배정됐습니다.")
-
-    # 3. 팀원 중복 경고
-    for col in team_cols:
-        members = []
-        for _, row in df.iterrows():
-            name = str(row[col]).replace(" 📷", "").strip()
-            if name and name != "nan": members.append(name)
-        
-        for i in range(len(members)):
-            for j in range(i+1, len(members)):
-                p1, p2 = sorted((members[i], members[j]))
-                count = pair_counts[(p1, p2)]
-                if count > 0:
-                    warnings.append(f"👥 **{col}**: ({p1}, {p2}) 조합은 이전에 {count}번 같은 조였습니다.")
-                    
-    return list(dict.fromkeys(warnings))
-
-# 메인 UI
-with tab3:
-    st.subheader("👥 조 편성")
-    st.info("각 날짜 탭을 순서대로 진행하세요. 이전 날짜의 편성 결과가 다음 날짜의 알고리즘에 반영되어 중복을 최소화합니다.  \n조사자/섹장을 이미 했던 사람은 최대한 쩌리로 가며, 같은 조에 또다시 배정되는 일을 최소화합니다.  \n콤마(,), Enter, Tab 으로 사람을 구분합니다. 후보 입력 칸이나 아래 표 모두 **'엑셀에서 그대로 북사/붙여넣기'를 허용합니다.**")
-
-    days = st.tabs([f"{i}일차" for i in range(1, 6)])
-
-    for i, day_tab in enumerate(days):
-        day_num = i + 1
-        with day_tab:
-            st.markdown(f"### 📅 {day_num}일차")
-            
-            key_df = f"df_day_{day_num}"
-            key_input_inv = f"input_inv_{day_num}"
-            key_input_lead = f"input_lead_{day_num}"
-            key_input_cam = f"input_cam_{day_num}"
-            key_input_extra = f"input_extra_{day_num}"
-            
-            if day_num > 1:
-                prev_inv = st.session_state.get(f"input_inv_{day_num-1}", "")
-                prev_lead = st.session_state.get(f"input_lead_{day_num-1}", "")
-                prev_cam = st.session_state.get(f"input_cam_{day_num-1}", "")
-                prev_extra = st.session_state.get(f"input_extra_{day_num-1}", "")
-            else:
-                prev_inv, prev_lead, prev_cam, prev_extra = "", "", "", ""
-
-            col_cfg1, col_cfg2 = st.columns([1, 3])
-            with col_cfg1:
-                k_val = st.number_input(f"{day_num}일차 조 개수", min_value=1, value=3, key=f"k_{day_num}")
+                init_day_inputs(st.session_state, day_num)
+
+                col_cfg1, col_cfg2, col_cfg3 = st.columns([1, 1, 2])
+                with col_cfg1:
+                    k_val = st.number_input(f"{day_num}일차 조 개수", min_value=1, key=f"k_{day_num}")
+                with col_cfg2:
+                    time_limit = st.number_input(
+                        "탐색 시간(초)", min_value=0.5, max_value=120.0, step=0.5,
+                        key=f"time_limit_{day_num}", help="이 시간 안에서 가장 좋은 편성을 찾습니다. 벌점이 0인 편성을 찾으면 바로 끝납니다.",
+                    )
+                with col_cfg3:
+                    use_parallel = st.checkbox(
+                        f"병렬 탐색 (CPU {default_workers()}개)", key=f"parallel_{day_num}",
+                        help="여러 프로세스에서 서로 다른 시작점으로 동시에 탐색합니다. 인원이 많을 때 유리합니다.",
+                    )
             
-            c1, c2, c3, c4 = st.columns(4)
-            with c1:
-                inv_txt = st.text_area("조사자 후보", value=prev_inv, height=150, key=key_input_inv, placeholder="김조사\n이조사")
-            with c2:
-                lead_txt = st.text_area("섹장 후보", value=prev_lead, height=150, key=key_input_lead, placeholder="김섹장, 이섹장")
-            with c3:
-                extra_txt = st.text_area("쩌리 후보", value=prev_extra, height=150, key=key_input_extra)
-            with c4:
-                cam_txt = st.text_area("📸 카메라", value=prev_cam, height=150, key=key_input_cam, placeholder="여기 적힌 사람은\n가능한 조별로 찢어집니다.", help="역할(조사/섹장/쩌리)과 상관없이 카메라가 있는 사람들 이름을 모두 적으세요.")
-
-            with st.expander("🚫 제약 조건"):
-                ca, cb = st.columns(2)
-                with ca: must_together_txt = st.text_area("꼭 같은 팀 (A-B)", height=70, key=f"together_{day_num}", placeholder="철수-영희\n박새-오목눈이")
-                with cb: must_apart_txt = st.text_area("꼭 다른 팀 (A-B)", height=70, key=f"apart_{day_num}", placeholder="강아지-고양이, 사자-호랑이")
-
-            if st.button(f"🚀 {day_num}일차 조 편성 실행", key=f"btn_{day_num}", use_container_width=True):
-                invs = parse_names_auto(inv_txt)
-                leads = parse_names_auto(lead_txt)
-                cams = parse_names_auto(cam_txt)
-                extras = parse_names_auto(extra_txt)
-                mt = parse_pairs_auto(must_together_txt)
-                ma = parse_pairs_auto(must_apart_txt)
+                c1, c2, c3, c4 = st.columns(4)
+                with c1:
+                    inv_txt = st.text_area("조사자 후보", height=150, key=key_input_inv, placeholder="김조사\n이조사")
+                with c2:
+                    lead_txt = st.text_area("섹장 후보", height=150, key=key_input_lead, placeholder="김섹장, 이섹장")
+                with c3:
+                    extra_txt = st.text_area("쩌리 후보", height=150, key=key_input_extra)
+                with c4:
+                    cam_txt = st.text_area("📸 카메라", height=150, key=key_input_cam, placeholder="여기 적힌 사람은\n가능한 조별로 찢어집니다.", help="역할(조사/섹장/쩌리)과 상관없이 카메라가 있는 사람들 이름을 모두 적으세요.")
+
+                with st.expander("🚫 제약 조건"):
+                    ca, cb = st.columns(2)
+                    with ca: must_together_txt = st.text_area("꼭 같은 팀 (A-B)", height=70, key=f"together_{day_num}", placeholder="철수-영희\n박새-오목눈이")
+                    with cb: must_apart_txt = st.text_area("꼭 다른 팀 (A-B)", height=70, key=f"apart_{day_num}", placeholder="강아지-고양이, 사자-호랑이")
+
+                if st.button(f"🚀 {day_num}일차 조 편성 실행", key=f"btn_{day_num}", use_container_width=True):
+                    invs = parse_names_auto(inv_txt)
+                    leads = parse_names_auto(lead_txt)
+                    cams = parse_names_auto(cam_txt)
+                    extras = parse_names_auto(extra_txt)
+                    mt = parse_pairs_auto(must_together_txt)
+                    ma = parse_pairs_auto(must_apart_txt)
                 
-                history_stats = get_history_stats(day_num, st.session_state)
+                    history_stats = get_history_stats(day_num, st.session_state)
                 
-                teams_struct, cam_set, err = try_make_teams_history_aware(
-                    k=int(k_val), investigators=invs, leaders=leads, cameras=cams, extras=extras,
-                    must_together=mt, must_apart=ma, history_stats=history_stats
-                )
+                    solve = solve_teams_parallel if use_parallel else solve_teams
+                    with st.spinner(f"조 편성 탐색 중... (최대 {time_limit:g}초)"), stage(
+                        "solve_teams", day=day_num, k=int(k_val), people=len(set(invs + leads + extras)), parallel=use_parallel,
+                    ) as span:
+                        teams_struct, cam_set, err = solve(
+                            k=int(k_val), investigators=invs, leaders=leads, cameras=cams, extras=extras,
+                            must_together=mt, must_apart=ma, history_stats=history_stats,
+                            time_budget=float(time_limit),
+                        )
+                        span.set(success=err is None)
                 
-                if err:
-                    st.error(err)
-                else:
-                    df_res = format_teams_for_editor(teams_struct, cam_set)
-                    st.session_state[key_df] = df_res
-                    st.rerun()
-
-            st.divider()
+                    if err:
+                        st.error(err)
+                    else:
+                        df_res = format_teams_for_editor(teams_struct, cam_set)
+                        st.session_state[key_df] = df_res
+                        st.session_state[f"solved_df_{day_num}"] = df_res.copy()
+                        st.rerun()
+
+                st.divider()
             
-            if key_df not in st.session_state:
-                empty_cols = ["역할"] + [f"{i+1}조" for i in range(k_val)]
-                empty_data = [["조사자"] + [""]*k_val, ["섹장"] + [""]*k_val] + [[f"쩌리{r+1}"] + [""]*k_val for r in range(3)]
-                st.session_state[key_df] = pd.DataFrame(empty_data, columns=empty_cols)
-
-            st.markdown(f"### 📝 {day_num}일차 조 편성")
-            st.caption("아래 표를 클릭하여 직접 이름을 수정하거나 복사/붙여넣기 할 수 있습니다.")
-            st.caption("셀을 수정하고 Tab을 누르거나 셀을 옮기면 수정이 적용됩니다. Enter로는 반영이 안돼요!!")
-            st.caption("조 이름은 xlsx 다운로드 후 수정해주세요.")
+                if key_df not in st.session_state:
+                    empty_cols = ["역할"] + [f"{i+1}조" for i in range(k_val)]
+                    empty_data = [["조사자"] + [""]*k_val, ["섹장"] + [""]*k_val] + [[f"쩌리{r+1}"] + [""]*k_val for r in range(3)]
+                    st.session_state[key_df] = pd.DataFrame(empty_data, columns=empty_cols)
+
+                st.markdown(f"### 📝 {day_num}일차 조 편성")
+                st.caption("아래 표를 클릭하여 직접 이름을 수정하거나 복사/붙여넣기 할 수 있습니다.")
+                st.caption("셀을 수정하고 Tab을 누르거나 셀을 옮기면 수정이 적용됩니다. Enter로는 반영이 안돼요!!")
+                st.caption("조 이름은 xlsx 다운로드 후 수정해주세요.")
             
-            edited_df = st.data_editor(
-                st.session_state[key_df],
-                key=f"editor_{day_num}",
-                num_rows="dynamic",
-                use_container_width=True,
-                height=300
-            )
+                edited_df = st.data_editor(
+                    st.session_state[key_df],
+                    key=f"editor_{day_num}",
+                    num_rows="dynamic",
+                    use_container_width=True,
+                    height=300
+                )
             
-            st.session_state[key_df] = edited_df
-
-            warnings = get_warnings(edited_df, day_num, st.session_state)
-            if warnings:
-                with st.container():
-                    st.warning(f"⚠️ {len(warnings)}건의 중복 알림이 있습니다:")
-                    for w in warnings:
-                        st.write(w)
-            else:
-                if not edited_df.empty:
-                    st.success("✅ 중복되는 역할이나 팀 구성이 없습니다 (또는 1일차입니다).")
-
-            csv_buffer = create_excel_buffer(edited_df)
+                st.session_state[key_df] = edited_df
+
+                warnings = get_warnings(edited_df, day_num, st.session_state)
+                store_day_summary(st.session_state, day_num, edited_df, len(warnings))
+                if warnings:
+                    with st.container():
+                        st.warning(f"⚠️ {len(warnings)}건의 중복 알림이 있습니다:")
+                        for w in warnings:
+                            st.write(w)
+                else:
+                    if not edited_df.empty:
+                        st.success("✅ 중복되는 역할이나 팀 구성이 없습니다 (또는 1일차입니다).")
+
+                # xlsx는 버튼을 누를 때 만든다 (같은 표면 캐시된 파일)
+                st.download_button(
+                    label=f"💾 {day_num}일차 조 편성 결과 다운로드 (.xlsx)",
+                    data=partial(day_workbook, edited_df),
+                    file_name=f"조편성_{day_num}일차.xlsx",
+                    mime=XLSX_MIME,
+                    key=f"down_{day_num}"
+                )
+
+        with summary_box:
+            summary_df = pd.DataFrame(day_summaries(st.session_state, num_days)).astype({"조": "Int64", "중복 알림": "Int64"})
+            st.dataframe(summary_df, hide_index=True, use_container_width=True)
+            frames = {d: st.session_state.get(f"df_day_{d}") for d in range(1, num_days + 1)}
             st.download_button(
-                label=f"💾 {day_num}일차 조 편성 결과 다운로드 (.xlsx)",
-                data=csv_buffer,
-                file_name=f"조편성_{day_num}일차.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                key=f"down_{day_num}"
+                "💾 전체 일정 다운로드 (.xlsx)",
+                data=partial(schedule_workbook, frames),
+                file_name="조편성_전체일정.xlsx",
+                mime=XLSX_MIME,
+                key="down_all",
+                help="날짜별 시트와 사람별 이력 요약 시트를 한 파일로 내려받습니다.",
             )
+
+        # 이번 실행에서 바뀐 날짜를 저장소에 쓴다 (같은 날짜를 두 곳에서 고치면 나중에 쓴 쪽이 남는다)
+        if store_enabled:
+            with stage("store_push") as span:
+                span.set(written=len(st.session_state["history_index"].push(st.session_state, num_days)))
+
+# ===== 디버그 패널 (?debug=1) =====
+if perf_run is not None:
+    if debug_panel:
+        import pandas as pd
+
+        with st.expander("🛠️ 디버그: 단계별 시간", expanded=False):
+            st.caption(f"이번 재실행 (지금까지 {perf_run.elapsed() * 1000:,.0f}ms)")
+            st.dataframe(pd.DataFrame(perf_run.rows()), hide_index=True, use_container_width=True)
+            st.caption("지난 재실행")
+            st.dataframe(pd.DataFrame(st.session_state.get("perf_history", [])[::-1]), hide_index=True, use_container_width=True)
+            caches = {"maps": get_map_cache().stats()}
+            if "team_export" in sys.modules:
+                caches["xlsx"] = sys.modules["team_export"].get_export_cache().stats()
+            if "layer_store" in sys.modules:
+                caches["layers"] = sys.modules["layer_store"].get_layer_store().stats()
+            if "field_sheet" in sys.modules:
+                caches["field_llm"] = sys.modules["field_sheet"].get_response_cache().stats()
+            st.json(caches)
+    end_run(perf_run)